@@ -0,0 +1,221 @@
+"""Headless paint benchmark for the indicator widgets.
+
+Each widget runs in its own subprocess under the offscreen Qt platform and is
+driven through a scripted telemetry sweep; every frame is repainted
+synchronously and the time spent inside paintEvent is recorded. A second pass
+over the same sweep runs under tracemalloc to count Python allocations, and the
+child's peak RSS is read from getrusage (or psutil where the resource module is
+missing, as on Windows; without either it is left out).
+
+    python benchmarks/render_widgets.py
+    python benchmarks/render_widgets.py --frames 2000 --widget attitude
+    python benchmarks/render_widgets.py --save-baseline benchmarks/render_baseline.json
+    python benchmarks/render_widgets.py --baseline benchmarks/render_baseline.json --threshold 0.25
+
+With --baseline the run exits non-zero if any widget's median or p99 paint time
+is more than --threshold slower than the baseline. Baselines are machine
+specific; record one on the box that runs the comparison.
+"""
+import argparse
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+def attitude_sweep(widget, frame):
+    widget.update_attitude(45.0 * math.sin(frame * 0.02), 20.0 * math.sin(frame * 0.013))
+
+def heading_sweep(widget, frame):
+    widget.update_value(int(frame * 1.7) % 360)
+
+def altitude_sweep(widget, frame):
+    widget.update_value(150.0 * (0.5 - 0.5 * math.cos(frame * 0.01)))
+
+def bar_sweep(widget, frame):
+    widget.update_altitude(150.0 * (0.5 - 0.5 * math.cos(frame * 0.01)))
+
+def speed_sweep(widget, frame):
+    widget.update_value(30.0 * (0.5 - 0.5 * math.cos(frame * 0.015)))
+
+def attitude_widget(render_mode):
+    def widget_class():
+        from indicator.AttitudeIndicator import AttitudeIndicator
+        return AttitudeIndicator, {"render_mode": render_mode}
+    return widget_class
+
+def gauge_widget(name):
+    def widget_class():
+        from indicator.gauge import Gauge, GAUGES
+        return Gauge, {"config": GAUGES[name]}
+    return widget_class
+
+def altitude_bar_widget():
+    from indicator.alt_bar import AltitudeBar
+    return AltitudeBar, {}
+
+# name -> (widget class loader, sweep, size or None to keep the widget's own fixed size); sizes match main.py
+WIDGETS = {
+    "attitude": (attitude_widget("transform"), attitude_sweep, (380, 380)),
+    "attitude-cached": (attitude_widget("cached"), attitude_sweep, (380, 380)),
+    "heading": (gauge_widget("heading"), heading_sweep, (190, 190)),
+    "altimeter": (gauge_widget("altimeter"), altitude_sweep, (190, 190)),
+    "speedometer": (gauge_widget("groundspeed"), speed_sweep, (190, 190)),
+    "altitude-bar": (altitude_bar_widget, bar_sweep, None),
+}
+
+def timed(widget_class, samples):
+    def paintEvent(self, event):
+        start = time.perf_counter()
+        widget_class.paintEvent(self, event)
+        samples.append(time.perf_counter() - start)
+    return type(f"Timed{widget_class.__name__}", (widget_class,), {"paintEvent": paintEvent})
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        # Windows reports the peak working set; elsewhere only the current RSS is available.
+        memory = psutil.Process().memory_info()
+        return getattr(memory, "peak_wset", memory.rss) / (1024 * 1024)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_widget(name, frames, warmup):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    sys.path.insert(0, ROOT)
+    from PySide6.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication([])
+    factory, sweep, size = WIDGETS[name]
+
+    samples = []
+    widget_class, options = factory()
+    widget = timed(widget_class, samples)(**options)
+    if size:
+        widget.setFixedSize(*size)
+    widget.show()
+    app.processEvents()
+
+    for frame in range(warmup):
+        sweep(widget, frame)
+        widget.repaint()
+    del samples[:]
+
+    for frame in range(frames):
+        sweep(widget, frame)
+        widget.repaint()
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for frame in range(frames):
+        sweep(widget, frame)
+        widget.repaint()
+    after = tracemalloc.take_snapshot()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    growth = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+
+    widget.close()
+    return {
+        "frames": len(samples),
+        "median_ms": statistics.median(samples) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "max_ms": max(samples) * 1000,
+        "alloc_peak_kb": peak / 1024,
+        "alloc_growth_kb": growth / 1024,
+        "alloc_growth_blocks": blocks,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def run_all(names, frames, warmup, timeout):
+    results = {}
+    for name in names:
+        # One process per widget so peak RSS and the asset caches are not shared between widgets.
+        try:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", name, "--frames", str(frames),
+                 "--warmup", str(warmup)],
+                capture_output=True, text=True, env=dict(os.environ, QT_QPA_PLATFORM="offscreen"), timeout=timeout)
+        except subprocess.TimeoutExpired:
+            print(f"{name}: timed out after {timeout:.0f} s")
+            results[name] = None
+            continue
+        if output.returncode != 0:
+            print(f"{name}: failed\n{output.stderr}")
+            results[name] = None
+            continue
+        results[name] = json.loads(output.stdout.strip().splitlines()[-1])
+    return results
+
+def report(results):
+    print(f"{'widget':<16}{'median ms':>10}{'p99 ms':>10}{'max ms':>10}{'alloc peak KB':>15}{'growth KB':>11}{'RSS MB':>9}")
+    for name, result in results.items():
+        if result is None:
+            continue
+        rss = result["peak_rss_mb"]
+        print(f"{name:<16}{result['median_ms']:10.3f}{result['p99_ms']:10.3f}{result['max_ms']:10.3f}"
+              f"{result['alloc_peak_kb']:15.1f}{result['alloc_growth_kb']:11.1f}{'-' if rss is None else f'{rss:.1f}':>9}")
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if result is None or reference is None:
+            continue
+        for metric in ("median_ms", "p99_ms"):
+            if result[metric] > reference[metric] * (1 + threshold):
+                regressions.append(f"{name} {metric}: {reference[metric]:.3f} -> {result[metric]:.3f} ms "
+                                   f"(+{(result[metric] / reference[metric] - 1) * 100:.0f}%)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--widget", action="append", choices=list(WIDGETS), help="widgets to run (default: all)")
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=300, help="seconds before a widget's run is abandoned")
+    parser.add_argument("--baseline", help="compare against this baseline JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, as a fraction")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write these results as a new baseline")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_widget(args.child, args.frames, args.warmup)))
+        return 0
+
+    results = run_all(args.widget or list(WIDGETS), args.frames, args.warmup, args.timeout)
+    report(results)
+    failed = any(result is None for result in results.values())
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({name: result for name, result in results.items() if result is not None}, f, indent=2)
+        print(f"baseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Startup benchmark for the ground control station.
+
+main.py is launched --runs times under the offscreen Qt platform with
+--startup-report and --exit-after-startup, and the phase timings it writes
+(seconds since the interpreter reached main.py) are collected:
+
+    imports       all module-level imports done
+    application   QApplication created
+    window        main window constructed
+    first frame   instruments painted for the first time
+    map created   QtWebEngine imported and the map view built
+    map ready     Leaflet page finished loading
+    interactive   map ready and the background imports (dronekit) finished
+
+The first run is reported separately because it is the closest to a cold
+start (the OS file cache is not dropped, so it is only approximately cold);
+the median of the remaining runs is the warm figure.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 10 --sim 1
+    python benchmarks/startup.py --save-baseline benchmarks/startup_baseline.json
+    python benchmarks/startup.py --baseline benchmarks/startup_baseline.json --threshold 0.25
+
+With --baseline the run exits non-zero if the warm first-frame or interactive
+time is more than --threshold slower than the baseline. Baselines are machine
+specific; record one on the box that runs the comparison.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+PHASES = ("imports", "application", "window", "first frame", "map created", "map ready", "interactive")
+COMPARED = ("first frame", "interactive")
+
+def run_once(extra_args, timeout):
+    with tempfile.TemporaryDirectory() as directory:
+        report_path = os.path.join(directory, "startup.json")
+        env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+        env.setdefault("QTWEBENGINE_CHROMIUM_FLAGS", "--no-sandbox --disable-gpu")
+        output = subprocess.run(
+            [sys.executable, os.path.join(ROOT, "main.py"), "--startup-report", report_path, "--exit-after-startup"]
+            + extra_args, capture_output=True, text=True, env=env, cwd=ROOT, timeout=timeout)
+        if output.returncode != 0 or not os.path.exists(report_path):
+            print(f"run failed\n{output.stderr}")
+            return None
+        with open(report_path) as f:
+            report = json.load(f)
+    if report["incomplete"]:
+        print(f"startup did not finish: {', '.join(report['incomplete'])}")
+    return report["phases"]
+
+def summarise(runs):
+    cold = runs[0]
+    warm_runs = runs[1:] or runs
+    warm = {}
+    for phase in PHASES:
+        values = [run[phase] for run in warm_runs if phase in run]
+        if values:
+            warm[phase] = statistics.median(values)
+    return {"cold": cold, "warm": warm}
+
+def report(summary):
+    print(f"{'phase':<14}{'cold ms':>10}{'warm ms':>10}")
+    for phase in PHASES:
+        cold = summary["cold"].get(phase)
+        warm = summary["warm"].get(phase)
+        print(f"{phase:<14}{'-' if cold is None else f'{cold * 1000:.0f}':>10}{'-' if warm is None else f'{warm * 1000:.0f}':>10}")
+
+def compare(summary, baseline, threshold):
+    regressions = []
+    for phase in COMPARED:
+        result = summary["warm"].get(phase)
+        reference = baseline["warm"].get(phase)
+        if result is None or reference is None:
+            continue
+        if result > reference * (1 + threshold):
+            regressions.append(f"{phase}: {reference * 1000:.0f} -> {result * 1000:.0f} ms "
+                               f"(+{(result / reference - 1) * 100:.0f}%)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--sim", type=int, default=0, help="start with N synthetic vehicles")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds before a run is abandoned")
+    parser.add_argument("--baseline", help="compare against this baseline JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, as a fraction")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write these results as a new baseline")
+    args = parser.parse_args()
+
+    extra_args = ["--sim", str(args.sim)] if args.sim else []
+    runs = []
+    for _ in range(args.runs):
+        phases = run_once(extra_args, args.timeout)
+        if phases is None:
+            return 1
+        runs.append(phases)
+    summary = summarise(runs)
+    report(summary)
+    failed = False
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"baseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(summary, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        failed = bool(regressions)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
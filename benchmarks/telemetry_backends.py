@@ -0,0 +1,160 @@
+"""Compare the pymavlink fast path against the dronekit telemetry path.
+
+Offline (default): a synthetic MAVLink stream shaped like an ArduPilot telemetry
+feed is pushed through
+  * the fast path: FrameSplitter + selective decode of the gauge messages, and
+  * full pymavlink parsing of every frame, which is what dronekit's receive loop
+    does before its own listener dispatch (so this is a lower bound for dronekit).
+
+Live (--connect): both backends read the same endpoint for --seconds each and
+report delivered ATTITUDE messages per second and latency relative to the
+minimum observed (time_boot_ms -> listener) offset.
+
+    python benchmarks/telemetry_backends.py
+    python benchmarks/telemetry_backends.py --connect udp:127.0.0.1:14550 --seconds 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "drone_connect_control"))
+
+from pymavlink import mavutil
+from mavlink_backend import FrameSplitter, MavlinkTelemetryBackend
+from mavlink_state import MESSAGE_IDS, frame_msgid, message_fields
+
+# messages per second in a typical ArduPilot stream at SR*=10 / 4
+STREAM = (
+    ("ATTITUDE", 10), ("GLOBAL_POSITION_INT", 4), ("VFR_HUD", 4), ("HEARTBEAT", 1), ("SYS_STATUS", 2),
+    ("RAW_IMU", 10), ("SCALED_PRESSURE", 4), ("SERVO_OUTPUT_RAW", 4), ("RC_CHANNELS", 4), ("GPS_RAW_INT", 4),
+    ("MEMINFO", 2), ("NAV_CONTROLLER_OUTPUT", 4), ("AHRS", 4), ("SYSTEM_TIME", 1),
+)
+
+def synthetic_stream(seconds):
+    mav = mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=1)
+    encoders = {
+        "ATTITUDE": lambda t: mav.attitude_encode(t, 0.1, 0.05, 1.0, 0, 0, 0),
+        "GLOBAL_POSITION_INT": lambda t: mav.global_position_int_encode(t, 375665000, 1269780000, 50000, 20000, 100, 0, 0, 9000),
+        "VFR_HUD": lambda t: mav.vfr_hud_encode(12.0, 11.5, 90, 50, 20.0, 0.5),
+        "HEARTBEAT": lambda t: mav.heartbeat_encode(2, 3, 217, 4, 4),
+        "SYS_STATUS": lambda t: mav.sys_status_encode(0, 0, 0, 500, 12600, -1, 80, 0, 0, 0, 0, 0, 0),
+        "RAW_IMU": lambda t: mav.raw_imu_encode(t * 1000, 1, 2, 3, 4, 5, 6, 7, 8, 9),
+        "SCALED_PRESSURE": lambda t: mav.scaled_pressure_encode(t, 1013.0, 0.1, 2500),
+        "SERVO_OUTPUT_RAW": lambda t: mav.servo_output_raw_encode(t * 1000, 0, *([1500] * 8)),
+        "RC_CHANNELS": lambda t: mav.rc_channels_encode(t, 8, *([1500] * 18), 255),
+        "GPS_RAW_INT": lambda t: mav.gps_raw_int_encode(t * 1000, 3, 375665000, 1269780000, 50000, 100, 100, 1200, 9000, 12),
+        "MEMINFO": lambda t: mav.meminfo_encode(1000, 2000),
+        "NAV_CONTROLLER_OUTPUT": lambda t: mav.nav_controller_output_encode(0, 0, 0, 0, 0, 0, 0, 0),
+        "AHRS": lambda t: mav.ahrs_encode(0, 0, 0, 0, 0, 0, 0),
+        "SYSTEM_TIME": lambda t: mav.system_time_encode(t * 1000, t),
+    }
+    data = bytearray()
+    for tick in range(seconds * 100):
+        t = tick * 10
+        for name, rate in STREAM:
+            if tick % (100 // rate) == 0:
+                data += encoders[name](t).pack(mav)
+    return bytes(data)
+
+def bench_fast_path(data, chunk):
+    splitter = FrameSplitter()
+    mav = mavutil.mavlink.MAVLink(None)
+    decoded = frames = 0
+    latencies = []
+    start = time.perf_counter()
+    for offset in range(0, len(data), chunk):
+        received = time.perf_counter()
+        fields = {}
+        for frame in splitter.feed(data[offset:offset + chunk]):
+            frames += 1
+            if frame_msgid(frame) in MESSAGE_IDS:
+                fields.update(message_fields(mav.decode(bytearray(frame))))
+                decoded += 1
+        latencies.append(time.perf_counter() - received)
+    return frames, decoded, time.perf_counter() - start, latencies
+
+def bench_full_parse(data, chunk):
+    mav = mavutil.mavlink.MAVLink(None)
+    mav.robust_parsing = True
+    decoded = frames = 0
+    latencies = []
+    start = time.perf_counter()
+    for offset in range(0, len(data), chunk):
+        received = time.perf_counter()
+        fields = {}
+        for msg in mav.parse_buffer(data[offset:offset + chunk]) or ():
+            frames += 1
+            decoded += 1
+            fields.update(message_fields(msg))
+        latencies.append(time.perf_counter() - received)
+    return frames, decoded, time.perf_counter() - start, latencies
+
+def report(name, frames, decoded, elapsed, latencies):
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0
+    print(f"{name:<22} {frames / elapsed:>12,.0f} frames/s {decoded:>9} decoded "
+          f"  chunk latency median {statistics.median(latencies) * 1e6:7.1f} us  p99 {p99 * 1e6:7.1f} us")
+
+def offline(args):
+    data = synthetic_stream(args.seconds)
+    print(f"{len(data):,} bytes of synthetic telemetry ({args.seconds} s of flight), {args.chunk}-byte reads")
+    report("fast path", *bench_fast_path(data, args.chunk))
+    report("full pymavlink parse", *bench_full_parse(data, args.chunk))
+
+class AttitudeCounter:
+    def __init__(self):
+        self.count = 0
+        self.offsets = []
+
+    def record(self, time_boot_ms):
+        self.count += 1
+        self.offsets.append(time.monotonic() - time_boot_ms / 1000.0)
+
+    def report(self, name, seconds):
+        if not self.offsets:
+            print(f"{name:<10} no ATTITUDE received")
+            return
+        base = min(self.offsets)
+        latencies = sorted(offset - base for offset in self.offsets)
+        print(f"{name:<10} {self.count / seconds:8.1f} ATTITUDE/s  relative latency median "
+              f"{statistics.median(latencies) * 1000:6.2f} ms  p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.2f} ms")
+
+def live(args):
+    from dronekit import connect
+
+    counter = AttitudeCounter()
+    vehicle = connect(args.connect, wait_ready=False)
+    vehicle.add_message_listener("ATTITUDE", lambda _vehicle, _name, msg: counter.record(msg.time_boot_ms))
+    time.sleep(args.seconds)
+    vehicle.close()
+    counter.report("dronekit", args.seconds)
+
+    class AttitudeBus:
+        def publish(self, _key, fields):
+            pass
+
+    counter = AttitudeCounter()
+    # The frame listener does the one ATTITUDE decode, so the backend itself is told to decode nothing.
+    backend = MavlinkTelemetryBackend(args.connect, AttitudeBus(), "bench", message_ids=set())
+    decoder = mavutil.mavlink.MAVLink(None)
+
+    def on_frame(frame):
+        if frame_msgid(frame) == mavutil.mavlink.MAVLINK_MSG_ID_ATTITUDE:
+            counter.record(decoder.decode(bytearray(frame)).time_boot_ms)
+
+    backend.add_frame_listener(on_frame)
+    backend.start()
+    time.sleep(args.seconds)
+    backend.stop()
+    backend.join()
+    counter.report("fast path", args.seconds)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connect", help="live connection string; omit for the offline benchmark")
+    parser.add_argument("--seconds", type=int, default=60)
+    parser.add_argument("--chunk", type=int, default=512, help="bytes per read in the offline benchmark")
+    args = parser.parse_args()
+    live(args) if args.connect else offline(args)
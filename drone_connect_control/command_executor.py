@@ -0,0 +1,184 @@
+import time
+from collections import deque
+from pymavlink import mavutil
+from PySide6.QtCore import QObject, Signal
+from indicator.frame_scheduler import frame_scheduler
+
+ACK_TIMEOUT = 0.5
+MAX_RETRIES = 3
+IN_PROGRESS_TIMEOUT = 10.0
+CHECK_RATE = 20
+
+def command_name(command):
+    entry = mavutil.mavlink.enums["MAV_CMD"].get(command)
+    return entry.name.replace("MAV_CMD_", "") if entry else str(command)
+
+def result_name(result):
+    entry = mavutil.mavlink.enums["MAV_RESULT"].get(result)
+    return entry.name.replace("MAV_RESULT_", "") if entry else str(result)
+
+class PendingCommand:
+    def __init__(self, key, vehicle, command, params, callback, timeout, retries):
+        self.key = key
+        self.vehicle = vehicle
+        self.command = command
+        self.params = (tuple(params) + (0,) * 7)[:7]
+        self.callback = callback
+        self.timeout = timeout
+        self.retries = retries
+        self.attempt = 0
+        self.deadline = 0.0
+
+class Watch:
+    def __init__(self, condition, callback, deadline):
+        self.condition = condition
+        self.callback = callback
+        self.deadline = deadline
+
+class CommandExecutor(QObject):
+    # vehicle key, command id, success, message
+    command_finished = Signal(object, int, bool, str)
+    # vehicle key, command id, attempt (resends count up from 1)
+    command_sent = Signal(object, int, int)
+    # COMMAND_ACKs arrive on dronekit's receive thread; this signal hands them to the GUI thread.
+    _ack_received = Signal(object, int, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pending = {}
+        self.queued = {}
+        self.listeners = {}
+        self.watches = []
+        self.consumer = None
+        self._ack_received.connect(self.on_ack)
+
+    def send(self, vehicle, command, params=(), key=None, callback=None, timeout=ACK_TIMEOUT, retries=MAX_RETRIES):
+        # Never blocks: the result arrives later through callback(success, message) and command_finished.
+        key = vehicle if key is None else key
+        self._listen(key, vehicle)
+        pending = PendingCommand(key, vehicle, command, params, callback, timeout, retries)
+        # MAVLink allows one outstanding command of each id per target, so repeats wait their turn.
+        if (key, command) in self.pending:
+            self.queued.setdefault((key, command), deque()).append(pending)
+        else:
+            self._start(pending)
+        return pending
+
+    def arm(self, vehicle, armed=True, key=None, callback=None):
+        return self.send(vehicle, mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM, (1 if armed else 0,), key, callback)
+
+    def set_mode(self, vehicle, mode, key=None, callback=None):
+        custom_mode = getattr(vehicle, "_mode_mapping", {}).get(mode)
+        if custom_mode is None:
+            if callback:
+                callback(False, f"Unknown mode {mode}")
+            return None
+        return self.send(vehicle, mavutil.mavlink.MAV_CMD_DO_SET_MODE,
+                         (mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED, custom_mode), key, callback)
+
+    def takeoff(self, vehicle, altitude, key=None, callback=None):
+        return self.send(vehicle, mavutil.mavlink.MAV_CMD_NAV_TAKEOFF, (0, 0, 0, 0, 0, 0, altitude), key, callback)
+
+    def watch(self, condition, callback, timeout=None):
+        # Polls condition() from the GUI thread instead of a sleep loop; callback(True) once it holds,
+        # callback(False) if timeout passes first.
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        self.watches.append(Watch(condition, callback, deadline))
+        self._ensure_consumer()
+
+    def forget(self, key):
+        # Called when a vehicle goes away: detaches its ACK listener and fails everything still
+        # outstanding or queued for it, so no retry is sent to the closed link.
+        vehicle, listener = self.listeners.pop(key, (None, None))
+        if vehicle is not None:
+            try:
+                vehicle.remove_message_listener("COMMAND_ACK", listener)
+            except Exception as e:
+                print(f"Error removing command listener: {e}")
+        for command_key in [command_key for command_key in self.pending if command_key[0] == key]:
+            queued = self.queued.pop(command_key, ())
+            self._finish(self.pending[command_key], False, "vehicle removed")
+            for pending in queued:
+                self._finish(pending, False, "vehicle removed")
+
+    def _listen(self, key, vehicle):
+        if key in self.listeners:
+            return
+        def listener(_vehicle, _name, msg):
+            self._ack_received.emit(key, msg.command, msg.result)
+        vehicle.add_message_listener("COMMAND_ACK", listener)
+        self.listeners[key] = (vehicle, listener)
+
+    def _start(self, pending):
+        self.pending[(pending.key, pending.command)] = pending
+        self._transmit(pending)
+        self._ensure_consumer()
+
+    def _transmit(self, pending):
+        # The confirmation field counts retransmissions, as the MAVLink command protocol asks.
+        confirmation = pending.attempt
+        pending.deadline = time.monotonic() + pending.timeout * (2 ** confirmation)
+        pending.attempt += 1
+        self.command_sent.emit(pending.key, pending.command, pending.attempt)
+        pending.vehicle.send_mavlink(pending.vehicle.message_factory.command_long_encode(
+            0, 0, pending.command, confirmation, *pending.params))
+
+    def on_ack(self, key, command, result):
+        pending = self.pending.get((key, command))
+        if pending is None:
+            return
+        if result == mavutil.mavlink.MAV_RESULT_IN_PROGRESS:
+            pending.deadline = time.monotonic() + IN_PROGRESS_TIMEOUT
+            return
+        self._finish(pending, result == mavutil.mavlink.MAV_RESULT_ACCEPTED, result_name(result))
+
+    def _finish(self, pending, success, message):
+        command_key = (pending.key, pending.command)
+        self.pending.pop(command_key, None)
+        if pending.callback:
+            try:
+                pending.callback(success, message)
+            except Exception as e:
+                print(f"Error in command callback: {e}")
+        self.command_finished.emit(pending.key, pending.command, success, message)
+
+        queued = self.queued.get(command_key)
+        if queued:
+            self._start(queued.popleft())
+            if not queued:
+                del self.queued[command_key]
+
+    def check(self):
+        now = time.monotonic()
+        for pending in list(self.pending.values()):
+            if now < pending.deadline:
+                continue
+            if pending.attempt > pending.retries:
+                self._finish(pending, False, "no acknowledgement")
+            else:
+                self._transmit(pending)
+
+        for watch in list(self.watches):
+            try:
+                done = watch.condition()
+            except Exception:
+                done = False
+            if done or (watch.deadline is not None and now > watch.deadline):
+                self.watches.remove(watch)
+                watch.callback(bool(done))
+
+        if not self.pending and not self.watches:
+            frame_scheduler().unregister(self.consumer)
+            self.consumer = None
+
+    def _ensure_consumer(self):
+        if self.consumer is None:
+            self.consumer = frame_scheduler().register(self.check, CHECK_RATE)
+
+_executor = None
+
+def command_executor():
+    global _executor
+    if _executor is None:
+        _executor = CommandExecutor()
+    return _executor
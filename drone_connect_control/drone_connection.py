@@ -1,25 +1,145 @@
-from dronekit import connect
+import threading
+import time
+from PySide6.QtCore import QThread, Signal
+
+READY_ATTRIBUTES = ("gps_0", "armed", "mode", "attitude")
+# dronekit's connect() blocks for its whole heartbeat wait, so the wait is split into short attempts
+# with a cancel check between them.
+HEARTBEAT_ATTEMPT = 2
 
-def connect_to_drone(connection_type, connection_value, wait_ready=True):
-    connection_string = ""
 
+def connection_options(connection_type, connection_value):
     if connection_type == "Serial":
-        connection_string = connection_value
-        try:
-            vehicle = connect(connection_string, wait_ready=wait_ready, baud=57600,)
-            print("Drone connected successfully!")
-            return vehicle
-        except Exception as e:
-            print(f"Error connecting to drone: {e}")
-            return None  
+        return connection_value, {"baud": 57600}
     elif connection_type == "TCP":
-        connection_string = f"{connection_value}:14550"
+        return f"{connection_value}:14550", {}
+    return None, {}
+
+
+def connect_to_drone(connection_type, connection_value, wait_ready=True):
+    connection_string, options = connection_options(connection_type, connection_value)
+    if connection_string is None:
+        return None
+
+    # dronekit is imported on first use so it stays off the startup path.
+    from dronekit import connect
+    from param_cache import CachedParamVehicle
+    try:
+        vehicle = connect(connection_string, wait_ready=wait_ready, vehicle_class=CachedParamVehicle, **options)
+        print("Drone connected successfully!")
+        return vehicle
+    except Exception as e:
+        print(f"Error connecting to drone: {e}")
+        return None
+
+
+class ConnectionCancelled(Exception):
+    pass
+
+
+class ConnectionWorker(QThread):
+    # stage name, current, total (total is 0 when the stage has no count)
+    progress = Signal(str, int, int)
+    connected = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, connection_type, connection_value, timeout=60, version_timeout=5, poll_interval=0.1,
+                 share_link=False, parent=None):
+        super().__init__(parent)
+        self.connection_type = connection_type
+        self.connection_value = connection_value
+        self.timeout = timeout
+        self.version_timeout = version_timeout
+        self.poll_interval = poll_interval
+        self.share_link = share_link
+        self.router = None
+        self._cancel = threading.Event()
+        self._deadline = None
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        connection_string, options = connection_options(self.connection_type, self.connection_value)
+        if connection_string is None:
+            self.failed.emit(f"Unknown connection type: {self.connection_type}")
+            return
+
+        self._deadline = time.monotonic() + self.timeout
+        vehicle = None
         try:
-            vehicle = connect(connection_string, wait_ready=wait_ready)
-            print("Drone connected successfully!")
-            return vehicle
+            if self.share_link:
+                from mavlink_router import SHARE_TCP_PORT, start_local_router
+                # The router owns the physical link; the GCS becomes one of its clients.
+                self.router, connection_string = start_local_router(connection_string, options.get("baud", 57600),
+                                                                    share_port=SHARE_TCP_PORT)
+                options = {}
+            self.progress.emit("heartbeat", 0, 0)
+            vehicle = self._open(connection_string, options)
+            self._check()
+
+            self.progress.emit("autopilot version", 0, 0)
+            # Not every autopilot answers AUTOPILOT_VERSION, so this stage is best effort.
+            self._wait_until(lambda: getattr(vehicle, "_autopilot_version_msg_count", 0) > 0,
+                             stage_timeout=self.version_timeout)
+
+            self._wait_until(lambda: self._parameters_loaded(vehicle))
+
+            self.progress.emit("ready", 0, 0)
+            self._wait_until(lambda: all(getattr(vehicle, name, None) is not None for name in READY_ATTRIBUTES))
+        except ConnectionCancelled as e:
+            self._close(vehicle)
+            self.failed.emit(str(e))
+            return
         except Exception as e:
-            print(f"Error connecting to drone: {e}")
-            return None 
+            self._close(vehicle)
+            self.failed.emit(f"Error connecting to drone: {e}")
+            return
+
+        print("Drone connected successfully!")
+        self.connected.emit(vehicle)
+
+    def _open(self, connection_string, options):
+        from dronekit import APIException, connect
+        from param_cache import CachedParamVehicle
+        while True:
+            self._check()
+            if self.router is not None and self.router.error is not None:
+                # The router gave up on the physical link; no heartbeat will ever arrive.
+                raise ConnectionError(f"could not open the shared link: {self.router.error}")
+            try:
+                # Returns once the first heartbeat arrives and the parameter download has started.
+                return connect(connection_string, wait_ready=False, vehicle_class=CachedParamVehicle,
+                               heartbeat_timeout=HEARTBEAT_ATTEMPT, **options)
+            except APIException as e:
+                # No heartbeat within this attempt; dronekit has already shut that link down.
+                if "Timeout" not in str(e):
+                    raise
+
+    def _close(self, vehicle):
+        if vehicle:
+            vehicle.close()
+        if self.router:
+            self.router.stop()
+            self.router = None
+
+    def _parameters_loaded(self, vehicle):
+        total = max(getattr(vehicle, "_params_count", -1), 0)
+        received = len(getattr(vehicle, "_params_map", {}))
+        self.progress.emit("parameters", min(received, total), total)
+        return getattr(vehicle, "_params_loaded", False)
+
+    def _check(self):
+        if self._cancel.is_set():
+            raise ConnectionCancelled("Connection cancelled.")
+        if time.monotonic() > self._deadline:
+            raise ConnectionCancelled("Connection timed out.")
 
-    
+    def _wait_until(self, condition, stage_timeout=None):
+        stage_deadline = time.monotonic() + stage_timeout if stage_timeout is not None else None
+        while not condition():
+            self._check()
+            if stage_deadline is not None and time.monotonic() > stage_deadline:
+                return False
+            time.sleep(self.poll_interval)
+        return True
@@ -1,13 +1,19 @@
-from drone_connection import connect_to_drone
-from PySide6.QtWidgets import (QLabel, QCheckBox, QLineEdit, QPushButton, QVBoxLayout, QHBoxLayout, QWidget, QButtonGroup)
+from drone_connection import ConnectionWorker
+from stream_rates import STREAM_PROFILES, DEFAULT_PROFILE
+from PySide6.QtCore import Signal
+from PySide6.QtWidgets import (QLabel, QCheckBox, QComboBox, QLineEdit, QPushButton, QVBoxLayout, QHBoxLayout, QWidget, QButtonGroup)
 
 class DroneConnectionPanel(QWidget):
+    stream_profile_changed = Signal(str)
+
     def __init__(self, connect_callback):
         super().__init__()
 
-        self.setFixedSize(400, 150) 
+        self.setFixedSize(400, 230) 
 
         self.connect_callback = connect_callback
+        self.worker = None
+        self.routers = []
 
         self.connection_label = QLabel("Connection Type:")
 
@@ -27,6 +33,16 @@ class DroneConnectionPanel(QWidget):
         self.connect_button = QPushButton("Connect")
         self.connect_button.clicked.connect(self.connect_drone)
 
+        self.progress_label = QLabel("")
+
+        self.share_checkbox = QCheckBox("Share link with local tools (TCP 127.0.0.1:5790)")
+
+        self.profile_label = QLabel("Stream profile:")
+        self.profile_box = QComboBox()
+        self.profile_box.addItems(list(STREAM_PROFILES))
+        self.profile_box.setCurrentText(DEFAULT_PROFILE)
+        self.profile_box.currentTextChanged.connect(self.stream_profile_changed.emit)
+
         layout = QVBoxLayout()
         layout.addWidget(self.connection_label)
         
@@ -37,11 +53,22 @@ class DroneConnectionPanel(QWidget):
 
         layout.addWidget(self.port_label)
         layout.addWidget(self.port_input)
+
+        profile_layout = QHBoxLayout()
+        profile_layout.addWidget(self.profile_label)
+        profile_layout.addWidget(self.profile_box)
+        layout.addLayout(profile_layout)
+        layout.addWidget(self.share_checkbox)
+
         layout.addWidget(self.connect_button)
+        layout.addWidget(self.progress_label)
 
         layout.addStretch()
         self.setLayout(layout)
 
+    def stream_profile(self):
+        return self.profile_box.currentText()
+
     def update_connection_input(self, button):
         if button == self.serial_checkbox:
             self.port_input.setPlaceholderText("Enter COM port (e.g., COM5)")
@@ -49,6 +76,11 @@ class DroneConnectionPanel(QWidget):
             self.port_input.setPlaceholderText("Enter IP address (e.g., 192.168.0.10)")
 
     def connect_drone(self):
+        if self.worker:
+            self.worker.cancel()
+            self.progress_label.setText("Cancelling...")
+            return
+
         connection_type = ""
         connection_value = self.port_input.text()
 
@@ -61,7 +93,39 @@ class DroneConnectionPanel(QWidget):
             return
 
         if connection_value:
-            vehicle = connect_to_drone(connection_type, connection_value)
-            self.connect_callback(vehicle)
+            self.worker = ConnectionWorker(connection_type, connection_value,
+                                           share_link=self.share_checkbox.isChecked(), parent=self)
+            self.worker.progress.connect(self.update_progress)
+            self.worker.connected.connect(self.on_connected)
+            self.worker.failed.connect(self.on_failed)
+            self.worker.finished.connect(self.on_worker_finished)
+            self.connect_button.setText("Cancel")
+            self.worker.start()
         else:
             print("Please enter the required information.")
+
+    def update_progress(self, stage, current, total):
+        if total:
+            self.progress_label.setText(f"Connecting: {stage} {current}/{total}")
+        else:
+            self.progress_label.setText(f"Connecting: {stage}")
+
+    def on_connected(self, vehicle):
+        self.progress_label.setText("Connected")
+        if self.worker.router:
+            self.routers.append(self.worker.router)
+        self.connect_callback(vehicle)
+
+    def on_failed(self, message):
+        print(message)
+        self.progress_label.setText(message)
+
+    def on_worker_finished(self):
+        self.worker.deleteLater()
+        self.worker = None
+        self.connect_button.setText("Connect")
+
+    def close_routers(self):
+        for router in self.routers:
+            router.stop()
+        self.routers = []
@@ -1,12 +1,17 @@
 from PySide6.QtWidgets import QHBoxLayout, QVBoxLayout, QPushButton, QLabel, QWidget
-from PySide6.QtCore import QTimer, Qt
+from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
-from dronekit import VehicleMode
+from indicator.frame_scheduler import frame_scheduler
+from command_executor import command_executor
+
+STATUS_RATE = 2
+TAKEOFF_ALTITUDE = 10
 
 class DroneControlPanel(QWidget):
     def __init__(self, vehicle):
         super().__init__()
         self.vehicle = vehicle
+        self.executor = command_executor()
 
         self.setFixedSize(400, 200) 
 
@@ -24,9 +29,10 @@ class DroneControlPanel(QWidget):
         self.mode_label.setAlignment(Qt.AlignCenter)
         self.update_mode_color("Unknown")
 
-        self.status_timer = QTimer()
-        self.status_timer.timeout.connect(self.update_status)
-        self.status_timer.start(100)
+        self.command_label = QLabel("")
+        self.command_label.setStyleSheet("color: white;")
+
+        self.status_consumer = frame_scheduler().register(self.update_status, STATUS_RATE, self.status_label)
 
     def setup_control_buttons(self, layout):
         status_layout = QHBoxLayout()
@@ -53,6 +59,7 @@ class DroneControlPanel(QWidget):
         takeoff_land_layout.addWidget(self.takeoff_button)
         takeoff_land_layout.addWidget(self.land_button)
         layout.addLayout(takeoff_land_layout)
+        layout.addWidget(self.command_label)
         layout.addStretch() 
 
     def update_status(self):
@@ -86,23 +93,33 @@ class DroneControlPanel(QWidget):
         color = color_map.get(mode, "#808080")
         self.mode_label.setStyleSheet(f"background-color: {color}; color: white; border-radius: 5px;")
 
+    def report(self, action):
+        def done(success, message):
+            text = f"{action}: {'OK' if success else 'failed'} ({message})"
+            print(text)
+            self.command_label.setText(text)
+        self.command_label.setText(f"{action}: waiting...")
+        return done
+
     def arm_drone(self):
         if self.vehicle:
-            self.vehicle.armed = True
-            print("Drone armed.")
+            self.executor.arm(self.vehicle, True, callback=self.report("Arm"))
 
     def disarm_drone(self):
         if self.vehicle:
-            self.vehicle.armed = False
-            print("Drone disarmed.")
+            self.executor.arm(self.vehicle, False, callback=self.report("Disarm"))
 
     def takeoff_drone(self):
         if self.vehicle:
-            print("Taking off to 10 meters...")
-            self.vehicle.mode = VehicleMode("GUIDED")
-            self.vehicle.simple_takeoff(10)
+            vehicle = self.vehicle
+            report = self.report(f"Takeoff to {TAKEOFF_ALTITUDE} m")
+            def guided(success, message):
+                if success:
+                    self.executor.takeoff(vehicle, TAKEOFF_ALTITUDE, callback=report)
+                else:
+                    report(False, f"GUIDED {message}")
+            self.executor.set_mode(vehicle, "GUIDED", callback=guided)
 
     def land_drone(self):
         if self.vehicle:
-            print("Landing...")
-            self.vehicle.mode = VehicleMode("LAND")
+            self.executor.set_mode(self.vehicle, "LAND", callback=self.report("Land"))
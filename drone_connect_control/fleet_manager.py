@@ -0,0 +1,71 @@
+from collections import OrderedDict
+from PySide6.QtCore import QObject, Signal
+
+class FleetManager(QObject):
+    vehicle_added = Signal(object, str)
+    vehicle_removed = Signal(object)
+    active_changed = Signal(object)
+
+    def __init__(self, telemetry_bus, parent=None):
+        super().__init__(parent)
+        self.telemetry_bus = telemetry_bus
+        self.vehicles = OrderedDict()
+        self.labels = {}
+        self.active_key = None
+        self._next_key = 1
+
+    def add(self, vehicle, label=None, activate=True):
+        key = self._next_key
+        self._next_key += 1
+        self.vehicles[key] = vehicle
+        self.labels[key] = label or f"Vehicle {key}"
+        self.telemetry_bus.attach(vehicle, key)
+        self.vehicle_added.emit(key, self.labels[key])
+        if activate or self.active_key is None:
+            self.set_active(key)
+        return key
+
+    def add_source(self, key, label, activate=False):
+        # A telemetry source without a dronekit vehicle behind it, e.g. a replayed log.
+        self.vehicles[key] = None
+        self.labels[key] = label
+        self.telemetry_bus.register(key)
+        self.vehicle_added.emit(key, label)
+        if activate or self.active_key is None:
+            self.set_active(key)
+        return key
+
+    def remove(self, key, close=True):
+        if key not in self.vehicles:
+            return
+        vehicle = self.vehicles.pop(key)
+        self.labels.pop(key, None)
+        self.telemetry_bus.detach(key)
+        if close and vehicle is not None:
+            try:
+                vehicle.close()
+            except Exception as e:
+                print(f"Error closing vehicle connection: {e}")
+        self.vehicle_removed.emit(key)
+        if key == self.active_key:
+            self.set_active(next(iter(self.vehicles), None))
+
+    def set_active(self, key):
+        if key is not None and key not in self.vehicles:
+            return
+        if key != self.active_key:
+            self.active_key = key
+            self.active_changed.emit(key)
+
+    def active_vehicle(self):
+        return self.vehicles.get(self.active_key)
+
+    def snapshot(self, key):
+        return self.telemetry_bus.snapshot(key)
+
+    def close(self):
+        for key in list(self.vehicles):
+            self.remove(key)
+
+    def __len__(self):
+        return len(self.vehicles)
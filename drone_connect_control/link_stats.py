@@ -0,0 +1,134 @@
+import json
+import struct
+import time
+from pymavlink import mavutil
+from mavlink_state import MAVLINK_V2_MAGIC
+
+TIMESYNC_INTERVAL = 1.0
+TIMESYNC_SMOOTHING = 0.2
+
+RADIO_STATUS_ID = mavutil.mavlink.MAVLINK_MSG_ID_RADIO_STATUS
+TIMESYNC_ID = mavutil.mavlink.MAVLINK_MSG_ID_TIMESYNC
+RADIO_STATUS_FORMAT = struct.Struct("<HHBBBBB")
+TIMESYNC_FORMAT = struct.Struct("<qq")
+
+def message_name(msgid):
+    cls = mavutil.mavlink.mavlink_map.get(msgid)
+    return cls.msgname if cls else str(msgid)
+
+def frame_payload(frame, size):
+    # MAVLink 2 trims trailing zero bytes from the payload, so pad back up to the wire size.
+    start = 10 if frame[0] == MAVLINK_V2_MAGIC else 6
+    payload = bytes(frame[start:start + frame[1]])
+    return payload + bytes(size - len(payload)) if len(payload) < size else payload[:size]
+
+class LinkStats:
+    # Counters are kept per msgid and per (sysid, compid), only for what has actually been seen;
+    # each source holds [last seq, received, lost] so on_frame() does one lookup per source.
+    def __init__(self):
+        self.counts = {}
+        self.sources = {}
+        self.radio = None
+        self.round_trip = None
+        self.timesync_pending = {}
+        self.next_timesync = 0.0
+        self.sender = None
+        self.rates = {}
+        self.rate_counts = {}
+        self.rate_time = time.monotonic()
+
+    def on_message(self, _vehicle, _name, message):
+        # dronekit message listener; the raw frame is still attached to the decoded message.
+        self.on_frame(message.get_msgbuf())
+
+    def on_frame(self, frame):
+        if frame[0] == MAVLINK_V2_MAGIC:
+            seq = frame[4]
+            source = (frame[5], frame[6])
+            msgid = frame[7] | (frame[8] << 8) | (frame[9] << 16)
+        else:
+            seq = frame[2]
+            source = (frame[3], frame[4])
+            msgid = frame[5]
+
+        counts = self.counts
+        counts[msgid] = counts.get(msgid, 0) + 1
+
+        counters = self.sources.get(source)
+        if counters is None:
+            self.sources[source] = [seq, 1, 0]
+        else:
+            counters[2] += (seq - counters[0] - 1) & 0xFF
+            counters[0] = seq
+            counters[1] += 1
+
+        if msgid == RADIO_STATUS_ID:
+            self.on_radio_status(frame)
+        elif msgid == TIMESYNC_ID:
+            self.on_timesync(frame)
+
+    def on_radio_status(self, frame):
+        rxerrors, fixed, rssi, remrssi, txbuf, noise, remnoise = RADIO_STATUS_FORMAT.unpack(
+            frame_payload(frame, RADIO_STATUS_FORMAT.size))
+        self.radio = {"rssi": rssi, "remrssi": remrssi, "noise": noise, "remnoise": remnoise,
+                      "txbuf": txbuf, "rxerrors": rxerrors, "fixed": fixed}
+
+    def on_timesync(self, frame):
+        tc1, ts1 = TIMESYNC_FORMAT.unpack(frame_payload(frame, TIMESYNC_FORMAT.size))
+        # tc1 == 0 is the vehicle asking us; a reply echoes our ts1 with its own clock in tc1.
+        if tc1 == 0 or self.timesync_pending.pop(ts1, None) is None:
+            return
+        round_trip = (time.monotonic_ns() - ts1) / 1e9
+        if self.round_trip is None:
+            self.round_trip = round_trip
+        else:
+            self.round_trip += TIMESYNC_SMOOTHING * (round_trip - self.round_trip)
+
+    def poll(self):
+        # Called from the GUI thread: refreshes the per-message rates and sends the next TIMESYNC probe.
+        now = time.monotonic()
+        elapsed = now - self.rate_time
+        if elapsed > 0:
+            # Copied first: on_frame() runs on the link thread and may add a msgid meanwhile.
+            counts = dict(self.counts)
+            self.rates = {msgid: (count - self.rate_counts.get(msgid, 0)) / elapsed
+                          for msgid, count in counts.items()}
+            self.rate_counts = counts
+            self.rate_time = now
+
+        if self.sender and now >= self.next_timesync:
+            self.next_timesync = now + TIMESYNC_INTERVAL
+            ts1 = time.monotonic_ns()
+            self.timesync_pending = {ts1: now}
+            try:
+                self.sender(0, ts1)
+            except Exception as e:
+                print(f"Error sending TIMESYNC: {e}")
+
+    def total_rate(self):
+        return sum(self.rates.values())
+
+    def source_stats(self):
+        stats = []
+        for (sysid, compid), (_, received, lost) in list(self.sources.items()):
+            stats.append({"sysid": sysid, "compid": compid, "received": received, "lost": lost,
+                          "loss": lost / (received + lost) if received + lost else 0.0})
+        return stats
+
+    def to_dict(self):
+        return {
+            "time": time.time(),
+            "messages": {message_name(msgid): {"msgid": msgid, "count": count,
+                                               "rate": round(self.rates.get(msgid, 0.0), 2)}
+                         for msgid, count in dict(self.counts).items()},
+            "sources": self.source_stats(),
+            "radio": self.radio,
+            "round_trip": self.round_trip,
+        }
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+def vehicle_timesync_sender(vehicle):
+    return lambda tc1, ts1: vehicle.send_mavlink(vehicle.message_factory.timesync_encode(tc1, ts1))
@@ -0,0 +1,70 @@
+from PySide6.QtWidgets import QFileDialog, QHBoxLayout, QLabel, QPushButton, QVBoxLayout, QWidget
+from indicator.frame_scheduler import frame_scheduler
+from link_stats import message_name
+
+PANEL_RATE = 2
+TOP_MESSAGES = 6
+
+class LinkStatsPanel(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.setFixedSize(400, 150)
+        self.stats = None
+
+        self.summary_label = QLabel("Link: no vehicle")
+        self.summary_label.setStyleSheet("color: white;")
+        self.messages_label = QLabel("")
+        self.messages_label.setStyleSheet("color: white; font-family: monospace;")
+
+        self.dump_button = QPushButton("Save JSON")
+        self.dump_button.clicked.connect(self.dump)
+
+        header = QHBoxLayout()
+        header.addWidget(self.summary_label, 1)
+        header.addWidget(self.dump_button)
+
+        layout = QVBoxLayout()
+        layout.addLayout(header)
+        layout.addWidget(self.messages_label)
+        layout.addStretch()
+        self.setLayout(layout)
+
+        frame_scheduler().register(self.update_stats, PANEL_RATE, self.summary_label)
+
+    def set_stats(self, stats):
+        self.stats = stats
+        self.update_stats()
+
+    def update_stats(self):
+        stats = self.stats
+        if stats is None:
+            self.summary_label.setText("Link: no vehicle")
+            self.messages_label.setText("")
+            return
+        stats.poll()
+
+        received = lost = 0
+        for source in stats.source_stats():
+            received += source["received"]
+            lost += source["lost"]
+        loss = lost / (received + lost) * 100 if received + lost else 0.0
+
+        summary = f"{stats.total_rate():.0f} msg/s  loss {loss:.1f}%"
+        if stats.round_trip is not None:
+            summary += f"  rtt {stats.round_trip * 1000:.0f} ms"
+        if stats.radio:
+            summary += f"\nrssi {stats.radio['rssi']}/{stats.radio['remrssi']}  noise {stats.radio['noise']}/{stats.radio['remnoise']}"
+        self.summary_label.setText(summary)
+
+        top = sorted(stats.rates.items(), key=lambda item: item[1], reverse=True)[:TOP_MESSAGES]
+        self.messages_label.setText("\n".join(f"{message_name(msgid):<24}{rate:6.1f} Hz" for msgid, rate in top))
+
+    def dump(self):
+        if self.stats is None:
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Save link statistics", "link_stats.json", "JSON (*.json)")
+        if path:
+            try:
+                self.stats.dump(path)
+            except Exception as e:
+                print(f"Error saving link statistics: {e}")
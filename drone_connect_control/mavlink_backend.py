@@ -0,0 +1,129 @@
+import threading
+import time
+from pymavlink import mavutil
+from mavlink_state import (AUTOPILOT_COMPONENT, MAVLINK_V1_MAGIC, MAVLINK_V2_MAGIC, MESSAGE_IDS, frame_compid,
+                           frame_crc_ok, frame_length, frame_msgid, frame_sysid, message_fields)
+
+READ_SIZE = 4096
+HEARTBEAT_INTERVAL = 1.0
+
+class FrameSplitter:
+    # Splits a raw byte stream into whole MAVLink frames without decoding them. A candidate frame
+    # whose checksum does not match is rejected and the search resumes one byte later, so a stray
+    # start byte on a noisy link costs only itself rather than the frames it appeared to cover.
+    def __init__(self):
+        self.buffer = bytearray()
+        self.rejected = 0
+
+    def feed(self, data):
+        self.buffer += data
+        buffer = self.buffer
+        frames = []
+        start = 0
+        end = len(buffer)
+        while start < end:
+            magic = buffer[start]
+            if magic != MAVLINK_V2_MAGIC and magic != MAVLINK_V1_MAGIC:
+                # Resynchronise on the next start-of-frame byte.
+                next_v2 = buffer.find(MAVLINK_V2_MAGIC, start + 1)
+                next_v1 = buffer.find(MAVLINK_V1_MAGIC, start + 1)
+                candidates = [index for index in (next_v2, next_v1) if index >= 0]
+                start = min(candidates) if candidates else end
+                continue
+            if end - start < 3:
+                break
+            length = frame_length(buffer[start:start + 3])
+            if end - start < length:
+                break
+            frame = bytes(buffer[start:start + length])
+            if not frame_crc_ok(frame):
+                self.rejected += 1
+                start += 1
+                continue
+            frames.append(frame)
+            start += length
+        del buffer[:start]
+        return frames
+
+class MavlinkTelemetryBackend(threading.Thread):
+    # Reads a mavutil link directly and decodes only the message types the gauges show,
+    # publishing into the same telemetry bus the dronekit listeners feed.
+    def __init__(self, connection_string, telemetry_bus, key, baud=57600, message_ids=None):
+        super().__init__(name="mavlink-telemetry", daemon=True)
+        self.connection_string = connection_string
+        self.telemetry_bus = telemetry_bus
+        self.key = key
+        self.baud = baud
+        self.message_ids = set(MESSAGE_IDS if message_ids is None else message_ids)
+        self.splitter = FrameSplitter()
+        self.running = threading.Event()
+        self.connection = None
+        # Learned from the first autopilot HEARTBEAT; everything else on the link is ignored.
+        self.target_system = None
+        self.frames = 0
+        self.decoded = 0
+        self.errors = 0
+        self.frame_listeners = []
+
+    def add_frame_listener(self, listener):
+        # listener(frame_bytes) runs on the backend thread for every frame, decoded or not.
+        self.frame_listeners.append(listener)
+
+    def stop(self):
+        self.running.clear()
+
+    def send_timesync(self, tc1, ts1):
+        # Called from other threads; the link does not exist before run() opens it or after it closes.
+        connection = self.connection
+        if connection is not None and self.running.is_set():
+            connection.mav.timesync_send(tc1, ts1)
+
+    def run(self):
+        self.connection = mavutil.mavlink_connection(self.connection_string, baud=self.baud, source_system=255)
+        mav = self.connection.mav
+        self.running.set()
+        next_heartbeat = 0.0
+        while self.running.is_set():
+            now = time.monotonic()
+            if now >= next_heartbeat:
+                mav.heartbeat_send(mavutil.mavlink.MAV_TYPE_GCS, mavutil.mavlink.MAV_AUTOPILOT_INVALID, 0, 0, 0)
+                next_heartbeat = now + HEARTBEAT_INTERVAL
+
+            data = self.connection.recv(READ_SIZE)
+            if not data:
+                time.sleep(0.001)
+                continue
+            self.process(data, mav)
+        self.connection.close()
+
+    def process(self, data, mav):
+        fields = {}
+        for frame in self.splitter.feed(data):
+            self.frames += 1
+            for listener in self.frame_listeners:
+                listener(frame)
+            msgid = frame_msgid(frame)
+            # Gimbals, companion computers and other GCSs share the link; only the autopilot
+            # of the vehicle this backend follows may update its state.
+            if frame_compid(frame) != AUTOPILOT_COMPONENT:
+                continue
+            if self.target_system is None:
+                if msgid != mavutil.mavlink.MAVLINK_MSG_ID_HEARTBEAT:
+                    continue
+            elif frame_sysid(frame) != self.target_system or msgid not in self.message_ids:
+                continue
+            try:
+                msg = mav.decode(bytearray(frame))
+            except Exception:
+                self.errors += 1
+                continue
+            if self.target_system is None:
+                if msg.type == mavutil.mavlink.MAV_TYPE_GCS or msg.autopilot == mavutil.mavlink.MAV_AUTOPILOT_INVALID:
+                    continue
+                self.target_system = frame_sysid(frame)
+                if msgid not in self.message_ids:
+                    continue
+            self.decoded += 1
+            fields.update(message_fields(msg))
+        if fields:
+            self.telemetry_bus.publish(self.key, fields)
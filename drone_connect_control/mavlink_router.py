@@ -0,0 +1,324 @@
+import argparse
+import selectors
+import socket
+import threading
+import time
+from pymavlink import mavutil
+from mavlink_backend import FrameSplitter
+from mavlink_state import frame_msgid, frame_sysid
+
+READ_SIZE = 4096
+LOCAL_GCS_PORT = 14560
+SHARE_TCP_PORT = 5790
+# Unsent bytes a TCP client may fall behind by before further frames to it are dropped.
+MAX_PENDING = 256 * 1024
+# How long start_local_router() waits for the physical link to open before handing it to the GCS.
+LINK_OPEN_TIMEOUT = 10.0
+
+# Message ids that carry target_system/target_component; only these are ever decoded by the router.
+TARGETED_MESSAGES = {
+    msgid for msgid, cls in mavutil.mavlink.mavlink_map.items()
+    if "target_system" in cls.fieldnames
+}
+
+class MessageFilter:
+    def __init__(self, allow=None, block=None):
+        self.allow = self.message_ids(allow) if allow else None
+        self.block = self.message_ids(block) if block else set()
+
+    @staticmethod
+    def message_ids(names):
+        ids = set()
+        for name in names:
+            ids.add(int(name) if str(name).isdigit() else getattr(mavutil.mavlink, f"MAVLINK_MSG_ID_{str(name).upper()}"))
+        return ids
+
+    def accepts(self, msgid):
+        if msgid in self.block:
+            return False
+        return self.allow is None or msgid in self.allow
+
+class RouterClient:
+    # address is set for datagram clients; stream clients keep the unsent tail of a frame in pending so
+    # a partial write never leaves half a frame on the stream. owner is the udp-server peer dict, if any.
+    def __init__(self, name, sock, address=None, message_filter=None, owner=None):
+        self.name = name
+        self.sock = sock
+        self.address = address
+        self.filter = message_filter
+        self.owner = owner
+        self.splitter = FrameSplitter()
+        self.systems = set()
+        self.pending = bytearray()
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+
+    def send(self, frame):
+        # Returns True when the client now has unsent bytes and needs a write event.
+        if self.address is not None:
+            try:
+                self.sock.sendto(frame, self.address)
+                self.sent += 1
+            except (BlockingIOError, InterruptedError, ConnectionRefusedError):
+                # ConnectionRefusedError: nobody listening on that port (yet).
+                self.dropped += 1
+            return False
+        if self.pending:
+            if len(self.pending) + len(frame) > MAX_PENDING:
+                self.dropped += 1
+            else:
+                self.pending += frame
+                self.sent += 1
+            return False
+        try:
+            written = self.sock.send(frame)
+        except (BlockingIOError, InterruptedError):
+            written = 0
+        self.sent += 1
+        if written < len(frame):
+            self.pending += frame[written:]
+            return True
+        return False
+
+    def flush(self):
+        # Returns True once everything pending has been written.
+        try:
+            written = self.sock.send(self.pending)
+        except (BlockingIOError, InterruptedError):
+            return False
+        del self.pending[:written]
+        return not self.pending
+
+class MavlinkRouter(threading.Thread):
+    # Owns the physical link and forwards whole frames, as received, to every client. Frames from
+    # clients go to the vehicle; frames addressed to a system are sent only to the client that owns it.
+    def __init__(self, master, baud=57600):
+        super().__init__(name="mavlink-router", daemon=True)
+        self.master = master
+        self.baud = baud
+        self.link = None
+        self.splitter = FrameSplitter()
+        self.decoder = mavutil.mavlink.MAVLink(None)
+        self.selector = selectors.DefaultSelector()
+        self.clients = []
+        self.lock = threading.Lock()
+        self.running = threading.Event()
+        # Set once the link has been opened or has failed to open; error holds the failure.
+        self.opened = threading.Event()
+        self.error = None
+
+    def add_udp_client(self, host, port, message_filter=None):
+        # Sends to a fixed address, e.g. a GCS listening with udpin; replies come back on the same socket.
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        client = RouterClient(f"udp:{host}:{port}", sock, (host, port), message_filter)
+        self.register(sock, client)
+        return client
+
+    def add_udp_server(self, port, host="127.0.0.1", message_filter=None):
+        # Listens like udpin; every source address that sends a frame becomes its own client.
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        sock.setblocking(False)
+        with self.lock:
+            self.selector.register(sock, selectors.EVENT_READ, ("udp-server", {}, message_filter))
+
+    def add_tcp_server(self, port, host="127.0.0.1", message_filter=None):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind((host, port))
+        server.listen()
+        server.setblocking(False)
+        with self.lock:
+            self.selector.register(server, selectors.EVENT_READ, ("tcp-server", None, message_filter))
+
+    def register(self, sock, client):
+        with self.lock:
+            self.clients.append(client)
+            self.selector.register(sock, selectors.EVENT_READ, ("client", client, None))
+
+    def remove(self, client):
+        client.closed = True
+        with self.lock:
+            if client in self.clients:
+                self.clients.remove(client)
+            if client.owner is None:
+                self.selector.unregister(client.sock)
+        if client.owner is None:
+            client.sock.close()
+        else:
+            client.owner.pop(client.address, None)
+
+    def deliver(self, client, frame):
+        if client.closed:
+            return
+        try:
+            if client.send(frame):
+                with self.lock:
+                    self.selector.modify(client.sock, selectors.EVENT_READ | selectors.EVENT_WRITE,
+                                         ("client", client, None))
+        except OSError as e:
+            # A client that went away must never take the router (and the GCS's link) down with it.
+            print(f"Error sending to router client {client.name}: {e}")
+            self.remove(client)
+
+    def stop(self):
+        self.running.clear()
+
+    def run(self):
+        try:
+            self.link = mavutil.mavlink_connection(self.master, baud=self.baud)
+        except Exception as e:
+            # e.g. a serial port that is missing or held by another program
+            self.error = e
+            print(f"Error opening router link {self.master}: {e}")
+            self.close_sockets()
+            self.opened.set()
+            return
+        self.running.set()
+        self.opened.set()
+        while self.running.is_set():
+            with self.lock:
+                # select() with no sockets is an error on Windows
+                events = self.selector.select(timeout=0.005) if self.selector.get_map() else []
+            if not events and not self.selector.get_map():
+                time.sleep(0.005)
+            for key, mask in events:
+                try:
+                    self.handle_socket(key.fileobj, mask, *key.data)
+                except OSError as e:
+                    print(f"Error on router socket: {e}")
+            data = self.link.recv(READ_SIZE)
+            if data:
+                self.route_from_vehicle(self.splitter.feed(data))
+        self.close_sockets()
+        self.link.close()
+
+    def close_sockets(self):
+        for client_key in list(self.selector.get_map().values()):
+            client_key.fileobj.close()
+
+    def handle_socket(self, sock, mask, kind, client, message_filter):
+        if kind == "tcp-server":
+            connection, address = sock.accept()
+            connection.setblocking(False)
+            self.register(connection, RouterClient(f"tcp:{address[0]}:{address[1]}", connection,
+                                                   message_filter=message_filter))
+        elif kind == "udp-server":
+            data, address = sock.recvfrom(65535)
+            peer = client.get(address)
+            if peer is None:
+                peer = client[address] = RouterClient(f"udp:{address[0]}:{address[1]}", sock, address,
+                                                      message_filter, owner=client)
+                with self.lock:
+                    self.clients.append(peer)
+            self.route_from_client(peer, data)
+        else:
+            if client.closed:
+                return
+            if mask & selectors.EVENT_WRITE:
+                try:
+                    done = client.flush()
+                except OSError as e:
+                    print(f"Error sending to router client {client.name}: {e}")
+                    self.remove(client)
+                    return
+                if done:
+                    with self.lock:
+                        self.selector.modify(sock, selectors.EVENT_READ, ("client", client, None))
+            if not mask & selectors.EVENT_READ:
+                return
+            try:
+                data = sock.recv(65535)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                data = b""
+            if not data and sock.type == socket.SOCK_STREAM:
+                self.remove(client)
+                return
+            self.route_from_client(client, data)
+
+    def route_from_vehicle(self, frames):
+        clients = list(self.clients)
+        for frame in frames:
+            msgid = frame_msgid(frame)
+            target = self.target_system(frame, msgid)
+            for client in clients:
+                if target and client.systems and target not in client.systems:
+                    continue
+                if client.filter is None or client.filter.accepts(msgid):
+                    self.deliver(client, frame)
+
+    def route_from_client(self, client, data):
+        for frame in client.splitter.feed(data):
+            client.systems.add(frame_sysid(frame))
+            self.link.write(frame)
+            target = self.target_system(frame, frame_msgid(frame))
+            if target:
+                # Client-to-client traffic, e.g. a companion script commanding another GCS component.
+                for other in list(self.clients):
+                    if other is not client and target in other.systems:
+                        self.deliver(other, frame)
+
+    def target_system(self, frame, msgid):
+        if msgid not in TARGETED_MESSAGES:
+            return 0
+        try:
+            return self.decoder.decode(bytearray(frame)).target_system
+        except Exception:
+            return 0
+
+def start_local_router(master, baud=57600, local_port=LOCAL_GCS_PORT, share_port=None, share_host="127.0.0.1"):
+    # Router for the GCS itself: the GCS connects to udp:127.0.0.1:<local_port>. Other tools can connect
+    # over TCP only when share_port is given, and only from this machine unless share_host says otherwise.
+    router = MavlinkRouter(master, baud)
+    router.add_udp_client("127.0.0.1", local_port)
+    if share_port:
+        router.add_tcp_server(share_port, share_host)
+    router.start()
+    router.opened.wait(LINK_OPEN_TIMEOUT)
+    if router.error is not None:
+        raise ConnectionError(f"could not open {master}: {router.error}")
+    return router, f"udp:127.0.0.1:{local_port}"
+
+def parse_endpoint(value):
+    # host:port[:allow=NAME,NAME][:block=NAME,NAME]
+    parts = value.split(":")
+    allow = block = None
+    for option in parts[2:]:
+        name, _, names = option.partition("=")
+        if name == "allow":
+            allow = names.split(",")
+        elif name == "block":
+            block = names.split(",")
+    message_filter = MessageFilter(allow, block) if allow or block else None
+    return parts[0], int(parts[1]), message_filter
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Share one MAVLink link with several local consumers.")
+    parser.add_argument("--master", required=True, help="link to own, e.g. /dev/ttyUSB0 or tcp:192.168.0.10:5760")
+    parser.add_argument("--baud", type=int, default=57600)
+    parser.add_argument("--udp-out", action="append", default=[], metavar="HOST:PORT[:allow=..][:block=..]")
+    parser.add_argument("--udp-in", action="append", default=[], metavar="HOST:PORT[:allow=..][:block=..]")
+    parser.add_argument("--tcp-server", action="append", default=[], metavar="HOST:PORT[:allow=..][:block=..]")
+    args = parser.parse_args()
+
+    mavlink_router = MavlinkRouter(args.master, args.baud)
+    for endpoint in args.udp_out:
+        host, port, endpoint_filter = parse_endpoint(endpoint)
+        mavlink_router.add_udp_client(host, port, endpoint_filter)
+    for endpoint in args.udp_in:
+        host, port, endpoint_filter = parse_endpoint(endpoint)
+        mavlink_router.add_udp_server(port, host, endpoint_filter)
+    for endpoint in args.tcp_server:
+        host, port, endpoint_filter = parse_endpoint(endpoint)
+        mavlink_router.add_tcp_server(port, host, endpoint_filter)
+    mavlink_router.start()
+    try:
+        mavlink_router.join()
+    except KeyboardInterrupt:
+        mavlink_router.stop()
+        mavlink_router.join()
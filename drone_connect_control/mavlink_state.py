@@ -0,0 +1,96 @@
+from pymavlink import mavutil
+
+MAVLINK_V1_MAGIC = 0xFE
+MAVLINK_V2_MAGIC = 0xFD
+MAVLINK_SIGNATURE_LENGTH = 13
+MAVLINK_IFLAG_SIGNED = 0x01
+AUTOPILOT_COMPONENT = 1  # MAV_COMP_ID_AUTOPILOT1
+
+# msgid -> CRC_EXTRA seed byte for the checksum
+CRC_EXTRA = {msgid: cls.crc_extra for msgid, cls in mavutil.mavlink.mavlink_map.items()}
+
+def _crc_table():
+    # CRC-16/MCRF4XX (MAVLink's "X.25" checksum), reflected polynomial 0x8408.
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0x8408 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+CRC_TABLE = _crc_table()
+
+def frame_length(header):
+    # Total frame length from the first bytes of a MAVLink v1/v2 frame, or 0 if it is not one.
+    if header[0] == MAVLINK_V2_MAGIC and len(header) >= 3:
+        signed = header[2] & MAVLINK_IFLAG_SIGNED
+        return 12 + header[1] + (MAVLINK_SIGNATURE_LENGTH if signed else 0)
+    if header[0] == MAVLINK_V1_MAGIC and len(header) >= 2:
+        return 8 + header[1]
+    return 0
+
+def frame_msgid(frame):
+    if frame[0] == MAVLINK_V2_MAGIC:
+        return frame[7] | (frame[8] << 8) | (frame[9] << 16)
+    return frame[5]
+
+def frame_sysid(frame):
+    return frame[5] if frame[0] == MAVLINK_V2_MAGIC else frame[3]
+
+def frame_compid(frame):
+    return frame[6] if frame[0] == MAVLINK_V2_MAGIC else frame[4]
+
+def frame_crc_ok(frame):
+    # Frames of message types this dialect does not know cannot be checked and are let through.
+    crc_extra = CRC_EXTRA.get(frame_msgid(frame))
+    if crc_extra is None:
+        return True
+    end = (10 if frame[0] == MAVLINK_V2_MAGIC else 6) + frame[1]
+    table = CRC_TABLE
+    crc = 0xFFFF
+    for byte in frame[1:end]:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    crc = (crc >> 8) ^ table[(crc ^ crc_extra) & 0xFF]
+    return crc == frame[end] | (frame[end + 1] << 8)
+
+def _attitude(msg):
+    return {"roll": msg.roll, "pitch": msg.pitch}
+
+def _global_position_int(msg):
+    fields = {"lat": msg.lat / 1e7, "lon": msg.lon / 1e7, "altitude": msg.relative_alt / 1000.0}
+    if msg.hdg != 65535:
+        fields["heading"] = msg.hdg // 100
+    return fields
+
+def _vfr_hud(msg):
+    return {"groundspeed": msg.groundspeed, "airspeed": msg.airspeed, "heading": msg.heading}
+
+def _heartbeat(msg):
+    if msg.type == mavutil.mavlink.MAV_TYPE_GCS:
+        return {}
+    return {
+        "armed": bool(msg.base_mode & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED),
+        "mode": mavutil.mode_string_v10(msg),
+    }
+
+def _sys_status(msg):
+    return {
+        "battery_voltage": msg.voltage_battery / 1000.0 if msg.voltage_battery != 65535 else None,
+        "battery_remaining": msg.battery_remaining if msg.battery_remaining >= 0 else None,
+    }
+
+# MAVLink message type -> function returning the telemetry bus fields it carries
+MESSAGE_FIELDS = {
+    "ATTITUDE": _attitude,
+    "GLOBAL_POSITION_INT": _global_position_int,
+    "VFR_HUD": _vfr_hud,
+    "HEARTBEAT": _heartbeat,
+    "SYS_STATUS": _sys_status,
+}
+
+MESSAGE_IDS = {getattr(mavutil.mavlink, f"MAVLINK_MSG_ID_{name}"): name for name in MESSAGE_FIELDS}
+
+def message_fields(msg):
+    to_fields = MESSAGE_FIELDS.get(msg.get_type())
+    return to_fields(msg) if to_fields else {}
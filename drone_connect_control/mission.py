@@ -0,0 +1,318 @@
+import threading
+import time
+import numpy as np
+from pymavlink import mavutil
+from PySide6.QtCore import QObject, Signal
+from indicator.frame_scheduler import frame_scheduler
+
+MISSION_TYPE = mavutil.mavlink.MAV_MISSION_TYPE_MISSION
+DEFAULT_ALTITUDE = 30.0
+DOWNLOAD_WINDOW = 8
+ITEM_TIMEOUT = 1.5
+MAX_RETRIES = 5
+CHECK_RATE = 10
+
+# One row per mission item, laid out like MISSION_ITEM_INT (lat/lon in degE7).
+MISSION_DTYPE = np.dtype([
+    ("command", "<u2"), ("frame", "u1"), ("autocontinue", "u1"),
+    ("param1", "<f4"), ("param2", "<f4"), ("param3", "<f4"), ("param4", "<f4"),
+    ("x", "<i4"), ("y", "<i4"), ("z", "<f4"),
+])
+
+class MissionModel(QObject):
+    changed = Signal()
+
+    def __init__(self, capacity=64, parent=None):
+        super().__init__(parent)
+        self.items = np.zeros(capacity, dtype=MISSION_DTYPE)
+        self.count = 0
+        self.default_altitude = DEFAULT_ALTITUDE
+
+    def __len__(self):
+        return self.count
+
+    def rows(self):
+        return self.items[:self.count]
+
+    def _reserve(self, count):
+        if count > len(self.items):
+            grown = np.zeros(max(count, len(self.items) * 2), dtype=MISSION_DTYPE)
+            grown[:self.count] = self.items[:self.count]
+            self.items = grown
+
+    def insert(self, index, lat, lon, altitude=None, command=mavutil.mavlink.MAV_CMD_NAV_WAYPOINT):
+        self._reserve(self.count + 1)
+        self.items[index + 1:self.count + 1] = self.items[index:self.count]
+        self.items[index] = (command, mavutil.mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT, 1, 0, 0, 0, 0,
+                             int(round(lat * 1e7)), int(round(lon * 1e7)),
+                             self.default_altitude if altitude is None else altitude)
+        self.count += 1
+        self.changed.emit()
+
+    def append(self, lat, lon, altitude=None, command=mavutil.mavlink.MAV_CMD_NAV_WAYPOINT):
+        self.insert(self.count, lat, lon, altitude, command)
+
+    def move(self, index, lat, lon):
+        if 0 <= index < self.count:
+            self.items["x"][index] = int(round(lat * 1e7))
+            self.items["y"][index] = int(round(lon * 1e7))
+            self.changed.emit()
+
+    def remove(self, index):
+        if 0 <= index < self.count:
+            self.items[index:self.count - 1] = self.items[index + 1:self.count]
+            self.count -= 1
+            self.changed.emit()
+
+    def clear(self):
+        self.count = 0
+        self.changed.emit()
+
+    def set_rows(self, rows):
+        self._reserve(len(rows))
+        self.items[:len(rows)] = rows
+        self.count = len(rows)
+        self.changed.emit()
+
+    def coordinates(self):
+        rows = self.rows()
+        return np.column_stack((rows["x"] / 1e7, rows["y"] / 1e7)).tolist()
+
+class MissionTransfer(QObject):
+    # "upload" / "download", items done, total
+    progress = Signal(str, int, int)
+    # "upload" / "download", success, message
+    finished = Signal(str, bool, str)
+    downloaded = Signal(object)
+
+    # Requests from the vehicle are answered directly on dronekit's receive thread from items encoded
+    # before the transfer starts, so an upload runs at the speed the vehicle asks. Downloads keep
+    # `window` requests in flight and, on a timeout, re-request only the items still missing.
+    def __init__(self, vehicle, window=DOWNLOAD_WINDOW, timeout=ITEM_TIMEOUT, retries=MAX_RETRIES,
+                 home_item=True, parent=None):
+        super().__init__(parent)
+        self.vehicle = vehicle
+        self.factory = vehicle.message_factory
+        self.window = window
+        self.timeout = timeout
+        self.retries = retries
+        # ArduPilot keeps the home position in item 0; it is not part of the editable mission.
+        self.home_item = home_item
+        master = getattr(vehicle, "_master", None)
+        self.target = (getattr(master, "target_system", 0), getattr(master, "target_component", 0))
+
+        self._lock = threading.Lock()
+        self.state = None
+        self.consumer = None
+        self.reset()
+
+        self.listeners = (
+            ("MISSION_REQUEST_INT", self.on_request),
+            ("MISSION_REQUEST", self.on_request),
+            ("MISSION_ACK", self.on_ack),
+            ("MISSION_COUNT", self.on_count),
+            ("MISSION_ITEM_INT", self.on_item),
+        )
+        for name, listener in self.listeners:
+            vehicle.add_message_listener(name, listener)
+
+    def reset(self):
+        self.total = None
+        self.done = 0
+        self.attempts = 0
+        self.deadline = 0.0
+        self.encoded = []
+        self.requested = None
+        self.last_requested = None
+        self.rows = None
+        self.received = None
+        self.next_seq = 0
+
+    def close(self):
+        self.cancel()
+        for name, listener in self.listeners:
+            self.vehicle.remove_message_listener(name, listener)
+
+    def busy(self):
+        return self.state is not None
+
+    def upload(self, rows):
+        if self.busy():
+            return False
+        if self.home_item:
+            home = np.zeros(1, dtype=MISSION_DTYPE)
+            home[0] = rows[0] if len(rows) else home[0]
+            home["command"] = mavutil.mavlink.MAV_CMD_NAV_WAYPOINT
+            rows = np.concatenate((home, rows))
+        target_system, target_component = self.target
+        encoded = []
+        for seq, row in enumerate(rows):
+            encoded.append(self.factory.mission_item_int_encode(
+                target_system, target_component, seq, int(row["frame"]), int(row["command"]), 0, int(row["autocontinue"]),
+                float(row["param1"]), float(row["param2"]), float(row["param3"]), float(row["param4"]),
+                int(row["x"]), int(row["y"]), float(row["z"]), MISSION_TYPE))
+        with self._lock:
+            self.reset()
+            self.encoded = encoded
+            self.total = len(encoded)
+            self.requested = np.zeros(self.total, dtype=bool)
+            self.state = "upload"
+            self.deadline = time.monotonic() + self.timeout
+        self._send_count()
+        self._ensure_consumer()
+        return True
+
+    def download(self):
+        if self.busy():
+            return False
+        with self._lock:
+            self.reset()
+            self.state = "download"
+            self.deadline = time.monotonic() + self.timeout
+        self._send_request_list()
+        self._ensure_consumer()
+        return True
+
+    def cancel(self):
+        with self._lock:
+            state, self.state = self.state, None
+        if state:
+            self._send_cancel()
+            self.finished.emit(state, False, "cancelled")
+
+    def _send_cancel(self):
+        # Takes the vehicle out of its transfer state.
+        self.vehicle.send_mavlink(self.factory.mission_ack_encode(
+            *self.target, mavutil.mavlink.MAV_MISSION_OPERATION_CANCELLED, MISSION_TYPE))
+
+    def _send_count(self):
+        self.vehicle.send_mavlink(self.factory.mission_count_encode(*self.target, self.total, MISSION_TYPE))
+
+    def _send_request_list(self):
+        self.vehicle.send_mavlink(self.factory.mission_request_list_encode(*self.target, MISSION_TYPE))
+
+    def _request(self, seq):
+        self.vehicle.send_mavlink(self.factory.mission_request_int_encode(*self.target, seq, MISSION_TYPE))
+
+    def on_request(self, _vehicle, _name, msg):
+        if getattr(msg, "mission_type", MISSION_TYPE) != MISSION_TYPE:
+            return
+        with self._lock:
+            if self.state != "upload" or msg.seq >= self.total:
+                return
+            item = self.encoded[msg.seq]
+            if not self.requested[msg.seq]:
+                self.requested[msg.seq] = True
+                self.done += 1
+            self.last_requested = msg.seq
+            done = self.done
+            self.attempts = 0
+            self.deadline = time.monotonic() + self.timeout
+        self.vehicle.send_mavlink(item)
+        self.progress.emit("upload", done, self.total)
+
+    def on_ack(self, _vehicle, _name, msg):
+        if getattr(msg, "mission_type", MISSION_TYPE) != MISSION_TYPE:
+            return
+        with self._lock:
+            if self.state != "upload":
+                return
+            self.state = None
+        if msg.type == mavutil.mavlink.MAV_MISSION_ACCEPTED:
+            self.finished.emit("upload", True, f"{self.total} items")
+        else:
+            entry = mavutil.mavlink.enums["MAV_MISSION_RESULT"].get(msg.type)
+            self.finished.emit("upload", False, entry.name if entry else str(msg.type))
+
+    def on_count(self, _vehicle, _name, msg):
+        if getattr(msg, "mission_type", MISSION_TYPE) != MISSION_TYPE:
+            return
+        with self._lock:
+            if self.state != "download" or self.total is not None:
+                return
+            self.total = msg.count
+            self.rows = np.zeros(self.total, dtype=MISSION_DTYPE)
+            self.received = np.zeros(self.total, dtype=bool)
+            self.next_seq = min(self.window, self.total)
+            self.attempts = 0
+            self.deadline = time.monotonic() + self.timeout
+        if msg.count == 0:
+            self._download_complete()
+            return
+        for seq in range(self.next_seq):
+            self._request(seq)
+
+    def on_item(self, _vehicle, _name, msg):
+        if getattr(msg, "mission_type", MISSION_TYPE) != MISSION_TYPE:
+            return
+        with self._lock:
+            if self.state != "download" or self.total is None or msg.seq >= self.total or self.received[msg.seq]:
+                return
+            self.rows[msg.seq] = (msg.command, msg.frame, msg.autocontinue, msg.param1, msg.param2, msg.param3,
+                                  msg.param4, msg.x, msg.y, msg.z)
+            self.received[msg.seq] = True
+            self.done += 1
+            done = self.done
+            self.attempts = 0
+            self.deadline = time.monotonic() + self.timeout
+            # Keep the pipeline full: every item that arrives releases one more request.
+            next_seq = self.next_seq if self.next_seq < self.total else None
+            if next_seq is not None:
+                self.next_seq += 1
+        if next_seq is not None:
+            self._request(next_seq)
+        self.progress.emit("download", done, self.total)
+        if done == self.total:
+            self._download_complete()
+
+    def _download_complete(self):
+        with self._lock:
+            if self.state != "download":
+                return
+            self.state = None
+            rows = self.rows[1:] if self.home_item and len(self.rows) else self.rows
+        self.vehicle.send_mavlink(self.factory.mission_ack_encode(*self.target, mavutil.mavlink.MAV_MISSION_ACCEPTED, MISSION_TYPE))
+        self.downloaded.emit(rows.copy())
+        self.finished.emit("download", True, f"{len(rows)} items")
+
+    def check(self):
+        now = time.monotonic()
+        with self._lock:
+            state = self.state
+            if state is None or now < self.deadline:
+                retry = None
+            elif self.attempts >= self.retries:
+                self.state = None
+                retry = "failed"
+                all_sent = state == "upload" and self.done == self.total
+            else:
+                self.attempts += 1
+                self.deadline = now + self.timeout
+                if state == "upload":
+                    # The vehicle drives an upload; if it goes quiet, the last item (or the final
+                    # MISSION_ACK) was lost, and sending that item again makes it repeat itself.
+                    retry = "count" if self.last_requested is None else ("item", self.encoded[self.last_requested])
+                elif self.total is None:
+                    retry = "list"
+                else:
+                    retry = np.flatnonzero(~self.received[:self.next_seq])[:self.window].tolist()
+
+        if state is None:
+            frame_scheduler().unregister(self.consumer)
+            self.consumer = None
+        elif retry == "failed":
+            self._send_cancel()
+            self.finished.emit(state, False, "no final acknowledgement" if all_sent else "timed out")
+        elif retry == "count":
+            self._send_count()
+        elif retry == "list":
+            self._send_request_list()
+        elif isinstance(retry, tuple):
+            self.vehicle.send_mavlink(retry[1])
+        elif isinstance(retry, list):
+            for seq in retry:
+                self._request(seq)
+
+    def _ensure_consumer(self):
+        if self.consumer is None:
+            self.consumer = frame_scheduler().register(self.check, CHECK_RATE)
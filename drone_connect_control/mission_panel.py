@@ -0,0 +1,82 @@
+from PySide6.QtWidgets import QHBoxLayout, QLabel, QPushButton, QSpinBox, QVBoxLayout, QWidget
+from mission import MissionTransfer
+
+class MissionPanel(QWidget):
+    def __init__(self, model, map_widget):
+        super().__init__()
+        self.setFixedSize(400, 90)
+        self.model = model
+        self.map_widget = map_widget
+        self.vehicle = None
+        self.transfer = None
+
+        self.edit_button = QPushButton("Edit waypoints")
+        self.edit_button.setCheckable(True)
+        self.edit_button.toggled.connect(self.map_widget.set_mission_editing)
+
+        self.altitude_box = QSpinBox()
+        self.altitude_box.setRange(1, 500)
+        self.altitude_box.setSuffix(" m")
+        self.altitude_box.setValue(int(model.default_altitude))
+        self.altitude_box.valueChanged.connect(self.set_default_altitude)
+
+        self.upload_button = QPushButton("Upload")
+        self.upload_button.clicked.connect(self.upload)
+        self.download_button = QPushButton("Download")
+        self.download_button.clicked.connect(self.download)
+        self.clear_button = QPushButton("Clear")
+        self.clear_button.clicked.connect(self.model.clear)
+
+        self.status_label = QLabel("Mission: 0 items")
+        self.status_label.setStyleSheet("color: white;")
+        self.model.changed.connect(self.update_count)
+
+        edit_layout = QHBoxLayout()
+        edit_layout.addWidget(self.edit_button)
+        edit_layout.addWidget(self.altitude_box)
+        edit_layout.addWidget(self.status_label, 1)
+
+        transfer_layout = QHBoxLayout()
+        transfer_layout.addWidget(self.upload_button)
+        transfer_layout.addWidget(self.download_button)
+        transfer_layout.addWidget(self.clear_button)
+
+        layout = QVBoxLayout()
+        layout.addLayout(edit_layout)
+        layout.addLayout(transfer_layout)
+        self.setLayout(layout)
+
+    def set_vehicle(self, vehicle):
+        if self.transfer:
+            self.transfer.close()
+            self.transfer.deleteLater()
+            self.transfer = None
+        self.vehicle = vehicle
+        if vehicle is not None:
+            self.transfer = MissionTransfer(vehicle, parent=self)
+            self.transfer.progress.connect(self.update_progress)
+            self.transfer.finished.connect(self.on_finished)
+            self.transfer.downloaded.connect(self.model.set_rows)
+
+    def set_default_altitude(self, altitude):
+        self.model.default_altitude = float(altitude)
+
+    def upload(self):
+        if self.transfer and self.transfer.upload(self.model.rows()):
+            self.status_label.setText("Uploading...")
+
+    def download(self):
+        if self.transfer and self.transfer.download():
+            self.status_label.setText("Downloading...")
+
+    def update_progress(self, direction, done, total):
+        self.status_label.setText(f"{direction.capitalize()} {done}/{total}")
+
+    def on_finished(self, direction, success, message):
+        text = f"{direction.capitalize()} {'done' if success else 'failed'}: {message}"
+        print(text)
+        self.status_label.setText(text)
+
+    def update_count(self):
+        if not (self.transfer and self.transfer.busy()):
+            self.status_label.setText(f"Mission: {len(self.model)} items")
@@ -0,0 +1,269 @@
+import json
+import os
+import struct
+import threading
+import time
+from collections import namedtuple
+from dronekit import Vehicle
+from PySide6.QtCore import QObject, Signal
+from indicator.frame_scheduler import frame_scheduler
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".gcs", "params")
+HASH_CHECK = "_HASH_CHECK"
+VERSION_WAIT = 2.0
+PROBE_TIMEOUT = 1.0
+PROBE_RETRIES = 3
+
+APPLY_RATE = 10
+APPLY_BATCH = 10
+APPLY_TIMEOUT = 2.0
+APPLY_RETRIES = 3
+
+# Stand-in for a PARAM_VALUE message in dronekit's _params_set; only the fields it reads.
+CachedParam = namedtuple("CachedParam", ("param_id", "param_value", "param_type", "param_index", "param_count"))
+
+def float_bits(value):
+    return struct.unpack("<I", struct.pack("<f", value))[0]
+
+class ParamCache:
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, key):
+        try:
+            with open(self.path(key)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading parameter cache: {e}")
+            return None
+
+    def save(self, key, vehicle_hash, params):
+        os.makedirs(self.directory, exist_ok=True)
+        temporary = f"{self.path(key)}.tmp"
+        try:
+            with open(temporary, "w") as f:
+                json.dump({"count": len(params), "hash": vehicle_hash, "saved": time.time(), "params": params}, f)
+            os.replace(temporary, self.path(key))
+        except Exception as e:
+            print(f"Error writing parameter cache: {e}")
+
+class CachedParamVehicle(Vehicle):
+    # Pass as vehicle_class to dronekit.connect(). Instead of PARAM_REQUEST_LIST it first reads
+    # _HASH_CHECK and parameter 0; when the parameter count (and the hash, if the autopilot
+    # implements it) match the table cached for this vehicle and firmware, dronekit's table is
+    # seeded from disk and nothing else is fetched. Without a hash the cached table is used at once
+    # and a full list is streamed in the background to pick up changes. On a miss the normal
+    # download runs, with dronekit re-requesting any index that never arrived.
+    param_cache = ParamCache()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cache_lock = threading.Lock()
+        self._cache_state = "waiting"
+        self._cache_started = None
+        self._cache_probe_sent = 0.0
+        self._cache_probes = 0
+        self._cache_version = None
+        self._cache_uid = None
+        self._cache_entry = None
+        self._vehicle_hash = None
+        self._cache_table = {}
+        self._cache_count = None
+        self._cache_refreshed = set()
+        self._cache_dirty = False
+        self.add_message_listener("AUTOPILOT_VERSION", self._on_autopilot_version)
+        self.add_message_listener("PARAM_VALUE", self._on_param_value)
+
+    def initialize(self, rate=4, heartbeat_timeout=30):
+        # dronekit calls _master.param_fetch_all() every 0.1 s until it learns the parameter count.
+        self._fetch_all = self._master.param_fetch_all
+        self._master.param_fetch_all = self._fetch_params
+        super().initialize(rate=rate, heartbeat_timeout=heartbeat_timeout)
+
+    def param_cache_key(self):
+        return f"sys{self._master.target_system}-{self._cache_uid or 0:x}-{self._cache_version or 'unknown'}"
+
+    def _on_autopilot_version(self, _vehicle, _name, msg):
+        self._cache_version = f"{msg.flight_sw_version:08x}"
+        self._cache_uid = msg.uid
+
+    def _fetch_params(self):
+        now = time.monotonic()
+        with self._cache_lock:
+            if self._cache_started is None:
+                self._cache_started = now
+            state = self._cache_state
+            if state == "waiting":
+                # The cache is keyed by firmware version, so give AUTOPILOT_VERSION a moment to arrive.
+                if self._cache_version is None and now - self._cache_started < VERSION_WAIT:
+                    return
+                self._cache_entry = self.param_cache.load(self.param_cache_key())
+                state = self._cache_state = "probing" if self._cache_entry else "fetching"
+            if state == "probing" and now - self._cache_probe_sent > PROBE_TIMEOUT:
+                if self._cache_probes >= PROBE_RETRIES:
+                    state = self._cache_state = "fetching"
+                else:
+                    self._cache_probes += 1
+                    self._cache_probe_sent = now
+                    self._send_probe()
+        if state == "fetching":
+            self._fetch_all()
+
+    def _send_probe(self):
+        mav, master = self._master.mav, self._master
+        mav.param_request_read_send(master.target_system, master.target_component, HASH_CHECK.encode(), -1)
+        mav.param_request_read_send(master.target_system, master.target_component, b"", 0)
+
+    def _on_param_value(self, _vehicle, _name, msg):
+        if msg.param_id == HASH_CHECK:
+            self._params_map.pop(HASH_CHECK, None)
+            self._vehicle_hash = float_bits(msg.param_value)
+            return
+
+        decision = None
+        with self._cache_lock:
+            entry = [msg.param_id, msg.param_value, msg.param_type]
+            if msg.param_index < msg.param_count and self._cache_table.get(msg.param_index) != entry:
+                self._cache_table[msg.param_index] = entry
+                self._cache_dirty = True
+            self._cache_count = msg.param_count
+            if self._cache_state == "probing":
+                decision = self._decide(msg.param_count)
+            elif self._cache_state == "refreshing" and msg.param_index < msg.param_count:
+                self._cache_refreshed.add(msg.param_index)
+                if len(self._cache_refreshed) >= msg.param_count:
+                    self._cache_state = "done"
+                    decision = "save"
+            elif self._cache_state == "fetching" and len(self._cache_table) >= msg.param_count:
+                self._cache_state = "done"
+                decision = "save"
+
+        if decision in ("seed", "refresh"):
+            self._seed(msg.param_count)
+        if decision in ("fetch", "refresh"):
+            self._fetch_all()
+        if decision == "save":
+            self.save_param_cache()
+
+    def _decide(self, count):
+        entry = self._cache_entry
+        if entry["count"] != count:
+            self._cache_state = "fetching"
+            return "fetch"
+        if self._vehicle_hash is not None and entry.get("hash") is not None:
+            if self._vehicle_hash == entry["hash"]:
+                self._cache_state = "done"
+                return "seed"
+            self._cache_state = "fetching"
+            return "fetch"
+        self._cache_state = "refreshing"
+        return "refresh"
+
+    def _seed(self, count):
+        for index, (name, value, param_type) in enumerate(self._cache_entry["params"]):
+            if self._params_set[index] is None:
+                self._params_set[index] = CachedParam(name, value, param_type, index, count)
+                self._params_map[name] = value
+            with self._cache_lock:
+                self._cache_table.setdefault(index, [name, value, param_type])
+        print(f"Parameters loaded from cache ({count}).")
+
+    def save_param_cache(self):
+        with self._cache_lock:
+            count = self._cache_count
+            if count is None or len(self._cache_table) < count or not self._cache_dirty:
+                return
+            params = [self._cache_table[index] for index in range(count)]
+            self._cache_dirty = False
+        self.param_cache.save(self.param_cache_key(), self._vehicle_hash, params)
+
+    def close(self):
+        self.save_param_cache()
+        super().close()
+
+def read_param_file(path):
+    # Mission Planner ("NAME,VALUE") and MAVProxy ("NAME VALUE") formats; '#' starts a comment.
+    params = {}
+    with open(path) as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            parts = line.replace(",", " ").replace("\t", " ").split()
+            if len(parts) >= 2:
+                try:
+                    params[parts[0]] = float(parts[1])
+                except ValueError:
+                    print(f"Error reading parameter line: {line}")
+    return params
+
+def write_param_file(path, params):
+    with open(path, "w") as f:
+        for name in sorted(params):
+            f.write(f"{name},{params[name]:.8g}\n")
+
+def params_snapshot(params, attempts=10):
+    # dronekit's receive thread inserts into _params_map while a download runs, so copying it from
+    # another thread can fail with "dictionary changed size during iteration"; just try again.
+    for _ in range(attempts - 1):
+        try:
+            return dict(params)
+        except RuntimeError:
+            pass
+    return dict(params)
+
+def param_equal(a, b):
+    return abs(a - b) <= 1e-6 * max(1.0, abs(a), abs(b))
+
+def diff_params(current, target):
+    # name -> (current value or None, target value) for every parameter the target would change.
+    return {name: (current.get(name), value) for name, value in target.items()
+            if name not in current or not param_equal(current[name], value)}
+
+class ParamApplier(QObject):
+    # applied, total
+    progress = Signal(int, int)
+    # success, names that were not confirmed
+    finished = Signal(bool, object)
+
+    # Sends PARAM_SETs a batch per tick and counts a parameter as applied when the vehicle's
+    # echoed PARAM_VALUE matches; unconfirmed ones are resent a few times.
+    def __init__(self, vehicle, values, parent=None):
+        super().__init__(parent)
+        self.vehicle = vehicle
+        self.values = dict(values)
+        self.queue = list(self.values)
+        self.sent = {}
+        self.attempts = {}
+        self.applied = set()
+        self.consumer = frame_scheduler().register(self.tick, APPLY_RATE)
+
+    def tick(self):
+        params = self.vehicle._params_map
+        now = time.monotonic()
+        for name in list(self.sent):
+            if name in params and param_equal(params[name], self.values[name]):
+                self.applied.add(name)
+                del self.sent[name]
+            elif now - self.sent[name] > APPLY_TIMEOUT:
+                del self.sent[name]
+                if self.attempts[name] < APPLY_RETRIES:
+                    self.queue.append(name)
+
+        master = self.vehicle._master
+        while self.queue and len(self.sent) < APPLY_BATCH:
+            name = self.queue.pop(0)
+            master.param_set_send(name, self.values[name])
+            self.sent[name] = now
+            self.attempts[name] = self.attempts.get(name, 0) + 1
+
+        self.progress.emit(len(self.applied), len(self.values))
+        if not self.queue and not self.sent:
+            frame_scheduler().unregister(self.consumer)
+            failed = [name for name in self.values if name not in self.applied]
+            self.finished.emit(not failed, failed)
@@ -0,0 +1,166 @@
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import (QFileDialog, QHBoxLayout, QHeaderView, QLabel, QLineEdit, QPushButton, QTableView,
+                               QVBoxLayout, QWidget)
+from indicator.frame_scheduler import frame_scheduler
+from param_cache import ParamApplier, diff_params, params_snapshot, read_param_file, write_param_file
+
+REFRESH_RATE = 1
+COLUMNS = ("Name", "Value", "File")
+CHANGED_COLOR = QColor("#806000")
+
+class ParameterTableModel(QAbstractTableModel):
+    def __init__(self, vehicle, parent=None):
+        super().__init__(parent)
+        self.vehicle = vehicle
+        self.names = []
+        self.file_values = {}
+        self.changed = {}
+        self.snapshot = {}
+        self.refresh()
+
+    def params(self):
+        # Copy taken at the last refresh; the live map is still being filled by the receive thread.
+        return self.snapshot
+
+    def refresh(self):
+        self.snapshot = params_snapshot(self.vehicle._params_map)
+        self.changed = diff_params(self.snapshot, self.file_values) if self.file_values else {}
+        names = sorted(self.snapshot)
+        if names != self.names:
+            self.beginResetModel()
+            self.names = names
+            self.endResetModel()
+        elif names:
+            self.dataChanged.emit(self.index(0, 1), self.index(len(names) - 1, 2))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.names)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        name = self.names[index.row()]
+        column = index.column()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            if column == 0:
+                return name
+            if column == 1:
+                return f"{self.params().get(name, 0.0):.6g}"
+            value = self.file_values.get(name)
+            return "" if value is None else f"{value:.6g}"
+        if role == Qt.BackgroundRole and name in self.changed:
+            return CHANGED_COLOR
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        return flags | Qt.ItemIsEditable if index.column() == 1 else flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or index.column() != 1:
+            return False
+        try:
+            value = float(value)
+        except ValueError:
+            return False
+        # Non-blocking set; the table picks up the vehicle's PARAM_VALUE echo on the next refresh.
+        self.vehicle._master.param_set_send(self.names[index.row()], value)
+        return True
+
+    def set_file_values(self, values):
+        self.file_values = values
+        self.refresh()
+
+    def diff(self):
+        return self.changed
+
+class ParameterEditor(QWidget):
+    def __init__(self, vehicle, parent=None):
+        super().__init__(parent, Qt.Window)
+        self.setWindowTitle("Parameters")
+        self.resize(520, 640)
+        self.vehicle = vehicle
+        self.applier = None
+
+        self.model = ParameterTableModel(vehicle, self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.proxy.setFilterKeyColumn(0)
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search parameters")
+        self.search_input.textChanged.connect(self.proxy.setFilterFixedString)
+
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.verticalHeader().hide()
+
+        self.load_button = QPushButton("Load .param")
+        self.load_button.clicked.connect(self.load_file)
+        self.apply_button = QPushButton("Apply file")
+        self.apply_button.clicked.connect(self.apply_file)
+        self.save_button = QPushButton("Save .param")
+        self.save_button.clicked.connect(self.save_file)
+        self.status_label = QLabel("")
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.load_button)
+        buttons.addWidget(self.apply_button)
+        buttons.addWidget(self.save_button)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.search_input)
+        layout.addWidget(self.table)
+        layout.addLayout(buttons)
+        layout.addWidget(self.status_label)
+
+        frame_scheduler().register(self.refresh, REFRESH_RATE, self)
+
+    def refresh(self):
+        self.model.refresh()
+        if not self.applier:
+            changed = len(self.model.diff())
+            loaded = "loaded" if self.vehicle._params_loaded else "loading"
+            text = f"{len(self.model.names)} parameters ({loaded})"
+            self.status_label.setText(f"{text}, {changed} differ from file" if self.model.file_values else text)
+
+    def load_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Load parameters", "", "Parameter files (*.param *.parm);;All files (*)")
+        if path:
+            try:
+                self.model.set_file_values(read_param_file(path))
+            except Exception as e:
+                print(f"Error loading parameter file: {e}")
+            self.refresh()
+
+    def apply_file(self):
+        diff = self.model.diff()
+        if not diff or self.applier:
+            return
+        self.applier = ParamApplier(self.vehicle, {name: target for name, (_current, target) in diff.items()}, self)
+        self.applier.progress.connect(lambda applied, total: self.status_label.setText(f"Applying {applied}/{total}"))
+        self.applier.finished.connect(self.on_applied)
+
+    def on_applied(self, success, failed):
+        self.applier.deleteLater()
+        self.applier = None
+        message = "Parameters applied." if success else f"Not confirmed: {', '.join(failed)}"
+        print(message)
+        self.status_label.setText(message)
+
+    def save_file(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save parameters", "vehicle.param", "Parameter files (*.param)")
+        if path:
+            try:
+                write_param_file(path, params_snapshot(self.vehicle._params_map))
+            except Exception as e:
+                print(f"Error saving parameter file: {e}")
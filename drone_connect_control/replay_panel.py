@@ -0,0 +1,64 @@
+from PySide6.QtWidgets import QComboBox, QHBoxLayout, QLabel, QPushButton, QSlider, QVBoxLayout, QWidget
+from PySide6.QtCore import Qt
+from telemetry_replay import REPLAY_SPEEDS
+
+SLIDER_STEPS = 1000
+
+class ReplayPanel(QWidget):
+    def __init__(self, player):
+        super().__init__()
+        self.player = player
+        self.setFixedSize(400, 90)
+
+        self.play_button = QPushButton("Play")
+        self.play_button.clicked.connect(self.toggle_play)
+
+        self.speed_box = QComboBox()
+        for speed in REPLAY_SPEEDS:
+            self.speed_box.addItem(f"{speed}x", speed)
+        self.speed_box.setCurrentIndex(REPLAY_SPEEDS.index(1))
+        self.speed_box.currentIndexChanged.connect(lambda index: self.player.set_speed(self.speed_box.itemData(index)))
+
+        self.time_label = QLabel("00:00 / 00:00")
+        self.time_label.setStyleSheet("color: white;")
+
+        self.slider = QSlider(Qt.Horizontal)
+        self.slider.setRange(0, SLIDER_STEPS)
+        self.slider.sliderReleased.connect(self.seek)
+
+        controls = QHBoxLayout()
+        controls.addWidget(self.play_button)
+        controls.addWidget(self.speed_box)
+        controls.addWidget(self.time_label)
+
+        layout = QVBoxLayout()
+        layout.addLayout(controls)
+        layout.addWidget(self.slider)
+        self.setLayout(layout)
+
+        self.player.position_changed.connect(self.update_position)
+        self.player.state_changed.connect(lambda playing: self.play_button.setText("Pause" if playing else "Play"))
+
+    def toggle_play(self):
+        if self.player.playing:
+            self.player.pause()
+        else:
+            self.player.play()
+
+    def duration(self):
+        return max(self.player.end_time - self.player.start_time, 1e-6)
+
+    def seek(self):
+        self.player.seek(self.player.start_time + self.slider.value() / SLIDER_STEPS * self.duration())
+
+    def update_position(self, position):
+        elapsed = position - self.player.start_time
+        if not self.slider.isSliderDown():
+            self.slider.setValue(int(elapsed / self.duration() * SLIDER_STEPS))
+        self.time_label.setText(f"{self.format_time(elapsed)} / {self.format_time(self.duration())}")
+
+    @staticmethod
+    def format_time(seconds):
+        minutes, seconds = divmod(int(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
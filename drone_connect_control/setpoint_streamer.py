@@ -0,0 +1,104 @@
+import threading
+import time
+from pymavlink import mavutil
+
+MIN_RATE = 10
+MAX_RATE = 50
+STALE_TIMEOUT = 1.0
+
+# SET_POSITION_TARGET_LOCAL_NED type_mask: bits set are ignored by the autopilot.
+VELOCITY_MASK = 0b0000111111000111
+POSITION_MASK = 0b0000111111111000
+YAW_RATE_IGNORE = 0b0000100000000000
+
+class SetpointStreamer(threading.Thread):
+    # Resends the latest setpoint at a fixed rate from its own thread. One message object is encoded
+    # up front and only the fields that changed are written into it; when no new input arrives
+    # within stale_timeout the vehicle is sent a zero velocity once and streaming pauses.
+    def __init__(self, vehicle, rate_hz=20, stale_timeout=STALE_TIMEOUT, frame=mavutil.mavlink.MAV_FRAME_LOCAL_NED):
+        super().__init__(name="setpoint-streamer", daemon=True)
+        self.vehicle = vehicle
+        self.period = 1.0 / min(max(rate_hz, MIN_RATE), MAX_RATE)
+        self.stale_timeout = stale_timeout
+        self.message = vehicle.message_factory.set_position_target_local_ned_encode(
+            0, 0, 0, frame, VELOCITY_MASK, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+        self.start_time = time.monotonic()
+
+        self._lock = threading.Lock()
+        self._fields = {}
+        self._valid_until = 0.0
+        self._wake = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+        self.sent = 0
+
+    def set_velocity(self, vx, vy, vz, yaw_rate=None, duration=0.0):
+        mask = VELOCITY_MASK if yaw_rate is None else VELOCITY_MASK & ~YAW_RATE_IGNORE
+        self._set({"type_mask": mask, "vx": vx, "vy": vy, "vz": vz, "yaw_rate": yaw_rate or 0.0}, duration)
+
+    def set_position(self, x, y, z, duration=0.0):
+        self._set({"type_mask": POSITION_MASK, "x": x, "y": y, "z": z}, duration)
+
+    def halt(self):
+        self.set_velocity(0, 0, 0)
+
+    def _set(self, fields, duration):
+        # duration keeps a one-off command alive without repeated input, e.g. "fly 5 m/s for 20 s".
+        with self._lock:
+            self._fields.update(fields)
+            self._valid_until = time.monotonic() + max(self.stale_timeout, duration)
+        self._wake.set()
+
+    def stop(self):
+        self._running.clear()
+        self._wake.set()
+
+    def run(self):
+        message = self.message
+        next_send = time.perf_counter()
+        while self._running.is_set():
+            with self._lock:
+                fields, self._fields = self._fields, {}
+                valid_until = self._valid_until
+            for name, value in fields.items():
+                if getattr(message, name) != value:
+                    setattr(message, name, value)
+
+            if time.monotonic() > valid_until:
+                if valid_until:
+                    self._send_zero()
+                    with self._lock:
+                        # A command that arrived while the zero setpoint went out keeps its deadline.
+                        renewed = self._valid_until != valid_until
+                        if not renewed:
+                            self._valid_until = 0.0
+                    if renewed:
+                        continue
+                # Idle until the next input instead of spinning.
+                self._wake.wait()
+                self._wake.clear()
+                next_send = time.perf_counter()
+                continue
+
+            self._send(message)
+            next_send += self.period
+            delay = next_send - time.perf_counter()
+            if delay > 0:
+                self._wake.wait(delay)
+                self._wake.clear()
+            else:
+                next_send = time.perf_counter()
+
+    def _send(self, message):
+        message.time_boot_ms = int((time.monotonic() - self.start_time) * 1000) & 0xFFFFFFFF
+        try:
+            self.vehicle.send_mavlink(message)
+            self.sent += 1
+        except Exception as e:
+            print(f"Error sending setpoint: {e}")
+
+    def _send_zero(self):
+        message = self.message
+        message.type_mask = VELOCITY_MASK
+        message.vx = message.vy = message.vz = 0.0
+        self._send(message)
@@ -0,0 +1,154 @@
+import threading
+import time
+from pymavlink import mavutil
+from PySide6.QtCore import QObject, Signal
+
+# Requested rates in Hz; 0 turns a message off so it stops using radio bandwidth.
+STREAM_PROFILES = {
+    "Fast attitude": {
+        "ATTITUDE": 50, "GLOBAL_POSITION_INT": 10, "VFR_HUD": 10, "SYS_STATUS": 2,
+    },
+    "Balanced": {
+        "ATTITUDE": 20, "GLOBAL_POSITION_INT": 5, "VFR_HUD": 5, "SYS_STATUS": 1,
+    },
+    "Low-bandwidth radio": {
+        "ATTITUDE": 10, "GLOBAL_POSITION_INT": 2, "VFR_HUD": 2, "SYS_STATUS": 0.5,
+        "RAW_IMU": 0, "SCALED_IMU2": 0, "SCALED_PRESSURE": 0, "SERVO_OUTPUT_RAW": 0, "RC_CHANNELS": 0,
+        "NAV_CONTROLLER_OUTPUT": 0, "MISSION_CURRENT": 0, "GPS_RAW_INT": 1,
+    },
+}
+DEFAULT_PROFILE = "Balanced"
+
+# Fallback for autopilots without SET_MESSAGE_INTERVAL: the legacy stream each message belongs to.
+LEGACY_STREAMS = {
+    "ATTITUDE": mavutil.mavlink.MAV_DATA_STREAM_EXTRA1,
+    "GLOBAL_POSITION_INT": mavutil.mavlink.MAV_DATA_STREAM_POSITION,
+    "VFR_HUD": mavutil.mavlink.MAV_DATA_STREAM_EXTRA2,
+    "SYS_STATUS": mavutil.mavlink.MAV_DATA_STREAM_EXTENDED_STATUS,
+    "GPS_RAW_INT": mavutil.mavlink.MAV_DATA_STREAM_EXTENDED_STATUS,
+    "MISSION_CURRENT": mavutil.mavlink.MAV_DATA_STREAM_EXTENDED_STATUS,
+    "NAV_CONTROLLER_OUTPUT": mavutil.mavlink.MAV_DATA_STREAM_EXTENDED_STATUS,
+    "RAW_IMU": mavutil.mavlink.MAV_DATA_STREAM_RAW_SENSORS,
+    "SCALED_IMU2": mavutil.mavlink.MAV_DATA_STREAM_RAW_SENSORS,
+    "SCALED_PRESSURE": mavutil.mavlink.MAV_DATA_STREAM_RAW_SENSORS,
+    "SERVO_OUTPUT_RAW": mavutil.mavlink.MAV_DATA_STREAM_RC_CHANNELS,
+    "RC_CHANNELS": mavutil.mavlink.MAV_DATA_STREAM_RC_CHANNELS,
+}
+
+ACK_TIMEOUT = 2.0
+HEARTBEAT_LOST = 3.0
+# Observed rates below this fraction of the request trigger a re-apply.
+RATE_TOLERANCE = 0.5
+MAX_REAPPLY = 3
+# Rates are only judged over at least this long a window after apply().
+MEASURE_WINDOW = 5.0
+
+class StreamRateManager(QObject):
+    rates_checked = Signal(object, object)  # {message: requested Hz}, {message: observed Hz}
+
+    def __init__(self, vehicle, profile=DEFAULT_PROFILE, parent=None):
+        super().__init__(parent)
+        self.vehicle = vehicle
+        self.rates = dict(STREAM_PROFILES[profile])
+        self.profile = profile
+        self.legacy = False
+        self.accepted = 0
+        self.applied_at = None
+        self.reapplied = 0
+        self.link_lost = False
+
+        self._lock = threading.Lock()
+        self.counts = {}
+        self.window_start = time.monotonic()
+        self.vehicle.add_message_listener("*", self.count_message)
+        self.vehicle.add_message_listener("COMMAND_ACK", self.on_command_ack)
+
+    def close(self):
+        self.vehicle.remove_message_listener("*", self.count_message)
+        self.vehicle.remove_message_listener("COMMAND_ACK", self.on_command_ack)
+
+    def set_profile(self, profile):
+        self.profile = profile
+        self.rates = dict(STREAM_PROFILES[profile])
+        self.reapplied = 0
+        self.apply()
+
+    def apply(self):
+        if self.legacy:
+            self.apply_legacy()
+        else:
+            self.accepted = 0
+            for name, rate in self.rates.items():
+                msgid = getattr(mavutil.mavlink, f"MAVLINK_MSG_ID_{name}", None)
+                if msgid is None:
+                    continue
+                interval = -1 if rate <= 0 else int(1e6 / rate)
+                self.vehicle.send_mavlink(self.vehicle.message_factory.command_long_encode(
+                    0, 0, mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL, 0, msgid, interval, 0, 0, 0, 0, 0))
+        self.applied_at = time.monotonic()
+        self.reset_counts()
+
+    def apply_legacy(self):
+        streams = {}
+        for name, rate in self.rates.items():
+            stream = LEGACY_STREAMS.get(name)
+            if stream is not None:
+                streams[stream] = max(streams.get(stream, 0), rate)
+        for stream, rate in streams.items():
+            # Legacy streams only take whole Hz; a stream is stopped only when nothing in it is wanted.
+            rate_hz = max(int(round(rate)), 1) if rate > 0 else 0
+            self.vehicle.send_mavlink(self.vehicle.message_factory.request_data_stream_encode(
+                0, 0, stream, rate_hz, 1 if rate_hz else 0))
+
+    def on_command_ack(self, _vehicle, _name, msg):
+        if msg.command == mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL and msg.result == mavutil.mavlink.MAV_RESULT_ACCEPTED:
+            self.accepted += 1
+
+    def count_message(self, _vehicle, name, _msg):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def reset_counts(self):
+        with self._lock:
+            self.counts = {}
+            self.window_start = time.monotonic()
+
+    def observed_rates(self):
+        with self._lock:
+            elapsed = max(time.monotonic() - self.window_start, 1e-6)
+            return {name: count / elapsed for name, count in self.counts.items()}
+
+    def check(self):
+        # Called periodically: falls back to legacy streams, re-applies after a link drop,
+        # and re-applies when the autopilot is sending well below the requested rates.
+        now = time.monotonic()
+        if self.applied_at is None:
+            self.apply()
+            return
+
+        last_heartbeat = self.vehicle.last_heartbeat
+        if last_heartbeat is not None and last_heartbeat > HEARTBEAT_LOST:
+            self.link_lost = True
+            return
+        if self.link_lost:
+            self.link_lost = False
+            self.reapplied = 0
+            self.apply()
+            return
+
+        if not self.legacy and not self.accepted and now - self.applied_at > ACK_TIMEOUT:
+            self.legacy = True
+            self.apply()
+            return
+
+        if now - self.window_start < MEASURE_WINDOW:
+            return
+        observed = self.observed_rates()
+        self.rates_checked.emit(dict(self.rates), observed)
+        too_slow = [name for name, rate in self.rates.items() if rate > 0 and observed.get(name, 0) < rate * RATE_TOLERANCE]
+        if too_slow and self.reapplied < MAX_REAPPLY:
+            print(f"Stream rates below request for {', '.join(too_slow)}; re-applying {self.profile}")
+            self.reapplied += 1
+            self.apply()
+        else:
+            self.reset_counts()
@@ -0,0 +1,195 @@
+import math
+import random
+import threading
+import time
+from collections import deque
+from dronekit import Attitude, Battery, HasObservers, LocationGlobal, LocationGlobalRelative, VehicleMode
+from pymavlink import mavutil
+
+EARTH_RADIUS = 6378137.0
+GRAVITY = 9.81
+MAX_RATE = 500
+MODE_MAPPING = {"STABILIZE": 0, "AUTO": 3, "GUIDED": 4, "LOITER": 5, "RTL": 6, "LAND": 9}
+
+class SyntheticLocations:
+    def __init__(self):
+        self.global_frame = None
+        self.global_relative_frame = None
+
+class SyntheticVehicle(HasObservers):
+    # Stands in for dronekit's Vehicle with the attributes the GCS reads. step() advances a fixed
+    # flight profile by simulated time only, so a given seed always produces the same telemetry.
+    def __init__(self, home=(37.5665, 126.978), cruise_altitude=50.0, orbit_radius=150.0, cruise_speed=12.0,
+                 rate_hz=50, jitter=0.0, dropout=0.0, seed=0, airborne=True):
+        super().__init__()
+        self.home = home
+        self.cruise_altitude = cruise_altitude
+        self.orbit_radius = orbit_radius
+        self.cruise_speed = cruise_speed
+        self.rate_hz = min(rate_hz, MAX_RATE)
+        self.jitter = jitter
+        self.dropout = dropout
+        self.random = random.Random(seed)
+
+        self.message_factory = mavutil.mavlink.MAVLink(None, srcSystem=255, srcComponent=190)
+        self._mode_mapping = dict(MODE_MAPPING)
+        self._message_listeners = {}
+        self.sent = deque(maxlen=256)
+
+        self.sim_time = 0.0
+        self.orbit_angle = 0.0
+        self.target_altitude = cruise_altitude if airborne else 0.0
+        self.altitude = cruise_altitude if airborne else 0.0
+        self._armed = airborne
+        self._mode = VehicleMode("AUTO" if airborne else "STABILIZE")
+        self.location = SyntheticLocations()
+        self.attitude = Attitude(0.0, 0.0, 0.0)
+        self.heading = 0
+        self.groundspeed = 0.0
+        self.airspeed = 0.0
+        self.battery = Battery(16800, 0, 100)
+        self.last_heartbeat = 0.0
+
+        self._running = threading.Event()
+        self._thread = None
+        self.step(0.0)
+
+    @property
+    def armed(self):
+        return self._armed
+
+    @armed.setter
+    def armed(self, value):
+        self._armed = bool(value)
+        if not self._armed:
+            self.target_altitude = self.altitude = 0.0
+        self.notify_attribute_listeners("armed", self._armed)
+
+    @property
+    def mode(self):
+        return self._mode
+
+    @mode.setter
+    def mode(self, value):
+        self._mode = value
+        if value.name == "LAND" or value.name == "RTL":
+            self.target_altitude = 0.0
+        self.notify_attribute_listeners("mode", value)
+
+    def simple_takeoff(self, altitude):
+        if self._armed:
+            self.target_altitude = altitude
+
+    def step(self, dt):
+        self.sim_time += dt
+        climb = max(min(self.target_altitude - self.altitude, 3.0 * dt), -2.0 * dt)
+        self.altitude = max(self.altitude + climb, 0.0)
+        flying = self._armed and self.altitude > 0.5
+
+        speed = self.cruise_speed if flying else 0.0
+        self.orbit_angle += speed / self.orbit_radius * dt
+        north = self.orbit_radius * math.cos(self.orbit_angle) if flying else 0.0
+        east = self.orbit_radius * math.sin(self.orbit_angle) if flying else 0.0
+        lat = self.home[0] + math.degrees(north / EARTH_RADIUS)
+        lon = self.home[1] + math.degrees(east / (EARTH_RADIUS * math.cos(math.radians(self.home[0]))))
+        track = (math.degrees(self.orbit_angle) + 90.0) % 360.0
+
+        # Coordinated turn around the orbit plus a little turbulence.
+        roll = math.atan(speed * speed / (GRAVITY * self.orbit_radius)) if flying else 0.0
+        roll += 0.03 * math.sin(self.sim_time * 2.3) if flying else 0.0
+        pitch = 0.05 * math.sin(self.sim_time * 0.7) + (0.1 if climb > 0 else 0.0) if flying else 0.0
+        wind = 1.5 * math.sin(self.sim_time * 0.1)
+
+        self.attitude = Attitude(pitch, math.radians(track), roll)
+        self.heading = int(track)
+        self.location.global_frame = LocationGlobal(lat, lon, self.altitude + 30.0)
+        self.location.global_relative_frame = LocationGlobalRelative(lat, lon, self.altitude)
+        self.groundspeed = speed
+        self.airspeed = max(speed + wind, 0.0) if flying else 0.0
+        level = max(100 - int(self.sim_time / 18), 0)
+        # dronekit's Battery takes SYS_STATUS units: millivolts and centiamps.
+        self.battery = Battery(int(13200 + 3600 * level / 100), 1200 if flying else 50, level)
+
+        if self.dropout and self.random.random() < self.dropout:
+            return
+        self.notify_attribute_listeners("attitude", self.attitude)
+        self.notify_attribute_listeners("heading", self.heading)
+        self.notify_attribute_listeners("location.global_frame", self.location.global_frame)
+        self.notify_attribute_listeners("location.global_relative_frame", self.location.global_relative_frame)
+        self.notify_attribute_listeners("groundspeed", self.groundspeed)
+        self.notify_attribute_listeners("airspeed", self.airspeed)
+        self.notify_attribute_listeners("battery", self.battery)
+
+    def start(self):
+        if self._thread is None and self.rate_hz > 0:
+            self._running.set()
+            self._thread = threading.Thread(target=self._run, name="synthetic-vehicle", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        period = 1.0 / self.rate_hz
+        next_time = time.perf_counter()
+        while self._running.is_set():
+            # Simulated time always advances by exactly one period; jitter only moves delivery.
+            self.step(period)
+            next_time += period
+            delay = next_time - time.perf_counter()
+            if self.jitter:
+                delay += self.random.gauss(0.0, self.jitter)
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -period:
+                next_time = time.perf_counter()
+
+    def close(self):
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def add_message_listener(self, name, fn):
+        self._message_listeners.setdefault(name, []).append(fn)
+
+    def remove_message_listener(self, name, fn):
+        listeners = self._message_listeners.get(name, [])
+        if fn in listeners:
+            listeners.remove(fn)
+
+    def send_mavlink(self, message):
+        self.sent.append(message)
+        if message.get_type() == "COMMAND_LONG":
+            result = self.run_command(message)
+            self.notify_message(self.message_factory.command_ack_encode(message.command, result))
+
+    def run_command(self, message):
+        mavlink = mavutil.mavlink
+        if message.command == mavlink.MAV_CMD_COMPONENT_ARM_DISARM:
+            self.armed = message.param1 == 1
+        elif message.command == mavlink.MAV_CMD_DO_SET_MODE:
+            names = {number: name for name, number in self._mode_mapping.items()}
+            if int(message.param2) not in names:
+                return mavlink.MAV_RESULT_DENIED
+            self.mode = VehicleMode(names[int(message.param2)])
+        elif message.command == mavlink.MAV_CMD_NAV_TAKEOFF:
+            if not self._armed:
+                return mavlink.MAV_RESULT_TEMPORARILY_REJECTED
+            self.simple_takeoff(message.param7)
+        return mavlink.MAV_RESULT_ACCEPTED
+
+    def notify_message(self, message):
+        message.pack(self.message_factory)
+        for name in (message.get_type(), "*"):
+            for fn in list(self._message_listeners.get(name, ())):
+                try:
+                    fn(self, name, message)
+                except Exception as e:
+                    print(f"Error in synthetic message listener: {e}")
+
+def synthetic_fleet(count, rate_hz=50, jitter=0.0, dropout=0.0, seed=0, home=(37.5665, 126.978), spacing=0.004):
+    vehicles = []
+    for index in range(count):
+        vehicle_home = (home[0] + spacing * (index // 4), home[1] + spacing * (index % 4))
+        vehicles.append(SyntheticVehicle(home=vehicle_home, orbit_radius=100.0 + 25.0 * index, rate_hz=rate_hz,
+                                         jitter=jitter, dropout=dropout, seed=seed + index))
+    return vehicles
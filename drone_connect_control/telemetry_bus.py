@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import namedtuple
+from PySide6.QtCore import QObject, Signal
+
+TELEMETRY_FIELDS = (
+    "roll", "pitch", "heading", "altitude", "lat", "lon",
+    "groundspeed", "airspeed", "armed", "mode", "battery_voltage", "battery_remaining",
+)
+
+TelemetrySnapshot = namedtuple("TelemetrySnapshot", ("timestamp",) + TELEMETRY_FIELDS)
+
+EMPTY_SNAPSHOT = TelemetrySnapshot(
+    timestamp=0.0, roll=0.0, pitch=0.0, heading=0, altitude=0.0, lat=None, lon=None,
+    groundspeed=0.0, airspeed=0.0, armed=False, mode=None, battery_voltage=None, battery_remaining=None,
+)
+
+
+def _attitude_fields(value):
+    return {"roll": value.roll, "pitch": value.pitch}
+
+
+def _relative_frame_fields(value):
+    return {"altitude": value.alt}
+
+
+def _global_frame_fields(value):
+    return {"lat": value.lat, "lon": value.lon}
+
+
+def _mode_fields(value):
+    return {"mode": value.name if value else None}
+
+
+def _battery_fields(value):
+    return {"battery_voltage": value.voltage, "battery_remaining": value.level}
+
+
+# dronekit attribute name -> function turning the attribute value into snapshot fields
+ATTRIBUTE_FIELDS = {
+    "attitude": _attitude_fields,
+    "heading": lambda value: {"heading": value},
+    "location.global_relative_frame": _relative_frame_fields,
+    "location.global_frame": _global_frame_fields,
+    "groundspeed": lambda value: {"groundspeed": value},
+    "airspeed": lambda value: {"airspeed": value},
+    "armed": lambda value: {"armed": bool(value)},
+    "mode": _mode_fields,
+    "battery": _battery_fields,
+}
+
+
+class TelemetryBus(QObject):
+    # {vehicle key: (snapshot, frozenset of changed field names)}, emitted at most once per flush
+    updated = Signal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._snapshots = {}
+        self._listeners = {}
+        self._pending_since = None
+        # monotonic time the oldest update in the last emitted batch arrived
+        self.oldest_update = None
+
+    def attach(self, vehicle, key=None):
+        key = vehicle if key is None else key
+        self.detach(key)
+
+        listeners = []
+        for attribute, to_fields in ATTRIBUTE_FIELDS.items():
+            def listener(_vehicle, _name, value, to_fields=to_fields):
+                if value is not None:
+                    self.publish(key, to_fields(value))
+            vehicle.add_attribute_listener(attribute, listener)
+            listeners.append((attribute, listener))
+
+        self._listeners[key] = (vehicle, listeners)
+        with self._lock:
+            self._snapshots.setdefault(key, EMPTY_SNAPSHOT)
+
+        for attribute, to_fields in ATTRIBUTE_FIELDS.items():
+            value = getattr(vehicle, attribute.split(".")[0], None)
+            for part in attribute.split(".")[1:]:
+                value = getattr(value, part, None)
+            if value is not None:
+                self.publish(key, to_fields(value))
+        return key
+
+    def register(self, key):
+        # For sources that publish directly (replay, alternative backends) instead of via attach().
+        with self._lock:
+            self._snapshots.setdefault(key, EMPTY_SNAPSHOT)
+
+    def detach(self, key):
+        vehicle, listeners = self._listeners.pop(key, (None, ()))
+        for attribute, listener in listeners:
+            try:
+                vehicle.remove_attribute_listener(attribute, listener)
+            except Exception as e:
+                print(f"Error removing telemetry listener: {e}")
+        with self._lock:
+            self._pending.pop(key, None)
+            self._snapshots.pop(key, None)
+
+    def publish(self, key, fields):
+        # Called from dronekit's receive thread; only records values, never touches widgets.
+        with self._lock:
+            if not self._pending:
+                self._pending_since = time.monotonic()
+            pending = self._pending.get(key)
+            if pending is None:
+                self._pending[key] = dict(fields)
+            else:
+                pending.update(fields)
+
+    def snapshot(self, key):
+        return self._snapshots.get(key, EMPTY_SNAPSHOT)
+
+    def flush(self):
+        # Driven once per display frame by the frame scheduler.
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            pending_since = self._pending_since
+
+        now = time.monotonic()
+        updates = {}
+        for key, fields in pending.items():
+            previous = self._snapshots.get(key)
+            if previous is None:
+                continue
+            changed = frozenset(name for name, value in fields.items() if getattr(previous, name) != value)
+            if not changed:
+                continue
+            snapshot = previous._replace(timestamp=now, **{name: fields[name] for name in changed})
+            self._snapshots[key] = snapshot
+            updates[key] = (snapshot, changed)
+
+        if updates:
+            self.oldest_update = pending_since
+            self.updated.emit(updates)
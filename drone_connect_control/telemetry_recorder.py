@@ -0,0 +1,223 @@
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import numpy as np
+
+MAGIC = b"GCSREC1\0"
+HEADER_SIZE = 4096
+CHUNK_ROWS = 4096
+# How often an idle writer checks whether it has been asked to stop.
+STOP_POLL = 0.2
+
+# Fixed schema for derived state; one row per vehicle per telemetry flush that changed something.
+STATE_COLUMNS = (
+    ("time", "<f8"),
+    ("vehicle", "<u2"),
+    ("roll", "<f4"),
+    ("pitch", "<f4"),
+    ("heading", "<f4"),
+    ("altitude", "<f4"),
+    ("lat", "<f8"),
+    ("lon", "<f8"),
+    ("groundspeed", "<f4"),
+    ("airspeed", "<f4"),
+    ("armed", "u1"),
+    ("battery_voltage", "<f4"),
+    ("battery_remaining", "<f4"),
+)
+
+def _number(value):
+    return np.nan if value is None else value
+
+class TelemetryRecorder:
+    # Raw MAVLink goes to <base>.tlog (the usual 8-byte timestamp + frame layout, readable by
+    # pymavlink tools); derived state goes to <base>.gcsrec as fixed-size columnar chunks with a
+    # per-chunk time index in <base>.idx. All file I/O happens on the writer thread.
+    def __init__(self, base_path, queue_size=8192, chunk_rows=CHUNK_ROWS):
+        os.makedirs(os.path.dirname(os.path.abspath(base_path)), exist_ok=True)
+        self.base_path = base_path
+        self.chunk_rows = chunk_rows
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.vehicle_ids = {}
+        self.listeners = {}
+        self.thread = None
+        self.stopping = threading.Event()
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="telemetry-recorder", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        for key in list(self.listeners):
+            self.detach(key)
+        if self.thread is not None:
+            # A blocking put could hang here with the queue full; the writer drains what is queued
+            # and exits once it finds the queue empty with stopping set.
+            self.stopping.set()
+            try:
+                self.queue.put_nowait(None)
+            except queue.Full:
+                pass
+            self.thread.join()
+            self.thread = None
+            self.stopping.clear()
+
+    def attach(self, vehicle, key):
+        def listener(_vehicle, _name, message):
+            self._put((0, time.time(), message.get_msgbuf()))
+        vehicle.add_message_listener("*", listener)
+        self.listeners[key] = (vehicle, listener)
+
+    def detach(self, key):
+        vehicle, listener = self.listeners.pop(key, (None, None))
+        if vehicle is not None:
+            try:
+                vehicle.remove_message_listener("*", listener)
+            except Exception as e:
+                print(f"Error removing recorder listener: {e}")
+
+    def record_updates(self, updates):
+        now = time.time()
+        for key, (snapshot, _changed) in updates.items():
+            if isinstance(key, tuple) and key[0] == "replay":
+                continue
+            vehicle_id = self.vehicle_ids.setdefault(key, len(self.vehicle_ids) + 1)
+            self._put((1, now, (
+                now, vehicle_id, _number(snapshot.roll), _number(snapshot.pitch), _number(snapshot.heading), _number(snapshot.altitude),
+                _number(snapshot.lat), _number(snapshot.lon), _number(snapshot.groundspeed),
+                _number(snapshot.airspeed), bool(snapshot.armed),
+                _number(snapshot.battery_voltage), _number(snapshot.battery_remaining),
+            )))
+
+    def _put(self, item):
+        # Never block the caller (GUI or dronekit thread); a full queue means the disk is stalled.
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        writer = tlog = None
+        try:
+            writer = ChunkWriter(self.base_path + ".gcsrec", self.base_path + ".idx", self.chunk_rows)
+            tlog = open(self.base_path + ".tlog", "ab")
+            while True:
+                try:
+                    item = self.queue.get(timeout=STOP_POLL)
+                except queue.Empty:
+                    if self.stopping.is_set():
+                        break
+                    continue
+                if item is None:
+                    break
+                kind, timestamp, payload = item
+                try:
+                    if kind == 0:
+                        tlog.write(struct.pack(">Q", int(timestamp * 1e6)))
+                        tlog.write(payload)
+                    else:
+                        writer.append(payload)
+                except (TypeError, ValueError) as e:
+                    # One bad row is dropped; the recording carries on.
+                    self.dropped += 1
+                    print(f"Error recording telemetry: {e}")
+        except Exception as e:
+            print(f"Error in telemetry recorder, recording stopped: {e}")
+        finally:
+            if writer is not None:
+                try:
+                    writer.close()
+                except Exception as e:
+                    print(f"Error closing recording: {e}")
+            if tlog is not None:
+                tlog.close()
+
+class ChunkWriter:
+    def __init__(self, data_path, index_path, chunk_rows):
+        self.chunk_rows = chunk_rows
+        self.dtypes = [(name, np.dtype(dtype)) for name, dtype in STATE_COLUMNS]
+        self.buffers = [np.zeros(chunk_rows, dtype) for _, dtype in self.dtypes]
+        self.rows = 0
+
+        header = json.dumps({
+            "columns": [[name, dtype.str] for name, dtype in self.dtypes],
+            "chunk_rows": chunk_rows,
+        }).encode()
+        self.data = open(data_path, "wb")
+        self.data.write(MAGIC + struct.pack("<I", len(header)) + header)
+        self.data.write(b"\0" * (HEADER_SIZE - self.data.tell()))
+        self.index = open(index_path, "wb")
+
+    def append(self, row):
+        for buffer, value in zip(self.buffers, row):
+            buffer[self.rows] = value
+        self.rows += 1
+        if self.rows == self.chunk_rows:
+            self.flush_chunk()
+
+    def flush_chunk(self):
+        if not self.rows:
+            return
+        # Partial chunks are zero-padded so every chunk has the same size and offset arithmetic.
+        for buffer in self.buffers:
+            buffer[self.rows:] = 0
+            self.data.write(buffer.tobytes())
+        times = self.buffers[0]
+        self.index.write(np.array([times[0], times[self.rows - 1], self.rows], dtype="<f8").tobytes())
+        self.data.flush()
+        self.index.flush()
+        self.rows = 0
+
+    def close(self):
+        self.flush_chunk()
+        self.data.close()
+        self.index.close()
+
+class TelemetryReader:
+    def __init__(self, base_path):
+        self.data_path = base_path + ".gcsrec"
+        with open(self.data_path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a telemetry recording: {self.data_path}")
+            header_length, = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_length))
+
+        self.chunk_rows = header["chunk_rows"]
+        self.columns = [(name, np.dtype(dtype)) for name, dtype in header["columns"]]
+        self.column_offsets = {}
+        offset = 0
+        for name, dtype in self.columns:
+            self.column_offsets[name] = (offset, dtype)
+            offset += dtype.itemsize * self.chunk_rows
+        self.chunk_size = offset
+
+        index_path = base_path + ".idx"
+        self.index = np.fromfile(index_path, dtype="<f8").reshape(-1, 3) if os.path.exists(index_path) else np.zeros((0, 3))
+
+    def time_range(self):
+        if not len(self.index):
+            return None
+        return float(self.index[0, 0]), float(self.index[-1, 1])
+
+    def chunk_column(self, chunk, name):
+        offset, dtype = self.column_offsets[name]
+        rows = int(self.index[chunk, 2])
+        return np.memmap(self.data_path, dtype=dtype, mode="r", shape=(rows,),
+                         offset=HEADER_SIZE + chunk * self.chunk_size + offset)
+
+    def window(self, start, end, names=None):
+        names = names or [name for name, _ in self.columns]
+        first = int(np.searchsorted(self.index[:, 1], start, side="left"))
+        last = int(np.searchsorted(self.index[:, 0], end, side="right"))
+        chunks = range(first, last)
+        if not len(chunks):
+            return {name: np.zeros(0, dtype=self.column_offsets[name][1]) for name in names}
+
+        times = np.concatenate([self.chunk_column(chunk, "time") for chunk in chunks])
+        mask = (times >= start) & (times <= end)
+        return {name: np.concatenate([self.chunk_column(chunk, name) for chunk in chunks])[mask] for name in names}
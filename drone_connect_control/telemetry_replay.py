@@ -0,0 +1,183 @@
+import os
+import struct
+import time
+import numpy as np
+from pymavlink import mavutil
+from PySide6.QtCore import QObject, Signal
+from mavlink_state import MESSAGE_IDS, frame_length, frame_msgid, frame_sysid, message_fields
+from telemetry_recorder import TelemetryReader
+
+REPLAY_SPEEDS = (0.25, 0.5, 1, 2, 4, 8, 16, 32, 64)
+# After a seek, state is rebuilt from this many seconds of log before the target time.
+SEEK_LOOKBACK = 5.0
+TLOG_INDEX_INTERVAL = 0.5
+
+class RecordingReplaySource:
+    def __init__(self, base_path):
+        self.reader = TelemetryReader(base_path)
+        self.columns = [name for name, _ in self.reader.columns if name not in ("time", "vehicle")]
+
+    def time_range(self):
+        return self.reader.time_range() or (0.0, 0.0)
+
+    def updates_between(self, start, end):
+        window = self.reader.window(start, end)
+        updates = {}
+        # Only the newest row per vehicle matters for display, so older rows in the window are skipped.
+        vehicles = window["vehicle"]
+        for key in np.unique(vehicles):
+            row = int(np.flatnonzero(vehicles == key)[-1])
+            fields = {name: window[name][row].item() for name in self.columns}
+            fields["armed"] = bool(fields["armed"])
+            updates[int(key)] = {name: (None if value != value else value) for name, value in fields.items()}
+        return updates
+
+class TlogReplaySource:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.mav = mavutil.mavlink.MAVLink(None)
+        self.index = self.load_index()
+
+    def load_index(self):
+        # (timestamp, byte offset) every TLOG_INDEX_INTERVAL seconds, cached next to the log.
+        index_path = self.path + ".idx.npy"
+        if os.path.exists(index_path) and os.path.getmtime(index_path) >= os.path.getmtime(self.path):
+            return np.load(index_path)
+
+        entries = []
+        next_entry = None
+        for timestamp, offset, _frame in self.records(0, decode=False):
+            if next_entry is None or timestamp >= next_entry:
+                entries.append((timestamp, offset))
+                next_entry = timestamp + TLOG_INDEX_INTERVAL
+        index = np.array(entries, dtype=np.float64).reshape(-1, 2)
+        try:
+            np.save(index_path, index)
+        except OSError as e:
+            print(f"Error saving replay index: {e}")
+        return index
+
+    def records(self, offset, decode=True):
+        self.file.seek(offset)
+        read = self.file.read
+        while True:
+            stamp = read(8)
+            if len(stamp) < 8:
+                return
+            header = read(3)
+            length = frame_length(header) if len(header) == 3 else 0
+            if not length:
+                return
+            frame = header + read(length - 3) if decode else header + self.skip(length - 3)
+            yield struct.unpack(">Q", stamp)[0] / 1e6, offset, frame
+            offset += 8 + length
+
+    def skip(self, count):
+        # Header-only scan: the fields needed for indexing are in the first 10 bytes.
+        data = self.file.read(min(count, 7))
+        self.file.seek(count - len(data), os.SEEK_CUR)
+        return data
+
+    def time_range(self):
+        if not len(self.index):
+            return 0.0, 0.0
+        last_start = self.index[-1]
+        end = last_start[0]
+        for timestamp, _offset, _frame in self.records(int(last_start[1]), decode=False):
+            end = timestamp
+        return float(self.index[0, 0]), float(end)
+
+    def updates_between(self, start, end):
+        position = max(int(np.searchsorted(self.index[:, 0], start, side="right")) - 1, 0) if len(self.index) else 0
+        offset = int(self.index[position, 1]) if len(self.index) else 0
+
+        # Keep only the newest frame per (vehicle, message type) and decode just those.
+        latest = {}
+        for timestamp, _offset, frame in self.records(offset):
+            if timestamp > end:
+                break
+            if timestamp < start:
+                continue
+            msgid = frame_msgid(frame)
+            if msgid in MESSAGE_IDS:
+                latest[(frame_sysid(frame), msgid)] = frame
+
+        updates = {}
+        for (sysid, _msgid), frame in latest.items():
+            try:
+                msg = self.mav.decode(bytearray(frame))
+            except Exception:
+                continue
+            # Messages with nothing for the bus (e.g. a GCS's own HEARTBEAT, which message_fields
+            # ignores) must not make their sender show up as a vehicle.
+            fields = message_fields(msg)
+            if fields:
+                updates.setdefault(sysid, {}).update(fields)
+        return updates
+
+    def close(self):
+        self.file.close()
+
+def open_replay_source(path):
+    if path.endswith(".tlog"):
+        return TlogReplaySource(path)
+    return RecordingReplaySource(os.path.splitext(path)[0] if path.endswith(".gcsrec") else path)
+
+class ReplayPlayer(QObject):
+    position_changed = Signal(float)
+    state_changed = Signal(bool)
+    vehicle_found = Signal(object)
+
+    def __init__(self, source, telemetry_bus, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.telemetry_bus = telemetry_bus
+        self.start_time, self.end_time = source.time_range()
+        self.position = self.start_time
+        self.replayed_until = self.start_time - SEEK_LOOKBACK
+        self.speed = 1.0
+        self.playing = False
+        self.last_tick = None
+        self.keys = {}
+
+    def play(self):
+        self.playing = True
+        self.last_tick = time.monotonic()
+        self.state_changed.emit(True)
+
+    def pause(self):
+        self.playing = False
+        self.state_changed.emit(False)
+
+    def set_speed(self, speed):
+        self.speed = min(max(speed, REPLAY_SPEEDS[0]), REPLAY_SPEEDS[-1])
+
+    def seek(self, position):
+        self.position = min(max(position, self.start_time), self.end_time)
+        self.replayed_until = self.position - SEEK_LOOKBACK
+        self.publish()
+
+    def tick(self):
+        # Called once per display frame; however fast the replay runs, each frame publishes
+        # only the latest state, which decimates the log to the display rate.
+        if not self.playing:
+            return
+        now = time.monotonic()
+        self.position = min(self.position + (now - self.last_tick) * self.speed, self.end_time)
+        self.last_tick = now
+        self.publish()
+        if self.position >= self.end_time:
+            self.pause()
+
+    def publish(self):
+        updates = self.source.updates_between(self.replayed_until, self.position)
+        self.replayed_until = self.position
+        for source_key, fields in updates.items():
+            key = self.keys.get(source_key)
+            if key is None:
+                key = self.keys[source_key] = ("replay", source_key)
+                self.telemetry_bus.register(key)
+                self.vehicle_found.emit(key)
+            self.telemetry_bus.publish(key, fields)
+        self.position_changed.emit(self.position)
@@ -1,9 +1,11 @@
 import sys
+import os
 from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QPushButton
-from pymavlink import mavutil
 from dronekit import connect, VehicleMode, LocationGlobalRelative
 from PySide6.QtCore import Qt
-import time
+sys.path.append(os.path.join(os.path.dirname(__file__), "drone_connect_control"))
+from command_executor import command_executor
+from setpoint_streamer import SetpointStreamer
 
 class DroneControlWidget(QWidget):
     def __init__(self):
@@ -29,64 +31,58 @@ class DroneControlWidget(QWidget):
         self.takeoff_button.clicked.connect(self.takeoff_vehicle)
         self.land_button.clicked.connect(self.land_vehicle)
 
+        self.executor = command_executor()
+
         self.connection_string = '172.30.16.1:14550'
         self.vehicle = connect(self.connection_string, wait_ready=True)
+        self.streamer = SetpointStreamer(self.vehicle, rate_hz=20)
+        self.streamer.start()
 
         self.velocity_x = 0
         self.velocity_y = 0
 
-    def arm_vehicle(self):
+    def arm_vehicle(self, then=None):
         print("Arming vehicle...")
-        self.vehicle.mode = VehicleMode("GUIDED")
-        while not self.vehicle.is_armable:
-            print(" Waiting for vehicle to initialize...")
-            time.sleep(1)
-        self.vehicle.arm()
-        while not self.vehicle.armed:
-            print(" Waiting for vehicle to arm...")
-            time.sleep(1)
-        print("Vehicle armed!")
+        def armed(success, message):
+            print("Vehicle armed!" if success else f"Arming failed: {message}")
+            if success and then:
+                then()
+        def armable(ready):
+            if ready:
+                self.executor.arm(self.vehicle, True, callback=armed)
+            else:
+                print("Vehicle did not become armable")
+        def guided(success, message):
+            if success:
+                self.executor.watch(lambda: self.vehicle.is_armable, armable, timeout=30)
+            else:
+                print(f"GUIDED rejected: {message}")
+        self.executor.set_mode(self.vehicle, "GUIDED", callback=guided)
 
     def disarm_vehicle(self):
         print("Disarming vehicle...")
-        self.vehicle.disarm()
-        while self.vehicle.armed:
-            print(" Waiting for vehicle to disarm...")
-            time.sleep(1)
-        print("Vehicle disarmed!")
+        self.executor.arm(self.vehicle, False, callback=lambda success, message:
+                          print("Vehicle disarmed!" if success else f"Disarming failed: {message}"))
 
     def takeoff_vehicle(self):
         altitude = 10  
         print(f"Taking off to {altitude} meters...")
-        self.vehicle.mode = VehicleMode("GUIDED")
-        self.vehicle.arm()
-        while not self.vehicle.armed:
-            print(" Waiting for vehicle to arm...")
-            time.sleep(1)
-        self.vehicle.simple_takeoff(altitude)
-        while True:
-            current_altitude = self.vehicle.location.global_relative_frame.alt
-            print(f" Altitude: {current_altitude}")
-            if current_altitude >= altitude * 0.95:
-                print("Reached target altitude")
-                break
-            time.sleep(1)
+        def reached(success):
+            print("Reached target altitude" if success else "Target altitude not reached")
+        def takeoff_sent(success, message):
+            if not success:
+                print(f"Takeoff rejected: {message}")
+                return
+            self.executor.watch(lambda: self.vehicle.location.global_relative_frame.alt >= altitude * 0.95,
+                                reached, timeout=60)
+        self.arm_vehicle(then=lambda: self.executor.takeoff(self.vehicle, altitude, callback=takeoff_sent))
 
     def land_vehicle(self):
         print("Landing...")
         self.vehicle.mode = VehicleMode("LAND")
 
     def send_velocity(self, vx, vy, vz):
-
-        msg = self.vehicle.message_factory.set_position_target_local_ned_encode(
-            0, 0, 0,    
-            mavutil.mavlink.MAV_FRAME_LOCAL_NED,  
-            0b0000111111000111,  
-            0, 0, 0,  
-            vx, vy, vz,  
-            0, 0, 0, 
-            0, 0)  
-        self.vehicle.send_mavlink(msg)
+        self.streamer.set_velocity(vx, vy, vz)
 
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_Up:
@@ -109,6 +105,7 @@ class DroneControlWidget(QWidget):
         self.send_velocity(self.velocity_x, self.velocity_y, 0)
 
     def closeEvent(self, event):
+        self.streamer.stop()
         self.vehicle.close()
         event.accept()
 
@@ -1,22 +1,72 @@
-import os
-from PySide6.QtWidgets import QWidget, QLabel, QSizePolicy
-from PySide6.QtCore import Qt, QRect
-from PySide6.QtGui import QPainter, QPixmap, QTransform
+from collections import OrderedDict
+from PySide6.QtWidgets import QWidget
+from PySide6.QtCore import Qt, QRect, QPointF
+from PySide6.QtGui import QPainter, QTransform
+from indicator.assets import asset_registry
+
+RENDER_TRANSFORM = "transform"
+RENDER_CACHED = "cached"
+
+class RotationCache:
+    def __init__(self, pixmap, step=1.0, max_bytes=32 * 1024 * 1024):
+        self.pixmap = pixmap
+        self.step = step
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+        self.entries = OrderedDict()
+
+    def get(self, angle):
+        bucket = round(angle / self.step) % round(360 / self.step)
+        rotated = self.entries.get(bucket)
+        if rotated is not None:
+            self.entries.move_to_end(bucket)
+            return rotated
+
+        rotated = self.pixmap.transformed(QTransform().rotate(bucket * self.step), Qt.SmoothTransformation)
+        rotated.setDevicePixelRatio(self.pixmap.devicePixelRatio())
+        self.entries[bucket] = rotated
+        self.bytes_used += self.pixmap_bytes(rotated)
+        while self.bytes_used > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes_used -= self.pixmap_bytes(evicted)
+        return rotated
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes_used = 0
+
+    @staticmethod
+    def pixmap_bytes(pixmap):
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
 
 class AttitudeIndicator(QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, render_mode=RENDER_TRANSFORM, angle_step=1.0, cache_bytes=32 * 1024 * 1024):
         super(AttitudeIndicator, self).__init__(parent)
         self.setFixedSize(355, 355)
         self.roll = 0  
         self.pitch = 0  
-        current_dir = os.path.dirname(os.path.abspath(__file__))
+        self.assets = asset_registry()
+        self.load_images()
+        self.set_render_mode(render_mode, angle_step, cache_bytes)
 
-        self.needle_image = QPixmap(os.path.join(current_dir, "image/background.jpg"))
-        self.roll_image = QPixmap(os.path.join(current_dir, "image/roll_cover.png"))
-        self.background_image = QPixmap(os.path.join(current_dir, "image/front_cover.png"))
+    def load_images(self):
+        dpr = self.devicePixelRatioF()
+        self.image_dpr = dpr
+        self.needle_image = self.assets.pixmap("background.jpg", 720, 720, dpr, Qt.KeepAspectRatio)
+        self.roll_image = self.assets.pixmap("roll_cover.png", 381, 381, dpr, Qt.KeepAspectRatio)
+        self.background_image = self.assets.pixmap("front_cover.png", 381, 381, dpr)
 
-        self.needle_image = self.needle_image.scaled(720, 720, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        self.roll_image = self.roll_image.scaled(381, 381, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    def set_render_mode(self, render_mode, angle_step=1.0, cache_bytes=32 * 1024 * 1024):
+        self.render_mode = render_mode
+        self.angle_step = angle_step
+        self.cache_bytes = cache_bytes
+        self.needle_cache = None
+        self.roll_cache = None
+        if render_mode == RENDER_CACHED:
+            # The horizon is about 3.5x the roll cover, so it gets the larger share of the budget.
+            self.needle_cache = RotationCache(self.needle_image, angle_step, cache_bytes * 3 // 4)
+            self.roll_cache = RotationCache(self.roll_image, angle_step, cache_bytes // 4)
+        self.update()
 
     def update_attitude(self, roll=None, pitch=None):
         self.roll = roll * 65 if roll is not None else 0
@@ -24,6 +74,10 @@ class AttitudeIndicator(QWidget):
         self.update()
 
     def paintEvent(self, event):
+        if self.devicePixelRatioF() != self.image_dpr:
+            self.load_images()
+            self.set_render_mode(self.render_mode, self.angle_step, self.cache_bytes)
+
         painter = QPainter(self)
         size = min(self.width(), self.height())
         center = self.rect().center()
@@ -33,21 +87,46 @@ class AttitudeIndicator(QWidget):
         clip_radius = size // 2
         painter.setClipRegion(QRect(center.x() - clip_radius, center.y() - clip_radius, clip_radius * 2, clip_radius * 2))
 
+        if self.render_mode == RENDER_CACHED:
+            self.draw_cached(painter, center, pitch_offset, roll_angle)
+        else:
+            self.draw_transformed(painter, center, pitch_offset, roll_angle)
+
+        painter.drawPixmap(QPointF(center.x() - 190.5, center.y() - 190.5), self.background_image)
+
+    def draw_transformed(self, painter, center, pitch_offset, roll_angle):
+        # Rotating the painter lets the paint engine sample the source pixmap directly,
+        # instead of allocating a freshly rotated copy of it every frame.
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+
+        painter.save()
+        painter.translate(center.x(), center.y() + pitch_offset)
+        painter.rotate(-roll_angle)
+        self.draw_centered(painter, self.needle_image)
+        painter.restore()
+
+        painter.save()
+        painter.translate(center.x(), center.y())
+        painter.rotate(-roll_angle)
+        self.draw_centered(painter, self.roll_image)
+        painter.restore()
+
+    def draw_cached(self, painter, center, pitch_offset, roll_angle):
         painter.save()
         painter.translate(center.x(), center.y() + pitch_offset)
-        combined_transform = QTransform().rotate(-roll_angle)
-        rotated_needle = self.needle_image.transformed(combined_transform, Qt.SmoothTransformation)
-        painter.drawPixmap(-rotated_needle.width() // 2, -rotated_needle.height() // 2, rotated_needle)
+        rotated_needle = self.needle_cache.get(-roll_angle)
+        self.draw_centered(painter, rotated_needle)
         painter.restore()
 
         painter.save()
         painter.translate(center.x(), center.y())
-        roll_transform = QTransform().rotate(-roll_angle)
-        rotated_roll_image = self.roll_image.transformed(roll_transform, Qt.SmoothTransformation)
-        painter.drawPixmap(-rotated_roll_image.width() // 2, -rotated_roll_image.height() // 2, rotated_roll_image)
+        rotated_roll_image = self.roll_cache.get(-roll_angle)
+        self.draw_centered(painter, rotated_roll_image)
         painter.restore()
 
-        painter.drawPixmap(center.x() - 190.5, center.y() - 190.5, 381, 381, self.background_image)
+    def draw_centered(self, painter, pixmap):
+        size = pixmap.deviceIndependentSize()
+        painter.drawPixmap(int(-size.width() // 2), int(-size.height() // 2), pixmap)
 
     def reset_attitude(self):
         self.update_attitude(roll=0, pitch=0)
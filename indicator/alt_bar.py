@@ -1,6 +1,7 @@
 from PySide6.QtWidgets import QWidget
-from PySide6.QtCore import QTimer, Qt
+from PySide6.QtCore import Qt
 from PySide6.QtGui import QColor, QPainter, QFont
+from indicator.layer_cache import StaticLayer
 
 MAX_ALTITUDE = 150.0
 BAR_WIDTH = 50  
@@ -12,13 +13,12 @@ class AltitudeBar(QWidget):
         self.vehicle = vehicle 
         self.altitude = 0  
         self.setFixedSize(BAR_WIDTH, BAR_HEIGHT_PX)
+        self.scale_layer = StaticLayer(self.draw_scale)
 
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_altitude)
-        self.timer.start(500)
-
-    def update_altitude(self):
-        if self.vehicle and self.vehicle.location.global_relative_frame:
+    def update_altitude(self, altitude=None):
+        if altitude is not None:
+            self.altitude = altitude
+        elif self.vehicle and self.vehicle.location.global_relative_frame:
             altitude = self.vehicle.location.global_relative_frame.alt
             self.altitude = altitude if altitude is not None else 0
         else:
@@ -31,6 +31,7 @@ class AltitudeBar(QWidget):
         color = QColor(color_intensity * 255, 0, (1 - color_intensity) * 255)
 
         painter = QPainter(self)
+        painter.drawPixmap(0, 0, self.scale_layer.get(self, MAX_ALTITUDE, BAR_WIDTH, BAR_HEIGHT_PX))
         painter.setRenderHint(QPainter.Antialiasing)
     
         painter.setBrush(color)
@@ -42,6 +43,8 @@ class AltitudeBar(QWidget):
         text_y_position = max(10, text_y_position)
         painter.drawText(5, text_y_position, f"{self.altitude:.1f} m")
 
+    def draw_scale(self, painter, width, height):
+        painter.setRenderHint(QPainter.Antialiasing)
         painter.setPen(Qt.white)
         painter.setFont(QFont("Arial", 5))
         offset = 10
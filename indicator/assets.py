@@ -0,0 +1,107 @@
+import json
+import os
+from PySide6.QtCore import Qt, QRect
+from PySide6.QtGui import QImage, QPainter, QPixmap
+
+IMAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "image")
+ATLAS_IMAGE = "atlas.png"
+ATLAS_INDEX = "atlas.json"
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+class AssetRegistry:
+    def __init__(self, image_dir=IMAGE_DIR, use_atlas=True):
+        self.image_dir = image_dir
+        self.sources = {}
+        self.variants = {}
+        self.atlas = None
+        self.atlas_rects = {}
+        if use_atlas:
+            self.load_atlas()
+
+    def load_atlas(self):
+        image_path = os.path.join(self.image_dir, ATLAS_IMAGE)
+        index_path = os.path.join(self.image_dir, ATLAS_INDEX)
+        if not (os.path.exists(image_path) and os.path.exists(index_path)):
+            return False
+
+        with open(index_path) as f:
+            rects = json.load(f)
+        atlas = QImage(image_path)
+        if atlas.isNull():
+            print(f"Error loading texture atlas: {image_path}")
+            return False
+
+        self.atlas = atlas
+        self.atlas_rects = {name: QRect(*rect) for name, rect in rects.items()}
+        return True
+
+    def source(self, name):
+        image = self.sources.get(name)
+        if image is None:
+            if name in self.atlas_rects:
+                image = self.atlas.copy(self.atlas_rects[name])
+            else:
+                image = QImage(os.path.join(self.image_dir, name))
+                if image.isNull():
+                    print(f"Error loading image asset: {name}")
+            self.sources[name] = image
+        return image
+
+    def pixmap(self, name, width=None, height=None, device_pixel_ratio=1.0, aspect_mode=Qt.IgnoreAspectRatio):
+        key = (name, width, height, device_pixel_ratio, aspect_mode)
+        pixmap = self.variants.get(key)
+        if pixmap is None:
+            image = self.source(name)
+            if width is not None and height is not None and not image.isNull():
+                image = image.scaled(round(width * device_pixel_ratio), round(height * device_pixel_ratio),
+                                     aspect_mode, Qt.SmoothTransformation)
+            pixmap = QPixmap.fromImage(image)
+            pixmap.setDevicePixelRatio(device_pixel_ratio)
+            self.variants[key] = pixmap
+        return pixmap
+
+    def clear_variants(self):
+        self.variants.clear()
+
+def build_atlas(image_dir=IMAGE_DIR, max_width=2048, padding=2):
+    names = sorted(name for name in os.listdir(image_dir)
+                   if name.lower().endswith(IMAGE_EXTENSIONS) and name != ATLAS_IMAGE)
+    images = {name: QImage(os.path.join(image_dir, name)) for name in names}
+
+    # Shelf packing, tallest images first.
+    rects = {}
+    x = y = shelf_height = atlas_width = 0
+    for name in sorted(names, key=lambda name: images[name].height(), reverse=True):
+        image = images[name]
+        if x and x + image.width() > max_width:
+            x = 0
+            y += shelf_height + padding
+            shelf_height = 0
+        rects[name] = (x, y, image.width(), image.height())
+        x += image.width() + padding
+        shelf_height = max(shelf_height, image.height())
+        atlas_width = max(atlas_width, x)
+
+    atlas = QImage(atlas_width, y + shelf_height, QImage.Format_ARGB32_Premultiplied)
+    atlas.fill(Qt.transparent)
+    painter = QPainter(atlas)
+    for name, rect in rects.items():
+        painter.drawImage(rect[0], rect[1], images[name])
+    painter.end()
+
+    atlas.save(os.path.join(image_dir, ATLAS_IMAGE))
+    with open(os.path.join(image_dir, ATLAS_INDEX), "w") as f:
+        json.dump(rects, f, indent=2)
+    return rects
+
+_registry = None
+
+def asset_registry():
+    global _registry
+    if _registry is None:
+        _registry = AssetRegistry()
+    return _registry
+
+if __name__ == "__main__":
+    packed = build_atlas()
+    print(f"Packed {len(packed)} images into {os.path.join(IMAGE_DIR, ATLAS_IMAGE)}")
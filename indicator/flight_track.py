@@ -0,0 +1,81 @@
+import math
+import numpy as np
+
+EARTH_RADIUS_M = 6371000.0
+
+class FlightTrack:
+    # Keeps the raw fixes in a fixed-size ring buffer and simplifies them as they arrive with an
+    # opening-window Douglas-Peucker: a fix becomes a track vertex only once the straight segment
+    # from the last vertex can no longer represent the fixes in between within `tolerance` metres.
+    def __init__(self, capacity=36000, tolerance=1.0, max_window=256):
+        self.capacity = capacity
+        self.tolerance = tolerance
+        self.max_window = min(max_window, capacity - 1)
+        self.points = np.zeros((capacity, 2), dtype=np.float64)
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.head = 0
+        self.count = 0
+        self.anchor = None
+        self.window_start = 0
+        self.window_length = 0
+        self.vertex_count = 0
+
+    def add(self, lat, lon, timestamp=0.0):
+        index = self.head
+        self.points[index] = (lat, lon)
+        self.times[index] = timestamp
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+        if self.anchor is None:
+            self.anchor = (lat, lon)
+            self.window_start = self.head
+            self.window_length = 0
+            self.vertex_count += 1
+            return [self.anchor]
+
+        if self.window_length and (self.window_length >= self.max_window or self.exceeds_tolerance(lat, lon)):
+            previous = (self.head - 2) % self.capacity
+            vertex = (float(self.points[previous, 0]), float(self.points[previous, 1]))
+            self.anchor = vertex
+            self.window_start = index
+            self.window_length = 1
+            self.vertex_count += 1
+            return [vertex]
+
+        self.window_length += 1
+        return []
+
+    def exceeds_tolerance(self, lat, lon):
+        # Fixes between the anchor and the new point, projected to metres around the anchor.
+        indices = (self.window_start + np.arange(self.window_length)) % self.capacity
+        window = self.points[indices]
+        lat0, lon0 = self.anchor
+        scale = math.radians(1.0) * EARTH_RADIUS_M
+        cos_lat = math.cos(math.radians(lat0))
+        xs = (window[:, 1] - lon0) * cos_lat * scale
+        ys = (window[:, 0] - lat0) * scale
+        end_x = (lon - lon0) * cos_lat * scale
+        end_y = (lat - lat0) * scale
+
+        length_sq = end_x * end_x + end_y * end_y
+        if length_sq == 0.0:
+            distances_sq = xs * xs + ys * ys
+        else:
+            t = np.clip((xs * end_x + ys * end_y) / length_sq, 0.0, 1.0)
+            dx = xs - t * end_x
+            dy = ys - t * end_y
+            distances_sq = dx * dx + dy * dy
+        return bool(distances_sq.max() > self.tolerance * self.tolerance)
+
+    def recent(self, n=None):
+        n = self.count if n is None else min(n, self.count)
+        indices = (self.head - n + np.arange(n)) % self.capacity
+        return self.points[indices], self.times[indices]
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+        self.anchor = None
+        self.window_length = 0
+        self.vertex_count = 0
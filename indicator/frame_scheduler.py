@@ -0,0 +1,99 @@
+import time
+from PySide6.QtCore import QObject, QTimer, Qt
+from PySide6.QtWidgets import QApplication
+
+FRAME_RATE = 60
+HIDDEN_POLL_INTERVAL = 0.5
+
+
+class FrameConsumer:
+    def __init__(self, callback, rate, widget=None):
+        self.callback = callback
+        self.period = 1.0 / rate
+        self.widget = widget
+        self.next_due = 0.0
+
+    def is_active(self):
+        if self.widget is None:
+            return True
+        window = self.widget.window()
+        return self.widget.isVisible() and not window.isMinimized()
+
+
+class FrameScheduler(QObject):
+    def __init__(self, frame_rate=FRAME_RATE, parent=None):
+        super().__init__(parent)
+        self.frame_interval = 1.0 / frame_rate
+        self.consumers = []
+        self.monitor = None
+        self.expected_at = None
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.tick)
+
+    def register(self, callback, rate, widget=None):
+        consumer = FrameConsumer(callback, min(rate, 1.0 / self.frame_interval), widget)
+        consumer.next_due = time.monotonic()
+        self.consumers.append(consumer)
+        if widget is not None:
+            widget.destroyed.connect(lambda *_: self.unregister(consumer))
+        self._schedule()
+        return consumer
+
+    def unregister(self, consumer):
+        if consumer in self.consumers:
+            self.consumers.remove(consumer)
+        self._schedule()
+
+    def tick(self):
+        # Every consumer due in this frame runs back to back, so the update() calls they make
+        # are painted together in a single pass instead of one pass per timer.
+        now = time.monotonic()
+        monitor = self.monitor
+        if monitor is not None and self.expected_at is not None:
+            monitor.record("loop", "", max(now - self.expected_at, 0.0))
+        for consumer in list(self.consumers):
+            if now < consumer.next_due:
+                continue
+            if not consumer.is_active():
+                consumer.next_due = now + max(consumer.period, HIDDEN_POLL_INTERVAL)
+                continue
+            consumer.next_due += consumer.period
+            if consumer.next_due <= now:
+                consumer.next_due = now + consumer.period
+            try:
+                if monitor is None:
+                    consumer.callback()
+                else:
+                    start = time.perf_counter()
+                    consumer.callback()
+                    monitor.frame_callback(consumer.callback, time.perf_counter() - start)
+            except Exception as e:
+                print(f"Error in frame consumer {consumer.callback}: {e}")
+        self._schedule()
+
+    def _schedule(self):
+        if not self.consumers:
+            self.timer.stop()
+            return
+        now = time.monotonic()
+        next_due = min(consumer.next_due for consumer in self.consumers)
+        # Wake at most once per frame, and only when some consumer is actually due.
+        delay = max(next_due - now, 0.0)
+        if self.timer.isActive() and self.timer.remainingTime() <= delay * 1000:
+            return
+        interval = max(int(delay * 1000), 1)
+        self.expected_at = now + interval / 1000.0
+        self.timer.start(interval)
+
+
+_scheduler = None
+
+
+def frame_scheduler():
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = FrameScheduler(parent=QApplication.instance())
+    return _scheduler
@@ -0,0 +1,164 @@
+import math
+from collections import namedtuple
+from PySide6.QtWidgets import QWidget, QLabel
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QPainter
+from indicator.assets import asset_registry
+from indicator.layer_cache import StaticLayer
+
+SCALE_TABLE_SIZE = 1024
+
+# background/needle: asset names; source: telemetry snapshot field; vehicle_attribute: dotted dronekit
+# attribute read when no value is given; precision: digits the value is rounded to before it is shown;
+# needle_scale: needle size relative to the dial.
+GaugeConfig = namedtuple("GaugeConfig", (
+    "background", "needle", "scale", "source", "vehicle_attribute", "precision", "label_format", "label_anchor",
+    "needle_scale",
+), defaults=(None, 1, "{}", "bottom_left", 2.0))
+
+# anchor -> (label size, alignment, style sheet)
+LABEL_STYLES = {
+    "bottom_left": ((50, 30), Qt.AlignLeft | Qt.AlignBottom,
+                    "color: white; font-size: 11px; background-color: transparent; font-weight: bold; padding: 3px;"),
+    "center": ((30, 30), Qt.AlignCenter,
+               "color: white; font-size: 10px; background-color: transparent; font-weight: bold;"),
+}
+
+class Scale:
+    # Value -> needle angle. The mapping is sampled once into a table, evenly spaced over the value
+    # (or log value) domain, so each lookup is one index computation and one interpolation.
+    def __init__(self, points, log=False, period=None, size=SCALE_TABLE_SIZE):
+        points = sorted(points)
+        if log and points[0][0] <= 0:
+            raise ValueError(f"log scale needs a positive lower bound, got {points[0][0]}")
+        self.log = log
+        self.period = period
+        self.min_value = points[0][0]
+        self.max_value = points[-1][0]
+        domain = [(self.to_domain(value), angle) for value, angle in points]
+        self.low = domain[0][0]
+        span = domain[-1][0] - self.low
+        self.inverse_step = (size - 1) / span
+        self.table = [self.interpolate(domain, self.low + span * i / (size - 1)) for i in range(size)]
+
+    def to_domain(self, value):
+        return math.log(value) if self.log else float(value)
+
+    @staticmethod
+    def interpolate(domain, position):
+        for (x0, a0), (x1, a1) in zip(domain, domain[1:]):
+            if position <= x1:
+                return a0 + (a1 - a0) * (position - x0) / (x1 - x0) if x1 > x0 else a1
+        return domain[-1][1]
+
+    def angle(self, value):
+        if self.period is not None:
+            value %= self.period
+        if value <= self.min_value:
+            return self.table[0]
+        if value >= self.max_value:
+            return self.table[-1]
+        position = (self.to_domain(value) - self.low) * self.inverse_step
+        index = int(position)
+        low = self.table[index]
+        return low + (self.table[index + 1] - low) * (position - index)
+
+def piecewise_scale(*points):
+    return Scale(points)
+
+def linear_scale(low, high, start_angle=0, end_angle=270):
+    return Scale(((low, start_angle), (high, end_angle)))
+
+def log_scale(low, high, start_angle=0, end_angle=270):
+    return Scale(((low, start_angle), (high, end_angle)), log=True)
+
+def circular_scale(period=360):
+    return Scale(((0, 0), (period, period)), period=period)
+
+GAUGES = {
+    "altimeter": GaugeConfig("alt_back.png", "needle.png", piecewise_scale((0, 0), (10, 90), (50, 180), (150, 270)),
+                             "altitude", "location.global_relative_frame.alt", label_format="{} m"),
+    "groundspeed": GaugeConfig("speed_back.png", "needle.png", linear_scale(0, 45), "groundspeed", "groundspeed",
+                               label_format="{} m/s"),
+    "airspeed": GaugeConfig("speed_back.png", "needle.png", linear_scale(0, 45), "airspeed", "airspeed",
+                            label_format="{} m/s"),
+    "heading": GaugeConfig("com_back.png", "com_needle.png", circular_scale(360), "heading", "heading", precision=None,
+                           label_format="{}*", label_anchor="center"),
+}
+
+class Gauge(QWidget):
+    def __init__(self, config, vehicle=None, parent=None):
+        super(Gauge, self).__init__(parent)
+        self.config = config
+        self.vehicle = vehicle
+        self.value = 0
+        self.angle = None
+        self.assets = asset_registry()
+        self.background_layer = StaticLayer(self.draw_background)
+        self.needle = None
+        self.needle_key = None
+        self.center = self.rect().center()
+
+        size, alignment, style = LABEL_STYLES[config.label_anchor]
+        self.label = QLabel(self)
+        self.label.setAlignment(alignment)
+        self.label.setStyleSheet(style)
+        self.label.setFixedSize(*size)
+        self.update_value(0)
+
+    def update_value(self, value=None):
+        if value is None:
+            value = self.vehicle_value()
+        # precision None truncates to an integer, as the heading readout always has.
+        value = int(value) if self.config.precision is None else round(value, self.config.precision)
+        angle = self.config.scale.angle(value)
+        if value == self.value and angle == self.angle:
+            return
+        self.value = value
+        self.label.setText(self.config.label_format.format(value))
+        # Only repaint when the needle actually moves.
+        if angle != self.angle:
+            self.angle = angle
+            self.update()
+
+    def vehicle_value(self):
+        if self.vehicle is None or self.config.vehicle_attribute is None:
+            return 0
+        value = self.vehicle
+        for part in self.config.vehicle_attribute.split("."):
+            value = getattr(value, part, None)
+        return value or 0
+
+    def set_vehicle(self, vehicle):
+        self.vehicle = vehicle
+
+    def resizeEvent(self, event):
+        self.center = self.rect().center()
+        if self.config.label_anchor == "center":
+            self.label.move(self.width() // 2 - self.label.width() // 2, self.height() // 2 - self.label.height() // 2)
+        else:
+            self.label.move(40, self.height() - 80)
+
+    def draw_background(self, painter, width, height):
+        bg_size = min(width, height)
+        background = self.assets.pixmap(self.config.background, bg_size, bg_size, self.devicePixelRatioF())
+        painter.drawPixmap(self.center.x() - bg_size // 2, self.center.y() - bg_size // 2, background)
+
+    def needle_pixmap(self):
+        dpr = self.devicePixelRatioF()
+        needle_size = round(min(self.width(), self.height()) * self.config.needle_scale)
+        key = (needle_size, dpr)
+        if key != self.needle_key:
+            self.needle = self.assets.pixmap(self.config.needle, needle_size, needle_size, dpr)
+            self.needle_key = key
+        return self.needle
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self.background_layer.get(self, self.config.background))
+
+        needle = self.needle_pixmap()
+        needle_size = self.needle_key[0]
+        painter.translate(self.center.x(), self.center.y())
+        painter.rotate(self.angle)
+        painter.drawPixmap(-needle_size // 2, -needle_size // 2, needle)
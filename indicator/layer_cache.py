@@ -0,0 +1,27 @@
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QPainter, QPixmap
+
+class StaticLayer:
+    def __init__(self, render):
+        # render(painter, width, height) draws everything that does not change between frames.
+        self.render = render
+        self.pixmap = None
+        self.key = None
+
+    def get(self, widget, *config):
+        dpr = widget.devicePixelRatioF()
+        key = (widget.width(), widget.height(), dpr) + config
+        if key != self.key:
+            pixmap = QPixmap(round(widget.width() * dpr), round(widget.height() * dpr))
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(Qt.transparent)
+            painter = QPainter(pixmap)
+            self.render(painter, widget.width(), widget.height())
+            painter.end()
+            self.pixmap = pixmap
+            self.key = key
+        return self.pixmap
+
+    def invalidate(self):
+        self.pixmap = None
+        self.key = None
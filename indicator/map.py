@@ -1,27 +1,114 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout
-from PySide6.QtWebEngineWidgets import QWebEngineView
-from PySide6.QtCore import QTimer
+import math
+from PySide6.QtWidgets import QLabel, QWidget, QVBoxLayout
+from PySide6.QtCore import QObject, Qt, QUrl, Signal, Slot
+from indicator.frame_scheduler import frame_scheduler
+from indicator.flight_track import FlightTrack
+
+MAP_RATE = 5
+TRACK_CHUNK_SIZE = 500
+EARTH_RADIUS_M = 6371000.0
+
+class MapBridge(QObject):
+    positionChanged = Signal(float, float, float)
+    trackAppended = Signal(list)
+    trackCleared = Signal()
+    fleetChanged = Signal(list)
+    fleetRemoved = Signal(list)
+    missionChanged = Signal(list)
+    missionEditingChanged = Signal(bool)
+    # Raised from the page when waypoints are edited on the map.
+    waypointAdded = Signal(float, float)
+    waypointMoved = Signal(int, float, float)
+    waypointRemoved = Signal(int)
+
+    @Slot(float, float)
+    def addWaypoint(self, lat, lon):
+        self.waypointAdded.emit(lat, lon)
+
+    @Slot(int, float, float)
+    def moveWaypoint(self, index, lat, lon):
+        self.waypointMoved.emit(index, lat, lon)
+
+    @Slot(int)
+    def removeWaypoint(self, index):
+        self.waypointRemoved.emit(index)
+
+DRONE_ICON_SVG = (
+    '<svg id="drone-icon" class="custom-icon" viewBox="0 0 24 24" width="24" height="24">'
+    '<path fill="#ff0000" d="M12 1 L13.5 8 L22 13 L22 15 L13.5 12.5 L13 19 L16 21.5 L16 23 L12 22 '
+    'L8 23 L8 21.5 L11 19 L10.5 12.5 L2 15 L2 13 L10.5 8 Z"/></svg>'
+)
 
 class MapWidget(QWidget):
-    def __init__(self, vehicle=None):
+    # Emitted once the Leaflet page has finished loading.
+    loaded = Signal()
+
+    def __init__(self, vehicle=None, position_threshold=0.5, heading_threshold=2.0, recenter_margin=0.2, tile_store=None,
+                 track_capacity=36000, track_tolerance=1.0, track_max_vertices=5000):
         super().__init__()
         self.vehicle = vehicle
 
         self.default_lat = 37.5665  
         self.default_lon = 126.9780
         self.default_heading = 0
+        self.position_consumer = None
 
-        self.view = QWebEngineView()
-        layout = QVBoxLayout(self)
-        layout.addWidget(self.view)
-        layout.setContentsMargins(0, 0, 0, 0)
+        # Updates smaller than these (metres / degrees) are not sent to the page.
+        self.position_threshold = position_threshold
+        self.heading_threshold = heading_threshold
+        # Fraction of the viewport kept as a border; the map recenters only when the marker enters it.
+        self.recenter_margin = recenter_margin
+        self.last_sent = None
 
-        self.update_map()
+        self.track = FlightTrack(track_capacity, track_tolerance)
+        self.track_max_vertices = track_max_vertices
+        self.pending_vertices = []
+
+        self.position = None
+        self.pending_fleet = {}
+        self.removed_fleet = set()
+
+        self.mission = None
+        self.mission_dirty = False
+        self.mission_editing = False
+
+        self.bridge = MapBridge(self)
+        self.tile_store = tile_store
+        self.view = None
+        self.channel = None
+        self.scheme_handler = None
 
+        # QtWebEngine is only imported and the page only built in load(), so the window can show
+        # its instruments first; everything sent to the map before then is buffered here.
+        self.placeholder = QLabel("Loading map...")
+        self.placeholder.setAlignment(Qt.AlignCenter)
+        self.placeholder.setStyleSheet("color: white; background-color: #101010;")
+        self.map_layout = QVBoxLayout(self)
+        self.map_layout.addWidget(self.placeholder)
+        self.map_layout.setContentsMargins(0, 0, 0, 0)
+
+    def load(self):
+        if self.view is not None:
+            return
+        from PySide6.QtWebEngineWidgets import QWebEngineView
+        from PySide6.QtWebChannel import QWebChannel
+        from indicator.tile_cache import install_map_scheme_handler
+
+        self.view = QWebEngineView()
+        self.scheme_handler = install_map_scheme_handler(self.view.page().profile(), self.tile_store)
+        self.channel = QWebChannel(self)
+        self.channel.registerObject("bridge", self.bridge)
+        self.view.page().setWebChannel(self.channel)
         self.view.loadFinished.connect(self.start_update_position)
 
+        self.update_map()
+        self.map_layout.replaceWidget(self.placeholder, self.view)
+        self.placeholder.deleteLater()
+        self.placeholder = None
+
     def update_map(self):
         lat, lon, heading = self.get_gps_info()
+        self.last_sent = (lat, lon, heading)
 
         html_content = f"""
         <!DOCTYPE html>
@@ -40,50 +127,217 @@ class MapWidget(QWidget):
                     background: rgba(255, 255, 255, 0);
                 }}
                 .custom-icon {{
-                    font-size: 24px;
-                    color: #ff0000; 
                     transform-origin: center center; 
                 }}
+                .waypoint {{
+                    width: 18px;
+                    height: 18px;
+                    border-radius: 9px;
+                    background: #00c8ff;
+                    color: #000;
+                    font: bold 10px sans-serif;
+                    line-height: 18px;
+                    text-align: center;
+                }}
             </style>
-            <script src="https://kit.fontawesome.com/bed121fae5.js" crossorigin="anonymous"></script>
-            <link rel="stylesheet" href="https://unpkg.com/leaflet@1.7.1/dist/leaflet.css" />
+            <link rel="stylesheet" href="static/leaflet.css" />
         </head>
         <body>
             <div id="mapid"></div>
 
-            <script src="https://unpkg.com/leaflet@1.7.1/dist/leaflet.js"></script>
+            <script src="static/leaflet.js"></script>
+            <script src="static/qwebchannel.js"></script>
             <script>
                 document.addEventListener("DOMContentLoaded", function() {{
+                    if (typeof L === 'undefined') {{
+                        // Leaflet is fetched once from the network and cached; there was no copy yet.
+                        var notice = document.getElementById('mapid');
+                        notice.style.cssText = 'color: white; font: 14px sans-serif; display: flex; ' +
+                            'align-items: center; justify-content: center;';
+                        notice.textContent = 'Map unavailable: Leaflet could not be downloaded. ' +
+                            'Connect to the internet once so it can be cached.';
+                        return;
+                    }}
                     var map = L.map('mapid', {{ zoomControl: false }}).setView([{lat}, {lon}], 18);
 
-                    L.tileLayer('https://{{s}}.tile.openstreetmap.org/{{z}}/{{x}}/{{y}}.png', {{
+                    L.tileLayer('tiles/{{z}}/{{x}}/{{y}}.png', {{
                         maxZoom: 19,
                     }}).addTo(map);
 
                     var customIcon = L.divIcon({{
-                        html: '<i class="fa-solid fa-jet-fighter-up custom-icon" id="drone-icon"></i>',
+                        html: '{DRONE_ICON_SVG}',
                         className: '',
                         iconSize: [70, 70],  
                         iconAnchor: [15, 15]  
                     }});
 
                     var marker = L.marker([{lat}, {lon}], {{ icon: customIcon }}).addTo(map);
+                    var trackStyle = {{ color: '#ff0000', weight: 2, opacity: 0.8 }};
+                    var trackChunks = [];
+                    var trackVertexCount = 0;
+                    var lastVertex = null;
+                    var trackTail = L.polyline([], trackStyle).addTo(map);
+                    var iconElement = null;
+                    var pending = null;
+
+                    function applyPending() {{
+                        var position = pending;
+                        pending = null;
+                        var latLng = L.latLng(position[0], position[1]);
+                        marker.setLatLng(latLng);
+                        if (lastVertex) {{
+                            trackTail.setLatLngs([lastVertex, latLng]);
+                        }}
+                        if (!map.getBounds().pad(-{self.recenter_margin}).contains(latLng)) {{
+                            map.panTo(latLng);
+                        }}
+                        iconElement = iconElement || document.getElementById("drone-icon");
+                        if (iconElement) {{
+                            iconElement.style.transform = "rotate(" + position[2] + "deg)";
+                        }}
+                    }}
 
                     window.updateMarker = function(lat, lon, heading) {{
-                        marker.setLatLng([lat, lon]);
-                        map.setView([lat, lon], map.getZoom());
-                        var iconElement = document.getElementById("drone-icon");
-                        iconElement.style.transform = "rotate(" + heading + "deg)"; 
+                        if (pending === null) {{
+                            requestAnimationFrame(applyPending);
+                        }}
+                        pending = [lat, lon, heading];
+                    }};
+
+                    // The track is split into fixed-size polylines so appending only redraws the newest
+                    // chunk, and the oldest chunk is dropped once the vertex budget is exceeded.
+                    window.appendTrack = function(vertices) {{
+                        for (var i = 0; i < vertices.length; i++) {{
+                            var chunk = trackChunks[trackChunks.length - 1];
+                            if (!chunk || chunk.getLatLngs().length >= {TRACK_CHUNK_SIZE}) {{
+                                chunk = L.polyline(lastVertex ? [lastVertex] : [], trackStyle).addTo(map);
+                                trackChunks.push(chunk);
+                            }}
+                            chunk.addLatLng(vertices[i]);
+                            lastVertex = L.latLng(vertices[i][0], vertices[i][1]);
+                            trackVertexCount++;
+                        }}
+                        while (trackVertexCount > {self.track_max_vertices} && trackChunks.length > 1) {{
+                            var oldest = trackChunks.shift();
+                            trackVertexCount -= oldest.getLatLngs().length;
+                            map.removeLayer(oldest);
+                        }}
+                    }};
+
+                    window.clearTrack = function() {{
+                        trackChunks.forEach(function(chunk) {{ map.removeLayer(chunk); }});
+                        trackChunks = [];
+                        trackVertexCount = 0;
+                        lastVertex = null;
+                        trackTail.setLatLngs([]);
+                    }};
+
+                    var fleetMarkers = {{}};
+
+                    // One batched call per map frame carries every other vehicle that moved.
+                    window.updateFleet = function(entries) {{
+                        for (var i = 0; i < entries.length; i++) {{
+                            var entry = entries[i];
+                            var fleetMarker = fleetMarkers[entry[0]];
+                            if (!fleetMarker) {{
+                                fleetMarker = L.circleMarker([entry[1], entry[2]], {{
+                                    radius: 6, color: '#ffff00', weight: 2, fillOpacity: 0.8
+                                }}).bindTooltip(entry[4]).addTo(map);
+                                fleetMarkers[entry[0]] = fleetMarker;
+                            }} else {{
+                                fleetMarker.setLatLng([entry[1], entry[2]]);
+                            }}
+                        }}
+                    }};
+
+                    window.removeFleet = function(keys) {{
+                        keys.forEach(function(key) {{
+                            if (fleetMarkers[key]) {{
+                                map.removeLayer(fleetMarkers[key]);
+                                delete fleetMarkers[key];
+                            }}
+                        }});
+                    }};
+
+                    var bridge = null;
+                    var missionMarkers = [];
+                    var missionEditing = false;
+                    var missionLine = L.polyline([], {{ color: '#00c8ff', weight: 2, dashArray: '6 4' }}).addTo(map);
+
+                    function waypointIcon(index) {{
+                        return L.divIcon({{ html: '<div class="waypoint">' + (index + 1) + '</div>', className: '',
+                                            iconSize: [18, 18], iconAnchor: [9, 9] }});
+                    }}
+
+                    function missionLatLngs() {{
+                        return missionMarkers.map(function(waypoint) {{ return waypoint.getLatLng(); }});
                     }}
+
+                    function addMissionMarker(index, point) {{
+                        var waypoint = L.marker(point, {{ icon: waypointIcon(index), draggable: missionEditing }}).addTo(map);
+                        waypoint.on('drag', function() {{ missionLine.setLatLngs(missionLatLngs()); }});
+                        waypoint.on('dragend', function() {{
+                            var position = waypoint.getLatLng();
+                            bridge.moveWaypoint(missionMarkers.indexOf(waypoint), position.lat, position.lng);
+                        }});
+                        waypoint.on('contextmenu', function() {{
+                            if (missionEditing) {{
+                                bridge.removeWaypoint(missionMarkers.indexOf(waypoint));
+                            }}
+                        }});
+                        return waypoint;
+                    }}
+
+                    // Markers are reused across updates; only the count difference is created or removed.
+                    window.setMission = function(points) {{
+                        for (var i = 0; i < points.length; i++) {{
+                            if (i < missionMarkers.length) {{
+                                missionMarkers[i].setLatLng(points[i]);
+                            }} else {{
+                                missionMarkers.push(addMissionMarker(i, points[i]));
+                            }}
+                        }}
+                        while (missionMarkers.length > points.length) {{
+                            map.removeLayer(missionMarkers.pop());
+                        }}
+                        missionLine.setLatLngs(points);
+                    }};
+
+                    window.setMissionEditing = function(enabled) {{
+                        missionEditing = enabled;
+                        missionMarkers.forEach(function(waypoint) {{
+                            if (enabled) {{ waypoint.dragging.enable(); }} else {{ waypoint.dragging.disable(); }}
+                        }});
+                    }};
+
+                    map.on('click', function(event) {{
+                        if (missionEditing && bridge) {{
+                            bridge.addWaypoint(event.latlng.lat, event.latlng.lng);
+                        }}
+                    }});
+
+                    new QWebChannel(qt.webChannelTransport, function(channel) {{
+                        bridge = channel.objects.bridge;
+                        bridge.missionChanged.connect(window.setMission);
+                        bridge.missionEditingChanged.connect(window.setMissionEditing);
+                        channel.objects.bridge.positionChanged.connect(window.updateMarker);
+                        channel.objects.bridge.trackAppended.connect(window.appendTrack);
+                        channel.objects.bridge.trackCleared.connect(window.clearTrack);
+                        channel.objects.bridge.fleetChanged.connect(window.updateFleet);
+                        channel.objects.bridge.fleetRemoved.connect(window.removeFleet);
+                    }});
                 }});
             </script>
         </body>
         </html>
         """
 
-        self.view.setHtml(html_content)
+        from indicator.tile_cache import MAP_BASE_URL
+        self.view.setHtml(html_content, QUrl(MAP_BASE_URL))
 
     def get_gps_info(self):
+        if self.position:
+            return self.position
         if self.vehicle:
             location = self.vehicle.location.global_frame
             heading = self.vehicle.heading
@@ -94,13 +348,85 @@ class MapWidget(QWidget):
         return lat, lon, heading
 
     def start_update_position(self):
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_position)
-        self.timer.start(10)
+        if self.position_consumer is None:
+            self.position_consumer = frame_scheduler().register(self.update_position, MAP_RATE, self)
+            self.bridge.missionEditingChanged.emit(self.mission_editing)
+            if self.mission is not None:
+                self.mark_mission_dirty()
+            self.loaded.emit()
 
     def update_position(self):
+        if self.pending_vertices:
+            self.bridge.trackAppended.emit(self.pending_vertices)
+            self.pending_vertices = []
+        if self.removed_fleet:
+            self.bridge.fleetRemoved.emit(list(self.removed_fleet))
+            self.removed_fleet = set()
+        if self.pending_fleet:
+            self.bridge.fleetChanged.emit(list(self.pending_fleet.values()))
+            self.pending_fleet = {}
+        if self.mission_dirty:
+            self.mission_dirty = False
+            self.bridge.missionChanged.emit(self.mission.coordinates())
+
         lat, lon, heading = self.get_gps_info()
-        self.view.page().runJavaScript(f"updateMarker({lat}, {lon}, {heading});")
+        if lat is None or lon is None:
+            return
+        heading = heading or 0
+        if self.last_sent is not None and not self.has_moved(self.last_sent, (lat, lon, heading)):
+            return
+        self.last_sent = (lat, lon, heading)
+        self.bridge.positionChanged.emit(lat, lon, heading)
+
+    def has_moved(self, previous, current):
+        lat0, lon0, heading0 = previous
+        lat1, lon1, heading1 = current
+        # Equirectangular approximation; exact enough for sub-kilometre deltas.
+        x = math.radians(lon1 - lon0) * math.cos(math.radians((lat0 + lat1) / 2))
+        y = math.radians(lat1 - lat0)
+        distance = math.hypot(x, y) * EARTH_RADIUS_M
+        heading_delta = abs((heading1 - heading0 + 180) % 360 - 180)
+        return distance >= self.position_threshold or heading_delta >= self.heading_threshold
+
+    def set_position(self, lat, lon, heading):
+        self.position = (lat, lon, heading or 0)
+
+    def set_fleet_position(self, key, lat, lon, heading, label=""):
+        key = str(key)
+        self.removed_fleet.discard(key)
+        self.pending_fleet[key] = [key, lat, lon, heading or 0, label]
+
+    def remove_fleet_vehicle(self, key):
+        key = str(key)
+        self.pending_fleet.pop(key, None)
+        self.removed_fleet.add(key)
+
+    def add_track_point(self, lat, lon, timestamp=0.0):
+        for vertex in self.track.add(lat, lon, timestamp):
+            self.pending_vertices.append(list(vertex))
+
+    def clear_track(self):
+        self.track.clear()
+        self.pending_vertices = []
+        self.bridge.trackCleared.emit()
+
+    def set_mission(self, mission):
+        # mission is a MissionModel; edits on the map go straight into it.
+        self.mission = mission
+        mission.changed.connect(self.mark_mission_dirty)
+        self.bridge.waypointAdded.connect(lambda lat, lon: mission.append(lat, lon))
+        self.bridge.waypointMoved.connect(mission.move)
+        self.bridge.waypointRemoved.connect(mission.remove)
+        self.mark_mission_dirty()
+
+    def mark_mission_dirty(self):
+        self.mission_dirty = True
+
+    def set_mission_editing(self, enabled):
+        self.mission_editing = enabled
+        self.bridge.missionEditingChanged.emit(enabled)
 
     def update_vehicle(self, vehicle):
         self.vehicle = vehicle
+        self.position = None
+        self.clear_track()
@@ -0,0 +1,210 @@
+import os
+import time
+from collections import deque
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QLabel
+from indicator.frame_scheduler import frame_scheduler
+
+SAMPLE_WINDOW = 600
+OVERLAY_RATE = 2
+EXPORT_INTERVAL = 10.0
+QUANTILES = (0.5, 0.99)
+
+# metric -> (Prometheus name, label name, help text)
+METRICS = {
+    "paint": ("gcs_paint_seconds", "widget", "paintEvent duration per widget class"),
+    "callback": ("gcs_callback_seconds", "callback", "Duration of timer and update callbacks"),
+    "loop": ("gcs_event_loop_latency_seconds", None, "How late the frame timer fired"),
+    "telemetry": ("gcs_telemetry_to_paint_seconds", None, "Delay from a telemetry update arriving to the next paint"),
+}
+
+
+class TimingSeries:
+    def __init__(self):
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, fraction):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class PerfMonitor:
+    # Nothing is wrapped while no one is watching: enable() patches paintEvent and the watched
+    # methods in place and hooks the frame scheduler, disable() puts the originals back.
+    def __init__(self):
+        self.users = 0
+        self.series = {}
+        self.paint_classes = []
+        self.methods = []
+        self.patched = []
+        self.telemetry_bus = None
+        self.last_telemetry = None
+
+    @property
+    def enabled(self):
+        return self.users > 0
+
+    def watch_paint(self, *widget_classes):
+        self.paint_classes.extend(widget_classes)
+
+    def watch_method(self, obj, name):
+        self.methods.append((obj, name))
+
+    def watch_telemetry(self, telemetry_bus):
+        self.telemetry_bus = telemetry_bus
+
+    def enable(self):
+        self.users += 1
+        if self.users == 1:
+            self._patch()
+            frame_scheduler().monitor = self
+
+    def disable(self):
+        self.users = max(self.users - 1, 0)
+        if self.users == 0:
+            frame_scheduler().monitor = None
+            self._unpatch()
+
+    def _patch(self):
+        for widget_class in self.paint_classes:
+            original = widget_class.__dict__["paintEvent"]
+            widget_class.paintEvent = self._timed_paint(original, widget_class.__name__)
+            self.patched.append((widget_class, "paintEvent", original))
+        for obj, name in self.methods:
+            original = getattr(obj, name)
+            setattr(obj, name, self._timed_call(original, f"{type(obj).__name__}.{name}"))
+            self.patched.append((obj, name, None))
+
+    def _unpatch(self):
+        for target, name, original in self.patched:
+            if original is None:
+                delattr(target, name)
+            else:
+                setattr(target, name, original)
+        self.patched = []
+
+    def _timed_paint(self, original, label):
+        def paintEvent(widget, event):
+            start = time.perf_counter()
+            original(widget, event)
+            end = time.perf_counter()
+            self.record("paint", label, end - start)
+            self.painted(time.monotonic())
+        return paintEvent
+
+    def _timed_call(self, original, label):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.record("callback", label, time.perf_counter() - start)
+        return timed
+
+    def record(self, metric, label, seconds):
+        key = (metric, label)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = TimingSeries()
+        series.add(seconds)
+
+    def painted(self, now):
+        bus = self.telemetry_bus
+        if bus is None:
+            return
+        received = bus.oldest_update
+        if received is not None and received != self.last_telemetry:
+            self.last_telemetry = received
+            self.record("telemetry", "", now - received)
+
+    def frame_callback(self, callback, elapsed):
+        label = getattr(callback, "__qualname__", None) or repr(callback)
+        self.record("callback", label, elapsed)
+
+    def summary_lines(self):
+        lines = []
+        for (metric, label), series in sorted(self.series.items()):
+            name = f"{metric} {label}".strip()
+            lines.append(f"{name:<40} p50 {series.quantile(0.5) * 1000:6.2f}  p99 {series.quantile(0.99) * 1000:6.2f}"
+                         f"  max {series.max * 1000:6.2f} ms")
+        return lines
+
+    def prometheus_text(self):
+        lines = []
+        for metric, (name, label_name, help_text) in METRICS.items():
+            entries = [(label, series) for (series_metric, label), series in sorted(self.series.items()) if series_metric == metric]
+            if not entries:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} summary")
+            for label, series in entries:
+                labels = f'{label_name}="{label}"' if label_name else ""
+                for fraction in QUANTILES:
+                    quantile_labels = f'{labels},quantile="{fraction}"' if labels else f'quantile="{fraction}"'
+                    lines.append(f"{name}{{{quantile_labels}}} {series.quantile(fraction):.6f}")
+                suffix = f"{{{labels}}}" if labels else ""
+                lines.append(f"{name}_sum{suffix} {series.total:.6f}")
+                lines.append(f"{name}_count{suffix} {series.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        # Written via a temporary file so a textfile collector never reads a half-written file.
+        temporary = f"{path}.tmp"
+        try:
+            with open(temporary, "w") as f:
+                f.write(self.prometheus_text())
+            os.replace(temporary, path)
+        except Exception as e:
+            print(f"Error writing performance metrics: {e}")
+
+    def export_to(self, path, interval=EXPORT_INTERVAL):
+        self.enable()
+        return frame_scheduler().register(lambda: self.write_prometheus(path), 1.0 / interval)
+
+
+class PerfOverlay(QLabel):
+    def __init__(self, monitor, parent=None):
+        super().__init__(parent)
+        self.monitor = monitor
+        self.setStyleSheet("color: #00ff00; background-color: rgba(0, 0, 0, 180); font-family: monospace; "
+                           "font-size: 11px; padding: 6px;")
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.hide()
+        frame_scheduler().register(self.refresh, OVERLAY_RATE, self)
+
+    def toggle(self):
+        if self.isVisible():
+            self.hide()
+            self.monitor.disable()
+        else:
+            self.monitor.enable()
+            self.refresh()
+            self.show()
+            self.raise_()
+
+    def refresh(self):
+        self.setText("\n".join(self.monitor.summary_lines()) or "collecting...")
+        self.adjustSize()
+        self.move(self.parentWidget().width() - self.width() - 10, 10)
+
+
+_monitor = None
+
+
+def perf_monitor():
+    global _monitor
+    if _monitor is None:
+        _monitor = PerfMonitor()
+    return _monitor
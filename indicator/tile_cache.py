@@ -0,0 +1,281 @@
+import argparse
+import math
+import os
+import sqlite3
+import time
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from PySide6.QtCore import QBuffer, QByteArray, QFile, QIODevice, QUrl
+from PySide6.QtNetwork import QNetworkAccessManager, QNetworkReply, QNetworkRequest
+from PySide6.QtWebEngineCore import QWebEngineUrlRequestJob, QWebEngineUrlScheme, QWebEngineUrlSchemeHandler
+
+SCHEME = b"gcs"
+MAP_BASE_URL = "gcs://map/"
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".gcs", "map_cache.mbtiles")
+
+# Used only for tiles the map asks for while browsing; the OSM tile policy forbids bulk seeding from it,
+# so prefetch() needs a tile server that allows it.
+TILE_URL = "https://tile.openstreetmap.org/{z}/{x}/{y}.png"
+MAX_PREFETCH_TILES = 10000
+PREFETCH_INTERVAL = 0.5
+# Leaflet is not shipped with the GCS: the first start needs network access to fetch it from
+# STATIC_URL, after which it is served from the MBTiles store.
+STATIC_URL = "https://unpkg.com/leaflet@1.7.1/dist/{path}"
+STATIC_ASSETS = ("leaflet.js", "leaflet.css", "images/marker-icon.png", "images/marker-shadow.png", "images/layers.png")
+# Assets that ship inside Qt's own resources rather than on the network.
+QT_RESOURCES = {"qwebchannel.js": ":/qtwebchannel/qwebchannel.js"}
+USER_AGENT = "gcs_pract2 tile cache"
+
+MIME_TYPES = {
+    ".png": b"image/png",
+    ".jpg": b"image/jpeg",
+    ".js": b"application/javascript",
+    ".css": b"text/css",
+    ".svg": b"image/svg+xml",
+}
+
+def mime_type(path):
+    return MIME_TYPES.get(os.path.splitext(path)[1].lower(), b"application/octet-stream")
+
+class MBTilesStore:
+    def __init__(self, path=DEFAULT_DB_PATH, memory_tiles=512):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS tiles (
+                zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB,
+                PRIMARY KEY (zoom_level, tile_column, tile_row));
+            CREATE TABLE IF NOT EXISTS assets (name TEXT PRIMARY KEY, data BLOB);
+        """)
+        self.db.execute("INSERT OR IGNORE INTO metadata VALUES ('name', 'gcs map cache'), ('format', 'png')")
+        self.db.commit()
+        self.memory_tiles = memory_tiles
+        self.hot_tiles = OrderedDict()
+
+    def get_tile(self, z, x, y):
+        key = (z, x, y)
+        data = self.hot_tiles.get(key)
+        if data is not None:
+            self.hot_tiles.move_to_end(key)
+            return data
+
+        # MBTiles stores rows in TMS order (origin bottom-left).
+        row = self.db.execute(
+            "SELECT tile_data FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+            (z, x, (1 << z) - 1 - y)).fetchone()
+        if row is None:
+            return None
+        self.remember(key, row[0])
+        return row[0]
+
+    def put_tile(self, z, x, y, data, commit=True):
+        self.db.execute("INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?)", (z, x, (1 << z) - 1 - y, data))
+        if commit:
+            self.db.commit()
+        self.remember((z, x, y), data)
+
+    def has_tile(self, z, x, y):
+        return self.db.execute(
+            "SELECT 1 FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+            (z, x, (1 << z) - 1 - y)).fetchone() is not None
+
+    def get_asset(self, name):
+        row = self.db.execute("SELECT data FROM assets WHERE name=?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def put_asset(self, name, data):
+        self.db.execute("INSERT OR REPLACE INTO assets VALUES (?, ?)", (name, data))
+        self.db.commit()
+
+    def remember(self, key, data):
+        self.hot_tiles[key] = data
+        self.hot_tiles.move_to_end(key)
+        while len(self.hot_tiles) > self.memory_tiles:
+            self.hot_tiles.popitem(last=False)
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+class MapSchemeHandler(QWebEngineUrlSchemeHandler):
+    # Serves gcs://map/static/<path> and gcs://map/tiles/<z>/<x>/<y>.png from the store first,
+    # falling back to the network and writing the result through to the store.
+    def __init__(self, store=None, online=True, parent=None):
+        super().__init__(parent)
+        self.store = store if store is not None else MBTilesStore()
+        self.online = online
+        self.network = QNetworkAccessManager(self)
+        self.pending = {}
+
+    def requestStarted(self, job):
+        path = job.requestUrl().path().lstrip("/")
+        kind, _, name = path.partition("/")
+        if kind == "tiles":
+            self.serve_tile(job, name)
+        elif kind == "static":
+            self.serve_static(job, name)
+        else:
+            job.fail(QWebEngineUrlRequestJob.UrlNotFound)
+
+    def serve_tile(self, job, name):
+        try:
+            z, x, y = (int(part) for part in os.path.splitext(name)[0].split("/"))
+        except ValueError:
+            job.fail(QWebEngineUrlRequestJob.UrlInvalid)
+            return
+
+        data = self.store.get_tile(z, x, y)
+        if data is not None:
+            self.reply(job, name, data)
+        else:
+            self.fetch(job, name, TILE_URL.format(z=z, x=x, y=y),
+                       lambda data: self.store.put_tile(z, x, y, data))
+
+    def serve_static(self, job, name):
+        if name in QT_RESOURCES:
+            resource = QFile(QT_RESOURCES[name])
+            if resource.open(QIODevice.ReadOnly):
+                self.reply(job, name, bytes(resource.readAll()))
+                return
+
+        data = self.store.get_asset(name)
+        if data is not None:
+            self.reply(job, name, data)
+        else:
+            self.fetch(job, name, STATIC_URL.format(path=name), lambda data: self.store.put_asset(name, data))
+
+    def fetch(self, job, name, url, store):
+        if not self.online:
+            job.fail(QWebEngineUrlRequestJob.UrlNotFound)
+            return
+
+        request = QNetworkRequest(QUrl(url))
+        request.setRawHeader(b"User-Agent", USER_AGENT.encode())
+        network_reply = self.network.get(request)
+        self.pending[network_reply] = job
+        job.destroyed.connect(lambda *_: self.cancel(network_reply))
+        network_reply.finished.connect(lambda: self.fetched(network_reply, name, store))
+
+    def fetched(self, network_reply, name, store):
+        job = self.pending.pop(network_reply, None)
+        network_reply.deleteLater()
+        if job is None:
+            return
+        if network_reply.error() != QNetworkReply.NoError:
+            job.fail(QWebEngineUrlRequestJob.RequestFailed)
+            return
+
+        data = bytes(network_reply.readAll())
+        store(data)
+        self.reply(job, name, data)
+
+    def cancel(self, network_reply):
+        if self.pending.pop(network_reply, None) is not None:
+            network_reply.abort()
+
+    def reply(self, job, name, data):
+        buffer = QBuffer(job)
+        buffer.setData(QByteArray(data))
+        buffer.open(QIODevice.ReadOnly)
+        job.reply(mime_type(name), buffer)
+
+def register_map_scheme():
+    # Must run before the QApplication is created.
+    scheme = QWebEngineUrlScheme(SCHEME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+    scheme.setFlags(QWebEngineUrlScheme.SecureScheme | QWebEngineUrlScheme.CorsEnabled |
+                    QWebEngineUrlScheme.LocalAccessAllowed)
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+def install_map_scheme_handler(profile, store=None):
+    handler = profile.urlSchemeHandler(SCHEME)
+    if handler is None:
+        handler = MapSchemeHandler(store, parent=profile)
+        profile.installUrlSchemeHandler(SCHEME, handler)
+    return handler
+
+def tile_range(south, west, north, east, zoom):
+    def tile_xy(lat, lon):
+        n = 1 << zoom
+        x = int((lon + 180.0) / 360.0 * n)
+        lat_rad = math.radians(lat)
+        y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+        return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+    x0, y0 = tile_xy(north, west)
+    x1, y1 = tile_xy(south, east)
+    return range(x0, x1 + 1), range(y0, y1 + 1)
+
+def download(url):
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.read()
+
+def count_tiles(south, west, north, east, min_zoom, max_zoom):
+    total = 0
+    for zoom in range(min_zoom, max_zoom + 1):
+        xs, ys = tile_range(south, west, north, east, zoom)
+        total += len(xs) * len(ys)
+    return total
+
+def prefetch(store, tile_url, south, west, north, east, min_zoom, max_zoom, refresh=False,
+             max_tiles=MAX_PREFETCH_TILES, interval=PREFETCH_INTERVAL):
+    # One request at a time, at most one every interval seconds.
+    total = count_tiles(south, west, north, east, min_zoom, max_zoom)
+    if total > max_tiles:
+        raise ValueError(f"{total} tiles requested, more than the limit of {max_tiles}")
+
+    for name in STATIC_ASSETS:
+        if refresh or store.get_asset(name) is None:
+            store.put_asset(name, download(STATIC_URL.format(path=name)))
+
+    fetched = skipped = 0
+    last_request = 0.0
+    for zoom in range(min_zoom, max_zoom + 1):
+        xs, ys = tile_range(south, west, north, east, zoom)
+        for x in xs:
+            for y in ys:
+                if not refresh and store.has_tile(zoom, x, y):
+                    skipped += 1
+                    continue
+                time.sleep(max(last_request + interval - time.monotonic(), 0.0))
+                last_request = time.monotonic()
+                try:
+                    store.put_tile(zoom, x, y, download(tile_url.format(z=zoom, x=x, y=y)), commit=False)
+                    fetched += 1
+                except Exception as e:
+                    print(f"Error fetching tile {zoom}/{x}/{y}: {e}")
+        store.db.commit()
+        print(f"Zoom {zoom}: {fetched} fetched, {skipped} already cached")
+    return fetched, skipped
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed the offline map cache for an area.")
+    parser.add_argument("--bbox", nargs=4, type=float, required=True, metavar=("SOUTH", "WEST", "NORTH", "EAST"))
+    parser.add_argument("--zoom", nargs=2, type=int, default=(12, 16), metavar=("MIN", "MAX"))
+    parser.add_argument("--tile-url", required=True,
+                        help="tile server whose usage policy allows bulk downloads, e.g. https://tiles.example.com/{z}/{x}/{y}.png")
+    parser.add_argument("--max-tiles", type=int, default=MAX_PREFETCH_TILES)
+    parser.add_argument("--interval", type=float, default=PREFETCH_INTERVAL, help="seconds between tile requests")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--refresh", action="store_true", help="re-download tiles that are already cached")
+    parser.add_argument("--yes", action="store_true", help="do not ask for confirmation")
+    args = parser.parse_args()
+
+    host = urllib.parse.urlparse(args.tile_url).hostname or ""
+    if host.endswith("openstreetmap.org"):
+        parser.error("the OpenStreetMap tile servers do not allow bulk downloads; use another --tile-url")
+    tile_count = count_tiles(*args.bbox, *args.zoom)
+    if tile_count > args.max_tiles:
+        parser.error(f"{tile_count} tiles requested, more than --max-tiles {args.max_tiles}")
+    print(f"{tile_count} tiles from {host}, about {tile_count * args.interval / 60:.0f} min at one request every {args.interval} s")
+    if not args.yes and input("Download? [y/N] ").strip().lower() != "y":
+        raise SystemExit(1)
+
+    tile_store = MBTilesStore(args.db)
+    prefetch(tile_store, args.tile_url, *args.bbox, *args.zoom, refresh=args.refresh, max_tiles=args.max_tiles,
+             interval=args.interval)
+    tile_store.close()
@@ -1,26 +1,130 @@
 import sys
 import os
+import argparse
+import json
+import threading
+import time
+# Taken before the Qt imports so the startup report includes them.
+STARTUP_START = time.perf_counter()
 from PySide6.QtWidgets import (
-    QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QLineEdit, QWidget, QFrame
+    QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QLineEdit, QWidget, QFrame, QPushButton
 )
+from PySide6.QtCore import QEvent, QObject, Qt, QTimer, Signal
+from PySide6.QtGui import QKeySequence, QShortcut
 sys.path.append(os.path.join(os.path.dirname(__file__), "drone_connect_control"))
-from PySide6.QtCore import QTimer
+from indicator.frame_scheduler import frame_scheduler
 from indicator.map import MapWidget
+from indicator.tile_cache import register_map_scheme
 from indicator.alt_bar import AltitudeBar
 from indicator.AttitudeIndicator import AttitudeIndicator
-from indicator.HeadingIndicator import HeadingIndicator
-from indicator.Altimeter import Altimeter
-from indicator.Speedometer import GroundSpeedometer, AirSpeedometer
+from indicator.gauge import Gauge, GAUGES
+from indicator.perf_monitor import perf_monitor, PerfOverlay
 from drone_connect_control.drone_connection_layout import DroneConnectionPanel
 from drone_connect_control.drone_control import DroneControlPanel
+from drone_connect_control.telemetry_bus import TelemetryBus, EMPTY_SNAPSHOT, TELEMETRY_FIELDS
+from drone_connect_control.fleet_manager import FleetManager
+from drone_connect_control.telemetry_recorder import TelemetryRecorder
+from drone_connect_control.telemetry_replay import ReplayPlayer, open_replay_source
+from drone_connect_control.replay_panel import ReplayPanel
+from drone_connect_control.mavlink_backend import MavlinkTelemetryBackend
+from drone_connect_control.stream_rates import StreamRateManager
+from drone_connect_control.link_stats import LinkStats, vehicle_timesync_sender
+from drone_connect_control.link_stats_panel import LinkStatsPanel
+from drone_connect_control.mission import MissionModel
+from drone_connect_control.mission_panel import MissionPanel
+# Imported the way the panels import it, so this is the same singleton they send commands through.
+from command_executor import command_executor
+
+ATTITUDE_RATE = 60
+GAUGE_SIZE = 190
+# Instrument columns either side of the attitude indicator, top to bottom, as GAUGES keys.
+GAUGE_COLUMNS = (("altimeter", "groundspeed"), ("heading", "airspeed"))
+STREAM_CHECK_RATE = 0.2
+STARTUP_TIMEOUT = 60
+# Imported in the background once the window is up, so connecting does not pay for them.
+BACKGROUND_IMPORTS = ("dronekit", "param_cache", "mavlink_router")
+
+
+class StartupTimer(QObject):
+    # Startup runs in phases: the instruments are built and painted first, then the map page is
+    # created and the remaining heavy modules are imported while the window is already usable.
+    finished = Signal()
+    _imports_done = Signal()
+
+    def __init__(self, report_path=None, parent=None):
+        super().__init__(parent)
+        self.report_path = report_path
+        self.phases = []
+        self.window = None
+        self.pending = {"map ready", "background imports"}
+        self._imports_done.connect(lambda: self.complete("background imports"))
+
+    def mark(self, name):
+        self.phases.append((name, time.perf_counter() - STARTUP_START))
+
+    def watch(self, window):
+        self.window = window
+        window.attitude_widget.installEventFilter(self)
+        QTimer.singleShot(STARTUP_TIMEOUT * 1000, self.finish)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            obj.removeEventFilter(self)
+            # Queued, so it runs after this paint has been delivered.
+            QTimer.singleShot(0, self.after_first_frame)
+        return False
+
+    def after_first_frame(self):
+        self.mark("first frame")
+        self.window.map_panel.loaded.connect(lambda: self.complete("map ready"))
+        self.window.map_panel.load()
+        self.mark("map created")
+        threading.Thread(target=self.background_imports, daemon=True).start()
+
+    def background_imports(self):
+        for name in BACKGROUND_IMPORTS:
+            try:
+                __import__(name)
+            except Exception as e:
+                print(f"Error importing {name}: {e}")
+        self._imports_done.emit()
+
+    def complete(self, name):
+        if name not in self.pending:
+            return
+        self.pending.discard(name)
+        self.mark(name)
+        if not self.pending:
+            self.mark("interactive")
+            self.finish()
+
+    def finish(self):
+        if self.window is None:
+            return
+        self.window = None
+        print("Startup: " + ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.phases))
+        if self.report_path:
+            try:
+                with open(self.report_path, "w") as f:
+                    json.dump({"phases": dict(self.phases), "incomplete": sorted(self.pending)}, f, indent=2)
+            except Exception as e:
+                print(f"Error writing startup report: {e}")
+        self.finished.emit()
+
 
 class GCSMainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, record_dir=None, replay_path=None, mavlink_connections=(), metrics_path=None):
         super().__init__()
         self.setWindowTitle("Ground Control Station")
         self.setFixedSize(1400, 850)
         self.setStyleSheet("background-color: #000001;")
         self.vehicle = None  
+        self.vehicle_key = None
+
+        self.telemetry_bus = TelemetryBus(parent=self)
+        self.telemetry_bus.updated.connect(self.on_telemetry)
+        self.fleet = FleetManager(self.telemetry_bus, parent=self)
+        self.fleet.active_changed.connect(self.on_active_changed)
 
         main_widget = QWidget()
         main_layout = QHBoxLayout(main_widget)
@@ -30,24 +134,72 @@ class GCSMainWindow(QMainWindow):
         self.setup_layout(main_layout)
         self.setCentralWidget(main_widget)
 
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_gauges)
-        self.timer.start(10)
+        self.fleet.vehicle_added.connect(self.on_vehicle_added)
+        self.fleet.vehicle_removed.connect(self.on_vehicle_removed)
+
+        self.recorder = None
+        if record_dir:
+            self.recorder = TelemetryRecorder(os.path.join(record_dir, time.strftime("flight-%Y%m%d-%H%M%S")))
+            self.telemetry_bus.updated.connect(self.recorder.record_updates)
+            self.recorder.start()
+
+        if replay_path:
+            self.start_replay(replay_path)
+
+        self.stream_managers = {}
+        self.link_stats = {}
+        # key -> (vehicle, message listener) feeding that vehicle's LinkStats
+        self.link_stats_listeners = {}
+        self.connection_panel.stream_profile_changed.connect(self.set_stream_profile)
+
+        self.mavlink_backends = []
+        for connection_string in mavlink_connections:
+            self.start_mavlink_backend(connection_string)
+        # Not tied to a widget: recording, the fleet and stream supervision need the bus flushed even
+        # while the window is minimized. Only repaint consumers are gated on visibility.
+        flush_consumer = frame_scheduler().register(self.telemetry_bus.flush, ATTITUDE_RATE)
+        self.telemetry_bus.destroyed.connect(lambda *_: frame_scheduler().unregister(flush_consumer))
+
+        self.perf_monitor = perf_monitor()
+        self.perf_monitor.watch_paint(AttitudeIndicator, Gauge, AltitudeBar)
+        self.perf_monitor.watch_method(self, "update_gauges")
+        for gauge in self.gauges.values():
+            self.perf_monitor.watch_method(gauge, "update_value")
+        self.perf_monitor.watch_method(self.altitude_bar, "update_altitude")
+        self.perf_monitor.watch_telemetry(self.telemetry_bus)
+        self.perf_overlay = PerfOverlay(self.perf_monitor, parent=self)
+        QShortcut(QKeySequence("F3"), self, self.perf_overlay.toggle)
+        if metrics_path:
+            self.perf_monitor.export_to(metrics_path)
+        self.update_gauges(EMPTY_SNAPSHOT, TELEMETRY_FIELDS)
 
     def setup_layout(self, main_layout):
         self.instrument_panel = QFrame()
         self.instrument_panel.setFrameShape(QFrame.StyledPanel)
         self.instrument_panel.setMinimumSize(400, 830)
         left_layout = QVBoxLayout(self.instrument_panel)
+        self.left_layout = left_layout
         left_layout.setContentsMargins(10, 10, 10, 10)
         left_layout.setSpacing(10)
 
         self.connection_panel = DroneConnectionPanel(self.set_vehicle)
         left_layout.addWidget(self.connection_panel)
 
+        self.vehicle_selector = QComboBox()
+        self.vehicle_selector.currentIndexChanged.connect(self.select_vehicle)
+        left_layout.addWidget(self.vehicle_selector)
+
+        self.parameters_button = QPushButton("Parameters")
+        self.parameters_button.clicked.connect(self.open_parameters)
+        left_layout.addWidget(self.parameters_button)
+        self.parameter_editor = None
+
         self.drone_control_panel = DroneControlPanel(self.vehicle)  
         self.drone_control_panel.setup_control_buttons(left_layout) 
 
+        self.link_stats_panel = LinkStatsPanel()
+        left_layout.addWidget(self.link_stats_panel)
+
         left_layout.addStretch() 
         main_layout.addWidget(self.instrument_panel, 1)
 
@@ -65,6 +217,10 @@ class GCSMainWindow(QMainWindow):
 
         self.map_panel = MapWidget()
         self.map_panel.setMinimumSize(770, 380)
+        self.mission = MissionModel(parent=self)
+        self.map_panel.set_mission(self.mission)
+        self.mission_panel = MissionPanel(self.mission, self.map_panel)
+        self.left_layout.insertWidget(self.left_layout.indexOf(self.link_stats_panel), self.mission_panel)
         map_layout.addWidget(self.map_panel)
 
         self.altitude_bar = AltitudeBar(self.vehicle)
@@ -82,67 +238,198 @@ class GCSMainWindow(QMainWindow):
         control_layout.setSpacing(10)
         control_layout.setContentsMargins(10, 0, 10, 10)
 
-        left_instrument = QVBoxLayout()
-        self.altimeter = Altimeter(self)
-        self.altimeter.setFixedSize(190, 190)
-        left_instrument.addWidget(self.altimeter)
-
-        self.groundSpeedoMeter = GroundSpeedometer(self)
-        self.groundSpeedoMeter.setFixedSize(190, 190)
-        left_instrument.addWidget(self.groundSpeedoMeter)
+        self.gauges = {}
+        gauge_columns = []
+        for names in GAUGE_COLUMNS:
+            column = QVBoxLayout()
+            for name in names:
+                gauge = self.gauges[name] = Gauge(GAUGES[name], parent=self)
+                gauge.setFixedSize(GAUGE_SIZE, GAUGE_SIZE)
+                column.addWidget(gauge)
+            gauge_columns.append(column)
 
         center_instrument = QVBoxLayout()
         self.attitude_widget = AttitudeIndicator(self)
         self.attitude_widget.setFixedSize(380, 380)
         center_instrument.addWidget(self.attitude_widget)
 
-        right_instruments = QVBoxLayout()
-        self.heading_widget = HeadingIndicator(self)
-        self.heading_widget.setFixedSize(190, 190)
-        right_instruments.addWidget(self.heading_widget)
-
-        self.airSpeedoMeter = AirSpeedometer(self)
-        self.airSpeedoMeter.setFixedSize(190, 190)
-        right_instruments.addWidget(self.airSpeedoMeter)
-
-        control_layout.addLayout(left_instrument)
+        control_layout.addLayout(gauge_columns[0])
         control_layout.addLayout(center_instrument)
-        control_layout.addLayout(right_instruments)
+        control_layout.addLayout(gauge_columns[1])
 
         right_layout.addWidget(self.control_panel)
         main_layout.addLayout(right_layout, 1)
 
     def set_vehicle(self, vehicle):
-        self.vehicle = vehicle
-        self.drone_control_panel.vehicle = self.vehicle  
-        if self.vehicle:
-            self.map_panel.update_vehicle(self.vehicle)
-            self.altitude_bar.vehicle = self.vehicle
-
-    def update_gauges(self):
-        if not self.vehicle:
-            self.attitude_widget.update_attitude(0, 0)
-            self.heading_widget.update_heading(0)
-            self.altimeter.update_altitude(0)
-            self.groundSpeedoMeter.update_speed(0)
-            self.airSpeedoMeter.update_speed(0)
+        if vehicle:
+            self.fleet.add(vehicle)
+
+    def start_replay(self, path):
+        self.replay_player = ReplayPlayer(open_replay_source(path), self.telemetry_bus, parent=self)
+        self.replay_player.vehicle_found.connect(
+            lambda key: self.fleet.add_source(key, f"Replay {key[1]}", activate=self.vehicle_key is None))
+        frame_scheduler().register(self.replay_player.tick, ATTITUDE_RATE, self)
+
+        self.replay_panel = ReplayPanel(self.replay_player)
+        self.left_layout.insertWidget(1, self.replay_panel)
+        self.replay_player.seek(self.replay_player.start_time)
+
+    def start_mavlink_backend(self, connection_string):
+        key = ("mavlink", connection_string)
+        backend = MavlinkTelemetryBackend(connection_string, self.telemetry_bus, key)
+        stats = LinkStats()
+        stats.sender = backend.send_timesync
+        backend.add_frame_listener(stats.on_frame)
+        self.link_stats[key] = stats
+        self.fleet.add_source(key, connection_string)
+        backend.start()
+        self.mavlink_backends.append(backend)
+
+    def on_vehicle_added(self, key, label):
+        vehicle = self.fleet.vehicles[key]
+        if vehicle is not None:
+            if self.recorder:
+                self.recorder.attach(vehicle, key)
+            manager = StreamRateManager(vehicle, self.connection_panel.stream_profile(), parent=self)
+            consumer = frame_scheduler().register(manager.check, STREAM_CHECK_RATE)
+            self.stream_managers[key] = (manager, consumer)
+            manager.apply()
+            stats = LinkStats()
+            stats.sender = vehicle_timesync_sender(vehicle)
+            vehicle.add_message_listener("*", stats.on_message)
+            self.link_stats[key] = stats
+            self.link_stats_listeners[key] = (vehicle, stats.on_message)
+        self.vehicle_selector.addItem(label, key)
+
+    def on_vehicle_removed(self, key):
+        manager, consumer = self.stream_managers.pop(key, (None, None))
+        if manager:
+            frame_scheduler().unregister(consumer)
+            manager.close()
+        self.link_stats.pop(key, None)
+        vehicle, listener = self.link_stats_listeners.pop(key, (None, None))
+        if vehicle is not None:
+            try:
+                vehicle.remove_message_listener("*", listener)
+            except Exception as e:
+                print(f"Error removing link stats listener: {e}")
+            command_executor().forget(vehicle)
+        if self.recorder:
+            self.recorder.detach(key)
+        index = self.vehicle_selector.findData(key)
+        if index >= 0:
+            self.vehicle_selector.removeItem(index)
+        self.map_panel.remove_fleet_vehicle(key)
+
+    def set_stream_profile(self, profile):
+        for manager, _consumer in self.stream_managers.values():
+            manager.set_profile(profile)
+
+    def select_vehicle(self, index):
+        if index >= 0:
+            self.fleet.set_active(self.vehicle_selector.itemData(index))
+
+    def open_parameters(self):
+        if self.vehicle is None or not hasattr(self.vehicle, "_params_map"):
+            print("No vehicle with parameters selected.")
             return
+        if self.parameter_editor is None or self.parameter_editor.vehicle is not self.vehicle:
+            if self.parameter_editor:
+                self.parameter_editor.close()
+                self.parameter_editor.deleteLater()
+            from drone_connect_control.parameter_editor import ParameterEditor
+            self.parameter_editor = ParameterEditor(self.vehicle, self)
+        self.parameter_editor.show()
+        self.parameter_editor.raise_()
+
+    def on_active_changed(self, key):
+        previous_key = self.vehicle_key
+        self.vehicle_key = key
+        self.vehicle = self.fleet.active_vehicle()
+        self.drone_control_panel.vehicle = self.vehicle  
+        self.altitude_bar.vehicle = self.vehicle
+        self.map_panel.update_vehicle(self.vehicle)
+        self.link_stats_panel.set_stats(self.link_stats.get(key))
+        self.mission_panel.set_vehicle(self.vehicle)
 
-        roll = self.vehicle.attitude.roll
-        pitch = self.vehicle.attitude.pitch
-        heading = self.vehicle.heading
-        altitude = self.vehicle.location.global_relative_frame.alt
-        groundspeed = self.vehicle.groundspeed
-        airspeed = self.vehicle.airspeed
+        index = self.vehicle_selector.findData(key)
+        if index >= 0 and index != self.vehicle_selector.currentIndex():
+            self.vehicle_selector.setCurrentIndex(index)
 
-        self.attitude_widget.update_attitude(roll, pitch)
-        self.heading_widget.update_heading(heading)
-        self.altimeter.update_altitude(altitude)
-        self.groundSpeedoMeter.update_speed(groundspeed)
-        self.airSpeedoMeter.update_speed(airspeed)
+        if previous_key in self.fleet.vehicles:
+            self.show_fleet_vehicle(previous_key, self.fleet.snapshot(previous_key))
+        if key is not None:
+            self.map_panel.remove_fleet_vehicle(key)
+            self.update_gauges(self.fleet.snapshot(key), TELEMETRY_FIELDS)
+        else:
+            self.update_gauges(EMPTY_SNAPSHOT, TELEMETRY_FIELDS)
+
+    def on_telemetry(self, updates):
+        for key, (snapshot, changed) in updates.items():
+            if key == self.vehicle_key:
+                self.update_gauges(snapshot, changed)
+            elif "lat" in changed or "lon" in changed:
+                self.show_fleet_vehicle(key, snapshot)
+
+    def show_fleet_vehicle(self, key, snapshot):
+        if snapshot.lat is not None and snapshot.lon is not None:
+            self.map_panel.set_fleet_position(key, snapshot.lat, snapshot.lon, snapshot.heading, self.fleet.labels.get(key, ""))
+
+    def update_gauges(self, snapshot, changed):
+        if ("lat" in changed or "lon" in changed or "heading" in changed) and snapshot.lat is not None and snapshot.lon is not None:
+            self.map_panel.set_position(snapshot.lat, snapshot.lon, snapshot.heading)
+            if "lat" in changed or "lon" in changed:
+                self.map_panel.add_track_point(snapshot.lat, snapshot.lon, snapshot.timestamp)
+        if "roll" in changed or "pitch" in changed:
+            self.attitude_widget.update_attitude(snapshot.roll, snapshot.pitch)
+        if "altitude" in changed:
+            self.altitude_bar.update_altitude(snapshot.altitude)
+        for gauge in self.gauges.values():
+            if gauge.config.source in changed:
+                gauge.update_value(getattr(snapshot, gauge.config.source))
+
+    def closeEvent(self, event):
+        for backend in self.mavlink_backends:
+            backend.stop()
+        self.fleet.close()
+        self.connection_panel.close_routers()
+        if self.recorder:
+            self.recorder.stop()
+        event.accept()
 
 if __name__ == "__main__":
-    app = QApplication([])
-    window = GCSMainWindow()
+    parser = argparse.ArgumentParser(description="Ground Control Station")
+    parser.add_argument("--record", metavar="DIR", help="record telemetry into DIR")
+    parser.add_argument("--replay", metavar="LOG", help="replay a .tlog or a recording instead of a live vehicle")
+    parser.add_argument("--mavlink", metavar="CONNECTION", action="append", default=[],
+                        help="read telemetry straight from a pymavlink connection string, bypassing dronekit")
+    parser.add_argument("--sim", metavar="N", type=int, default=0, help="fly N synthetic vehicles instead of real ones")
+    parser.add_argument("--sim-rate", metavar="HZ", type=float, default=50, help="synthetic telemetry rate (max 500)")
+    parser.add_argument("--sim-jitter", metavar="SECONDS", type=float, default=0.0, help="stddev of delivery jitter")
+    parser.add_argument("--sim-dropout", metavar="P", type=float, default=0.0, help="probability of dropping an update")
+    parser.add_argument("--sim-seed", type=int, default=0)
+    parser.add_argument("--metrics", metavar="PATH", help="write performance counters to PATH in Prometheus text format")
+    parser.add_argument("--startup-report", metavar="PATH", help="write startup phase timings to PATH as JSON")
+    parser.add_argument("--exit-after-startup", action="store_true", help="quit once startup has finished")
+    args, qt_args = parser.parse_known_args()
+
+    startup = StartupTimer(report_path=args.startup_report)
+    startup.mark("imports")
+    # Needed because QtWebEngineWidgets is only imported after the QApplication exists.
+    QApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    register_map_scheme()
+    app = QApplication(sys.argv[:1] + qt_args)
+    startup.setParent(app)
+    startup.mark("application")
+    window = GCSMainWindow(record_dir=args.record, replay_path=args.replay, mavlink_connections=args.mavlink,
+                           metrics_path=args.metrics)
+    startup.mark("window")
+    if args.sim:
+        from drone_connect_control.synthetic_vehicle import synthetic_fleet
+        for synthetic_vehicle in synthetic_fleet(args.sim, args.sim_rate, args.sim_jitter, args.sim_dropout, args.sim_seed):
+            window.set_vehicle(synthetic_vehicle.start())
+    if args.exit_after_startup:
+        startup.finished.connect(window.close)
+    startup.watch(window)
     window.show()
     app.exec()
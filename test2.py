@@ -1,9 +1,11 @@
 import sys
+import os
 from PySide6.QtWidgets import (QApplication, QMainWindow, QLabel, QComboBox, QLineEdit, QPushButton, QVBoxLayout, QWidget, QHBoxLayout)
 from PySide6.QtCore import QTimer
+sys.path.append(os.path.join(os.path.dirname(__file__), "drone_connect_control"))
 from dronekit import connect, VehicleMode
-import time
-from pymavlink import mavutil
+from command_executor import command_executor
+from setpoint_streamer import SetpointStreamer
 
 class DroneControlWindow(QMainWindow):
     def __init__(self):
@@ -68,6 +70,8 @@ class DroneControlWindow(QMainWindow):
         self.setCentralWidget(central_widget)
 
         self.vehicle = None  
+        self.executor = command_executor()
+        self.streamer = None
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_vehicle_status)
 
@@ -83,6 +87,8 @@ class DroneControlWindow(QMainWindow):
 
             self.vehicle = connect(connection_string, wait_ready=True)
             print("Drone connected successfully!")
+            self.streamer = SetpointStreamer(self.vehicle)
+            self.streamer.start()
             
             self.timer.start(100)
 
@@ -103,12 +109,14 @@ class DroneControlWindow(QMainWindow):
     def arm_drone(self):
         if self.vehicle:
             print("Arming drone...")
-            self.vehicle.mode = VehicleMode("GUIDED")
-            self.vehicle.armed = True
-            while not self.vehicle.armed:
-                print("Waiting for arming...")
-                time.sleep(1)
-            print("Drone armed and ready.")
+            self.executor.set_mode(self.vehicle, "GUIDED", callback=self.on_guided)
+
+    def on_guided(self, success, message):
+        if not success:
+            print(f"GUIDED rejected: {message}")
+            return
+        self.executor.arm(self.vehicle, True, callback=lambda success, message:
+                          print("Drone armed and ready." if success else f"Arming failed: {message}"))
 
     def takeoff_drone(self):
         if self.vehicle:
@@ -131,20 +139,13 @@ class DroneControlWindow(QMainWindow):
             self.vehicle.armed = False
 
     def send_ned_velocity(self, velocity_x, velocity_y, velocity_z, duration):
-        msg = self.vehicle.message_factory.set_position_target_local_ned_encode(
-            0,       
-            0, 0,    
-            mavutil.mavlink.MAV_FRAME_LOCAL_NED,  
-            0b0000111111000111,  
-            0, 0, 0, 
-            velocity_x, velocity_y, velocity_z,  
-            0, 0, 0,  
-            0, 0)     
-
-        for _ in range(0, duration):
-            self.vehicle.send_mavlink(msg)
-            self.vehicle.flush() 
-            time.sleep(1)
+        # The streamer keeps resending in the background and stops by itself after duration seconds.
+        self.streamer.set_velocity(velocity_x, velocity_y, velocity_z, duration=duration)
+
+    def closeEvent(self, event):
+        if self.streamer:
+            self.streamer.stop()
+        event.accept()
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)